@@ -3,7 +3,6 @@ import streamlit as st
 import os
 import sys
 import glob
-import time
 import logging  # NEU: Für Konsolen-Logs
 import calendar
 
@@ -17,41 +16,89 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(me
 logger = logging.getLogger(__name__)
 
 # --- Imports ---
-from gui.state import init_state
-from gui.layout import render_article_list
-from core.parser import parse_articles_from_text, validate_and_correct_categories
-from core.processor import (
-    create_working_copy, extract_year_month, generate_output, update_working_copy
-)
-from core.output_processor import(
-    step1_remove_single_empty_line_after_text,
-    step2_ensure_empty_lines_around_headings,
-    step3_ensure_empty_lines_around_comments,
-    step4_add_frontmatter,
-    step5_remove_date_after_heading,
-    step6_remove_placeholder_link_shortcodes,
-    step7_reduce_multiple_empty_lines
-)
-from core.utils import OUTPUT_DIR
+from gui.state import init_state, session_id
+from gui.layout import PAGE_SIZES, get_selection, render_article_list, render_duplicate_groups, render_facet_filter
+from gui.debug_panel import render_metrics_panel
+from gui.jobs import render_job_status
+from core.archive import get_published_index
+from core.cache import get_parse_cache, restore_session
+from core.export import parse_queries, query_assignment, run_split_export, split_assignment
+from core.dedup import duplicate_titles, find_duplicate_groups, get_signature_store, np as dedup_numpy
+from core.facets import UNCATEGORIZED, FacetIndex
+from core.suggest import get_category_model, suggest_categories
+from core.jobs import get_job_runner
+from core.processor import run_generation
+from core.metrics import record_run
+from core.config import get_config
+from core.working_copy import WorkingCopySet
 
 # --- Init ---
 st.set_page_config(page_title="News Parser", layout="wide")
 init_state()
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_DIR = get_config().ensure_output_dir()  # Einmal pro Prozess angelegt, nicht bei jedem Rerun
+# Working Copies dieser Browser-Sitzung (überlebt Neustarts; Kennung aus der URL, nie mit anderen Sitzungen geteilt)
+SESSION_MANIFEST = os.path.join(OUTPUT_DIR, f"working_session_{session_id()}.json")
 
 # --- Hilfsfunktionen ---
 def reset_session():
-    """Lösche Working Copies + Session-Keys (außer src_text/file_name)"""
-    for f in glob.glob(os.path.join(OUTPUT_DIR, "working_*.md")):
-        try:
-            os.remove(f)
-            logger.info(f"Gelöscht: Working Copy {f}")
-        except Exception as e:
-            logger.warning(f"Konnte Working Copy {f} nicht löschen: {e}")
-    keys = ["working_path", "grouped", "corrections_str", "year", "month", "last_output"]
+    """Lösche die Working Copies dieser Sitzung (samt Journal und Manifest) + Session-Keys (außer file_name)"""
+    wc_set = st.session_state.get("wc_store")
+    if wc_set is not None:
+        wc_set.delete()
+        logger.info(f"Gelöscht: Working Copies {', '.join(wc_set.names) or '—'}")
+    keys = ["working_path", "wc_store", "grouped", "published", "duplicates", "suggestions", "corrections_str", "file_corrections",
+            "upload_errors", "uploaded_names", "year", "month", "last_output",
+            "selected_refs", "open_categories", "category_pages", "generate_job", "generate_error"]
     for k in keys:
         st.session_state.pop(k, None)
 
+def finish_generate_job(job):
+    """Ergebnis des Hintergrund-Jobs in die Session übernehmen (UI aus dem Index, ohne erneutes Parsen)."""
+    st.session_state.pop("generate_job", None)
+    if job is None:
+        return
+    if job.status == "done":
+        paths = job.result if isinstance(job.result, list) else [job.result]  # Split-Export: mehrere Outputs
+        st.session_state.last_output = ", ".join(os.path.basename(p) for p in paths)
+        logger.info(f"Output-Datei erstellt: {st.session_state.last_output}")
+    elif job.status == "failed":
+        st.session_state.generate_error = job.error
+        logger.error(f"Generieren fehlgeschlagen: {job.error}")
+    refresh_view()
+
+def refresh_view():
+    """Liste nach Generieren/Undo/Redo aus dem Index aktualisieren (ohne erneutes Parsen)."""
+    wc_set = st.session_state.get("wc_store")
+    if wc_set is not None:
+        get_selection().intersection_update(a.ref for a in wc_set.live_articles())
+        st.session_state.grouped = wc_set.grouped()
+        st.session_state.duplicates = None  # Wiederhergestellte Artikel neu gruppieren
+        st.session_state.suggestions = None
+
+def restore_previous_session():
+    """Nach einem Neustart: Working Copies aus dem Manifest öffnen, Stand aus ihren Journalen – ohne erneutes Parsen."""
+    with record_run("restore"):
+        wc_set, info_by_name = restore_session(SESSION_MANIFEST)
+    if not info_by_name:
+        return
+    first = next(iter(info_by_name.values()))
+    corrections = {name: info["corrections_str"] for name, info in info_by_name.items()}
+    live = wc_set.live_articles()
+    st.session_state.update({
+        "file_name": ", ".join(wc_set.names),
+        "working_path": wc_set.paths,
+        "wc_store": wc_set,
+        "grouped": wc_set.grouped(),
+        "published": get_published_index(OUTPUT_DIR).published_in(live),
+        "duplicates": None,
+        "suggestions": None,
+        "file_corrections": corrections,
+        "corrections_str": "; ".join(f"{name}: {c}" if len(corrections) > 1 else c for name, c in corrections.items() if c),
+        "year": first["year"],
+        "month": first["month"],
+    })
+    logger.info(f"Sitzung wiederhergestellt: {len(live)} Artikel aus {len(info_by_name)} Datei(en)")
+
 def get_latest_output():
     """Nur für interne Logik – nicht für UI!"""
     files = [
@@ -60,42 +107,85 @@ def get_latest_output():
     ]
     return max(files, key=os.path.getctime) if files else None
 
-# --- UI: Upload ---
-uploaded = st.file_uploader("Markdown-Datei hochladen", type="md", key="uploader")
-
-# --- Datei laden (FIX: Prüfe Dateinamen statt Inhalt) ---
-if uploaded is not None:
-    current_filename = st.session_state.get("file_name", "")
-    if current_filename != uploaded.name:  # FIX: Nur bei neuem Dateinamen
-        with st.spinner("Lade und verarbeite neue Datei..."):
-            reset_session()  # Working + Session zurücksetzen
-            st.session_state.src_text = uploaded.getvalue().decode("utf-8")
-            st.session_state.file_name = uploaded.name
+# --- Sitzung nach Neustart wiederherstellen (einmal pro Browser-Sitzung) ---
+if "wc_store" not in st.session_state and not st.session_state.get("restore_checked"):
+    st.session_state.restore_checked = True
+    restore_previous_session()
 
-            try:
-                year, month = extract_year_month(st.session_state.src_text)
-                wp = create_working_copy(st.session_state.src_text, st.session_state.file_name, OUTPUT_DIR)
-                articles = parse_articles_from_text(open(wp, "r", encoding="utf-8").read())  # Löst Debug-Files aus
-                logger.info(f"PARSING ABGESCHLOSSEN: {len(articles)} Artikel, siehe debug/ Ordner.")
-                corr = validate_and_correct_categories(articles)
-
-                grouped = {}
-                for a in articles:
-                    for c in (a["categories"] or ["Unkategorisiert"]):
-                        grouped.setdefault(c, []).append(a)
-
-                st.session_state.update({
-                    "working_path": wp,
-                    "grouped": grouped,
-                    "corrections_str": corr,
-                    "year": year,
-                    "month": month,
-                    "last_output": None  # Zurücksetzen!
-                })
-            except Exception as e:
-                st.error(f"Fehler: {e}")
-                logger.error(f"Laden fehlgeschlagen: {e}")
-                st.stop()
+# --- UI: Upload ---
+uploaded_files = st.file_uploader("Markdown-Dateien hochladen", type="md", accept_multiple_files=True,
+                                  key=f"uploader_{st.session_state.get('uploader_generation', 0)}")
+
+def sync_uploads(files):
+    """
+    Working Copies an die hochgeladenen Dateien angleichen (inkrementell): neue Dateien werden geparst
+    (mehrere parallel), entfernte herausgenommen – bereits geladene Dateien bleiben unverändert.
+    """
+    files = {f.name: f for f in files}  # Gleicher Name: letzte Datei gilt
+    wc_set = st.session_state.get("wc_store")
+    if wc_set is None:
+        reset_session()  # Erste Datei: Session zurücksetzen
+        wc_set = WorkingCopySet(SESSION_MANIFEST)
+    # Nur Dateien, die in dieser Browser-Sitzung im Uploader waren, können wieder verschwinden
+    # (wiederhergestellte Dateien bleiben bis "Sitzung schließen")
+    seen = st.session_state.setdefault("uploaded_names", set())
+    seen.update(files)
+    errors = st.session_state.setdefault("upload_errors", {})
+    for name in list(errors):
+        if name not in files:
+            del errors[name]
+    new = [(name, f) for name, f in files.items() if name not in wc_set and name not in errors]
+    gone = [name for name in wc_set.names if name in seen and name not in files]
+    if not new and not gone and "wc_store" in st.session_state:
+        return
+    corrections = st.session_state.setdefault("file_corrections", {})
+    for name in gone:
+        seen.discard(name)
+        store = wc_set.remove_file(name)
+        corrections.pop(name, None)
+        store.delete()
+        logger.info(f"Gelöscht: Working Copy {store.path} ({name})")
+    if new:
+        # Uploads werden gestreamt bzw. in Worker-Prozessen geparst; bekannte Quellen kommen aus dem Parse-Cache
+        with record_run("upload"):
+            results, failed = get_parse_cache().open_working_copies(new, OUTPUT_DIR)
+        for name, (store, parsed, cache_hit) in results.items():
+            if not wc_set.names:  # Jahr/Monat aus der ersten Datei
+                st.session_state.year, st.session_state.month = parsed.year, parsed.month
+            wc_set.add(name, store)
+            corrections[name] = parsed.corrections_str
+            logger.info(f"PARSING ABGESCHLOSSEN: {name}: {len(store)} Artikel ({'Cache-Treffer' if cache_hit else 'neu geparst'})")
+        for name, error in failed.items():
+            errors[name] = error
+            logger.error(f"Laden fehlgeschlagen: {name}: {error}")
+        logger.info(f"Cache: {get_parse_cache().stats()}")
+    live = wc_set.live_articles()
+    get_selection().intersection_update(a.ref for a in live)
+    st.session_state.update({
+        "file_name": ", ".join(wc_set.names),
+        "working_path": wc_set.paths,
+        "wc_store": wc_set,
+        "grouped": wc_set.grouped(),
+        "published": get_published_index(OUTPUT_DIR).published_in(live),  # Titel -> frühere Output-Datei
+        "duplicates": None,  # Neu gruppieren bei Bedarf
+        "suggestions": None,  # Kategorie-Vorschläge neu berechnen
+        "corrections_str": "; ".join(
+            f"{name}: {c}" if len(corrections) > 1 else c for name, c in corrections.items() if c
+        ),
+        "last_output": None  # Zurücksetzen!
+    })
+
+# --- Dateien laden (nach Dateinamen: nur neue Dateien werden geparst) ---
+if uploaded_files:
+    with st.spinner("Lade und verarbeite Dateien..."):
+        try:
+            sync_uploads(uploaded_files)
+        except Exception as e:
+            st.error(f"Fehler: {e}")
+            logger.error(f"Laden fehlgeschlagen: {e}")
+            st.stop()
+    for name, error in st.session_state.get("upload_errors", {}).items():
+        st.error(f"Fehler in {name}: {error}")
 
 # --- Datei-Info (nur Session-basiert!) ---
 if st.session_state.file_name or st.session_state.working_path:
@@ -103,17 +193,76 @@ if st.session_state.file_name or st.session_state.working_path:
     with c1:
         st.caption(f"Eingelesen: {st.session_state.file_name or '—'}")
     with c2:
-        wc = os.path.basename(st.session_state.working_path) if st.session_state.working_path else "—"
+        wc = ", ".join(os.path.basename(p) for p in st.session_state.working_path) if st.session_state.working_path else "—"
         st.caption(f"Working Copy: {wc}")
     with c3:
         last_out = st.session_state.get("last_output")
         st.caption(f"Letzte Ausgabe: {last_out or '—'}")
+    cache_stats = get_parse_cache().stats()
+    st.caption(f"Parse-Cache: {cache_stats['hits'] + cache_stats['disk_hits']} Treffer / {cache_stats['misses']} Misses, {cache_stats['entries']} Einträge")
+
+# --- Verlauf: Undo/Redo sind nur Journal-Zeilen, die Working Copies werden nicht umgeschrieben ---
+if st.session_state.get("wc_store") is not None and st.session_state.wc_store.names:
+    wc_set = st.session_state.wc_store
+    history = wc_set.history()
+    history_job = get_job_runner().get(st.session_state.get("generate_job"))
+    busy = history_job is not None and not history_job.done
+    st.sidebar.subheader("Verlauf")
+    h1, h2 = st.sidebar.columns(2)
+    with h1:
+        if st.button("Rückgängig", key="undo", disabled=busy or not any(h["applied"] for h in history)):
+            wc_set.undo()
+            refresh_view()
+            st.rerun()
+    with h2:
+        if st.button("Wiederholen", key="redo", disabled=busy or all(h["applied"] for h in history)):
+            wc_set.redo()
+            refresh_view()
+            st.rerun()
+    for h in history[:10]:
+        st.sidebar.caption(f"{'' if h['applied'] else '~~'}{h['label'] or 'Entfernt'}: {h['articles']} Artikel{'' if h['applied'] else '~~ (rückgängig)'}")
+    if st.sidebar.button("Sitzung schließen", key="close_session", disabled=busy, help="Löscht die Working Copies und ihren Verlauf"):
+        reset_session()
+        st.session_state.file_name = None
+        st.session_state.uploader_generation = st.session_state.get("uploader_generation", 0) + 1  # Uploader leeren
+        st.rerun()
 
 # --- Haupt-UI ---
 if st.session_state.grouped:
     st.subheader("Artikel auswählen")
-    selected_titles, unique_count = render_article_list(st.session_state.grouped)
-    st.info(f"Gesamt: {unique_count} | Ausgewählt: {len(selected_titles)}")
+    published = st.session_state.get("published") or {}
+    hide_published = st.sidebar.checkbox("Bereits veröffentlichte ausblenden", key="hide_published")
+    # Ohne NumPy ist die MinHash-Berechnung langsam -> dann nur auf Wunsch
+    duplicates = {}
+    if st.sidebar.checkbox("Ähnliche Artikel gruppieren", value=dedup_numpy is not None, key="group_duplicates"):
+        if st.session_state.get("duplicates") is None:
+            live = st.session_state.wc_store.live_articles()
+            with record_run("dedup"):  # Signaturen bekannter Texte kommen aus dem Signatur-Speicher
+                groups = find_duplicate_groups(live, get_signature_store(OUTPUT_DIR))
+            st.session_state.duplicates = duplicate_titles(live, groups)
+        duplicates = st.session_state.duplicates
+        render_duplicate_groups(st.session_state.grouped, duplicates)
+    # Kategorie-Vorschläge für "Unkategorisiert": einmal pro Upload als ein Stapel, danach aus der Session
+    suggestions = {}
+    uncategorized = st.session_state.grouped.get(UNCATEGORIZED)
+    if uncategorized:
+        model = get_category_model(OUTPUT_DIR)  # Per mmap, einmal pro Prozess (neu nach erneutem Training)
+        if model is None:
+            st.sidebar.caption("Kategorie-Vorschläge: kein Modell trainiert (python -m core.suggest)")
+        else:
+            if st.session_state.get("suggestions") is None:
+                with record_run("suggest"):
+                    st.session_state.suggestions = suggest_categories(model, uncategorized)
+            suggestions = st.session_state.suggestions
+    # Zählungen und Filter fragen die Stores (Datei: mitgeführter Facetten-Index, SQLite: indizierte Abfragen)
+    visible_refs = render_facet_filter(st.session_state.wc_store.facets)
+    # Nur aufgeklappte Kategorien und davon eine Seite werden gezeichnet (schnelle Reruns auch bei 5k Artikeln)
+    page_size = st.sidebar.selectbox("Artikel pro Seite", PAGE_SIZES, index=1, key="page_size")
+    selected_refs, unique_count = render_article_list(st.session_state.grouped, published, hide_published, duplicates,
+                                                      visible_refs, page_size,
+                                                      show_source=len(st.session_state.wc_store.names) > 1,
+                                                      suggestions=suggestions)
+    st.info(f"Gesamt: {unique_count} | Ausgewählt: {len(selected_refs)}" + (f" | Bereits veröffentlicht: {len(published)}" if published else ""))
     if st.session_state.corrections_str:
         st.success(f"Korrigiert: {st.session_state.corrections_str}")
 
@@ -144,86 +293,61 @@ if st.session_state.grouped:
             except:
                 date_year, date_month, date_day = media_year_val, media_month_val, last_day  # Fallback
 
-    if st.button("Output erzeugen", type="primary"):
-        if not selected_titles:
+    # Erzeugung läuft als Hintergrund-Job; die Seite fragt nur den Fortschritt ab
+    job = get_job_runner().get(st.session_state.get("generate_job"))
+    running = job is not None and not job.done
+    if st.button("Output erzeugen", type="primary", disabled=running):
+        if not selected_refs:
             st.warning("Wähle Artikel aus.")
         else:
-            with st.spinner("Generiere..."):
-                try:
-                    current_articles = parse_articles_from_text(open(st.session_state.working_path, "r", encoding="utf-8").read())
-                    selected = [a for a in current_articles if a["title"] in selected_titles]
-                    out_path = generate_output(selected, out_title, int(media_year), int(media_month), OUTPUT_DIR)  # Params bleiben, aber ignoriert im Raw
-                    logger.info(f"Output-Datei erstellt: {os.path.basename(out_path)}")
-                    update_working_copy(st.session_state.working_path, selected_titles)
-
-                    ##########################
-                    # Parsen des Output Files
-                    ##########################
-
-                    # Post-Processing: Schritte 1 + 2 + 3 auf dem Output-File
-                    with open(out_path, "r", encoding="utf-8") as f:
-                        raw_output = f.read()
-
-                    logger.info(f"Raw Output Länge vor Processing: {len(raw_output)}")
-
-                    # Schritt 1: Frontmatter hinzufügen (extrahiert aus raw)
-                    processed_step1 = step4_add_frontmatter(raw_output, out_title, date_year, date_month, date_day, media_year, media_month)
-                    logger.info(f"Nach Schritt 4 Länge: {len(processed_step1)} (Frontmatter hinzugefügt)")
-
-                    # Schritt 2: Leerzeilen nach Textzeilen reduzieren
-                    processed_step2 = step1_remove_single_empty_line_after_text(processed_step1)
-                    logger.info(f"Nach Schritt 1 Länge: {len(processed_step2)}")
-
-                    # Schritt 3: Leerzeilen um Überschriften sicherstellen
-                    processed_step3 = step2_ensure_empty_lines_around_headings(processed_step2)
-                    logger.info(f"Nach Schritt 2 Länge: {len(processed_step2)}")
-
-                    # Schritt 4: Leerzeilen um Kommentare
-                    processed_step4 = step3_ensure_empty_lines_around_comments(processed_step3)
-                    logger.info(f"Nach Schritt 3 Länge: {len(processed_step3)}")
-
-                    # NEU: Schritt 5: Date-Zusatz entfernen
-                    processed_step5 = step5_remove_date_after_heading(processed_step4)
-                    logger.info(f"Nach Schritt 5 Länge: {len(processed_step5)}")
-
-                    # Schritt 6: Date-Zusatz entfernen
-                    processed_step6 = step6_remove_placeholder_link_shortcodes(processed_step5)
-                    logger.info(f"Nach Schritt 6 Länge: {len(processed_step6)}")
-
-                    # Schritt 7: Mehrfach-Leerzeilen reduzieren
-                    processed_step7 = step7_reduce_multiple_empty_lines(processed_step6)
-                    logger.info(f"Nach Schritt 7 Länge: {len(processed_step7)} (Mehrfach-Leerzeilen reduziert)")
-
-                    # Final: Überschreibe Output
-                    with open(out_path, "w", encoding="utf-8") as f:
-                        f.write(processed_step7)
-
-                    logger.info(f"Output post-prozessiert (Schritte 4+1+2+3): {os.path.basename(out_path)}")
-
-                    st.session_state.last_output = os.path.basename(out_path)
-
-                    time.sleep(1.2)
-
-                    # UI aktualisieren (Parsing nur für UI)
-                    new_articles = parse_articles_from_text(open(st.session_state.working_path, "r", encoding="utf-8").read())
-                    corr = validate_and_correct_categories(new_articles)
-
-                    new_grouped = {}
-                    for a in new_articles:
-                        for c in (a["categories"] or ["Unkategorisiert"]):
-                            new_grouped.setdefault(c, []).append(a)
-                    st.session_state.update({
-                        "grouped": new_grouped,
-                        "corrections_str": corr
-                    })
-                    st.rerun()
-
-                except Exception as e:
-                    st.error(f"Fehler: {e}")
-                    logger.error(f"Generieren fehlgeschlagen: {e}")
+            job = get_job_runner().submit(
+                "generate", run_generation, st.session_state.wc_store, set(selected_refs), out_title,
+                date_year, date_month, date_day, int(media_year), int(media_month), OUTPUT_DIR,
+            )
+            st.session_state.generate_job = job.id
+            st.rerun()
+    # Split-Export: alle Outputs (z.B. einer pro Kategorie) in einem Job, danach ein einziges Update der Working Copy
+    with st.expander("Aufteilen: mehrere Outputs auf einmal"):
+        split_labels = {"categories": "Kategorie", "orte": "Ort", "tags": "Tag", "query": "Eigene Filter"}
+        split_by = st.radio("Ein Output pro", list(split_labels), format_func=split_labels.get, horizontal=True, key="split_by")
+        only_selected = st.checkbox("Nur ausgewählte Artikel", value=bool(selected_refs), key="split_only_selected")
+        split_articles = st.session_state.wc_store.live_articles()
+        if only_selected:
+            split_articles = [a for a in split_articles if a.ref in selected_refs]
+        assignment, split_error = {}, None
+        try:
+            if split_by == "query":
+                queries = parse_queries(st.text_area("Ein Output pro Zeile: Titel = Filter", key="split_queries",
+                                                     placeholder='Klima = tags:Klima OR categories:"Umwelt & Klima"'))
+                facets = FacetIndex(split_articles) if only_selected else st.session_state.wc_store.facets
+                assignment = query_assignment(facets, queries)
+            else:
+                prefix = st.text_input("Titel-Präfix", "", key="split_prefix", help="Output-Titel = Präfix + Wert")
+                assignment = split_assignment(split_articles, split_by, prefix)
+        except ValueError as e:
+            split_error = str(e)
+        if split_error:
+            st.warning(split_error)
+        elif assignment:
+            st.caption(f"{len(assignment)} Outputs: " + ", ".join(f"{t} ({len(v)})" for t, v in assignment.items()))
+        if st.button("Alle Outputs erzeugen", disabled=running or not assignment, key="split_export"):
+            job = get_job_runner().submit(
+                "split_export", run_split_export, st.session_state.wc_store, assignment,
+                date_year, date_month, date_day, int(media_year), int(media_month), OUTPUT_DIR,
+            )
+            st.session_state.generate_job = job.id
+            st.rerun()
+    if st.session_state.get("generate_error"):
+        st.error(f"Fehler: {st.session_state.pop('generate_error')}")
+    if st.session_state.get("generate_job"):
+        render_job_status(st.session_state.generate_job, finish_generate_job)
 else:
     st.info("Lade eine Markdown-Datei hoch, um zu beginnen.")
 
+# --- Optionales Debug-Panel (Spans/Metriken) ---
+if st.sidebar.checkbox("Debug-Panel (Metriken)", key="show_metrics"):
+    render_metrics_panel()
+
 # --- NEU: Progress Bar unten (fixed) ---
 # Zeigt 100% nach Generierung, sonst 0%
 if st.session_state.get("grouped"):
@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Benchmarks für core (starten mit: python -m benchmarks.<modul>)
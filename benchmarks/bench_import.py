@@ -0,0 +1,87 @@
+# benchmarks/bench_import.py
+"""
+Import-Zeit: "import core" (und weitere Module) jeweils in einem frischen Interpreter, bestes von N Läufen.
+Prüft zusätzlich, dass der Import keine Untermodule lädt bzw. keine Ordner anlegt (NEWS_PARSER_BASE_DIR zeigt
+auf einen noch nicht existierenden Ordner), und zeigt die teuersten Module laut -X importtime.
+Start: python -m benchmarks.bench_import [--repeat 10] [--modules core,core.processor,core.cache] [--max-ms 20]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Im Kindprozess: Import messen, danach geladene core-Module ausgeben
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": sorted(m for m in sys.modules if m == "core" or m.startswith("core."))}}))
+"""
+
+
+def measure(module: str, repeat: int, base_dir: str) -> Tuple[float, List[str]]:
+    """(beste Import-Zeit in Sekunden, geladene core-Module) aus repeat frischen Interpretern."""
+    env = dict(os.environ, NEWS_PARSER_BASE_DIR=base_dir, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+    best = float("inf")
+    modules: List[str] = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)], env=env, cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        best = min(best, result["seconds"])
+        modules = result["modules"]
+    return best, modules
+
+
+def importtime_top(module: str, base_dir: str, top: int) -> List[Tuple[int, str]]:
+    """[(kumulierte µs, Modul)] der teuersten Module laut python -X importtime."""
+    env = dict(os.environ, NEWS_PARSER_BASE_DIR=base_dir, PYTHONPATH=ROOT)
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, cwd=ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    rows: List[Tuple[int, str]] = []
+    for line in err.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--modules", default="core,core.processor,core.cache")
+    ap.add_argument("--top", type=int, default=8, help="Teuerste Module pro Import anzeigen")
+    ap.add_argument("--max-ms", type=float, default=None, help="Exit-Code 1, wenn 'import core' länger dauert")
+    args = ap.parse_args()
+
+    failed = False
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = os.path.join(tmp, "base")  # Existiert nicht: jeder angelegte Ordner fällt auf
+        for module in [m.strip() for m in args.modules.split(",") if m.strip()]:
+            seconds, modules = measure(module, args.repeat, base_dir)
+            results[module] = seconds
+            print(f"\nimport {module}: {seconds * 1000:8.2f} ms  ({len(modules)} core-Module)")
+            for cumulative, name in importtime_top(module, base_dir, args.top):
+                print(f"  {cumulative / 1000:8.2f} ms  {name}")
+            if module == "core" and modules != ["core"]:
+                print(f"  !! import core lädt Untermodule: {', '.join(m for m in modules if m != 'core')}")
+                failed = True
+        if os.path.exists(base_dir):
+            print(f"\n!! Import hat Ordner angelegt: {', '.join(sorted(os.listdir(base_dir))) or base_dir}")
+            failed = True
+    if args.max_ms is not None and results.get("core", 0) * 1000 > args.max_ms:
+        print(f"\n!! import core: {results['core'] * 1000:.2f} ms > {args.max_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
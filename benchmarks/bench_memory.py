@@ -0,0 +1,97 @@
+# benchmarks/bench_memory.py
+"""
+Speicher-Vergleich: altes Dict-Modell (raw-Kopie pro Artikel) vs. Article (Offsets in gemeinsamen Puffer).
+Start: python -m benchmarks.bench_memory [--articles 5000]
+"""
+import argparse
+import gc
+import os
+import re
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List
+
+from core.parser import load_articles
+from core.processor import create_working_copy
+
+from .corpus import generate_digest
+
+
+def legacy_split_into_raw_blocks(text: str) -> List[str]:
+    """Bisheriger Split (Regex, Fallback mit zweitem Split über den ganzen Text)."""
+    blocks = re.split(r"\s*\n?<!--split-->\s*\n?", text)
+    blocks = [b.strip() for b in blocks if len(b.strip()) >= 5]
+    if len(blocks) == 1:
+        sub_parts = re.split(r'\n######\s', text)
+        if len(sub_parts) > 1:
+            blocks = [f"###### {sub_parts[i].strip()}" for i in range(1, len(sub_parts))]
+    return blocks
+
+
+def legacy_parse_comment_block(comment: str):
+    """Bisheriges parse_comment_block (lower() + split pro Zeile)."""
+    cats, tags, orte = [], [], []
+    for line in [l.strip() for l in comment.splitlines() if l.strip()]:
+        if line.lower().startswith("categories:"):
+            cats = [p.strip() for p in line.split(":", 1)[1].split(",") if p.strip()]
+        elif line.lower().startswith("tags:"):
+            tags = [p.strip() for p in line.split(":", 1)[1].split(",") if p.strip()]
+        elif line.lower().startswith("orte:"):
+            orte = [p.strip() for p in line.split(":", 1)[1].split(",") if p.strip()]
+    return cats, tags, orte
+
+
+def legacy_parse(text: str) -> List[Dict]:
+    """Bisheriges Modell: ein Dict mit voller raw-Kopie pro Block (wie parse_articles_from_text vor Article)."""
+    articles = []
+    for block in legacy_split_into_raw_blocks(text):
+        t_m = re.search(r"######\s*(.+?)\n", block)
+        if not t_m:
+            continue
+        com_m = re.search(r"<!--(.*?)-->", block, re.DOTALL)
+        cats, tags, orte = legacy_parse_comment_block(com_m.group(1).strip() if com_m else "")
+        articles.append({"title": t_m.group(1).strip(), "categories": cats, "tags": tags, "orte": orte, "raw": block + "\n"})
+    return articles
+
+
+def measure(load: Callable[[], object]) -> Dict[str, float]:
+    """Gehaltener Speicher (Ergebnis bleibt referenziert) und Peak in MB."""
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"retained_mb": retained / 2**20, "peak_mb": peak / 2**20}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--articles", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = generate_digest(args.articles, seed=args.seed)
+        wp = create_working_copy(src, "bench.md", tmp)
+        del src
+
+        def dict_model():
+            with open(wp, "r", encoding="utf-8") as f:
+                text = f.read()
+            return text, legacy_parse(text)  # Text bleibt (wie src_text in der Session) zusätzlich gehalten
+
+        results = {
+            "dict (raw-Kopien)": measure(dict_model),
+            "Article (memoryview)": measure(lambda: load_articles(wp)),
+            "Article (mmap)": measure(lambda: load_articles(wp, use_mmap=True)),
+        }
+        size_mb = os.path.getsize(wp) / 2**20
+
+    print(f"Working Copy: {size_mb:.1f} MB, {args.articles} Artikel")
+    for name, r in results.items():
+        print(f"{name:<22} gehalten {r['retained_mb']:8.1f} MB   Peak {r['peak_mb']:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
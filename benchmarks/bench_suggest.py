@@ -0,0 +1,50 @@
+# benchmarks/bench_suggest.py
+"""
+Micro-Benchmark Kategorie-Vorschläge: Training aus einem synthetischen Digest, Laden (mmap) und Bewertung eines Uploads.
+Start: python -m benchmarks.bench_suggest [--train 20000] [--articles 2000] [--repeat 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from core.parser import parse_articles_from_text
+from core.processor import clean_source_text
+from core.suggest import MODEL_FILE, CategoryModel, np, sparse
+
+from .corpus import generate_digest
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--train", type=int, default=20000, help="Artikel im Trainings-Digest")
+    ap.add_argument("--articles", type=int, default=2000, help="Artikel im bewerteten Upload")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    training = parse_articles_from_text(clean_source_text(generate_digest(args.train, seed=1)))
+    upload = parse_articles_from_text(clean_source_text(generate_digest(args.articles, seed=2)))
+    started = time.perf_counter()
+    model = CategoryModel.train(training)
+    print(f"Training:  {time.perf_counter() - started:8.3f} s  ({model.info['documents']} Artikel, {len(model.vocab)} Wörter)")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, MODEL_FILE)
+        model.save(path)
+        started = time.perf_counter()
+        loaded = CategoryModel.load(path)
+        print(f"Laden:     {(time.perf_counter() - started) * 1000:8.2f} ms  ({os.path.getsize(path) / 1e6:.1f} MB)")
+        best = {"term_counts": float("inf"), "scores": float("inf"), "suggest": float("inf")}
+        for _ in range(args.repeat):
+            for name in best:
+                started = time.perf_counter()
+                getattr(loaded, name)(upload)
+                best[name] = min(best[name], time.perf_counter() - started)
+        print(f"Wörter zählen:        {best['term_counts'] * 1000:8.2f} ms")
+        print(f"TF-IDF + Multiplikation: {(best['scores'] - best['term_counts']) * 1000:8.2f} ms")
+        print(f"suggest gesamt:       {best['suggest'] * 1000:8.2f} ms  ({args.articles} Artikel, "
+              f"{'SciPy' if sparse is not None else 'NumPy' if np is not None else 'reines Python'})")
+        loaded.close()
+
+
+if __name__ == "__main__":
+    main()
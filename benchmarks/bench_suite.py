@@ -0,0 +1,193 @@
+# benchmarks/bench_suite.py
+"""
+Benchmark-Suite: Laufzeit (bestes von N) und Speicher-Peak der Kernstufen für mehrere Korpusgrößen,
+Ergebnis als JSON – zum Vergleich zwischen Commits (--compare mit einer früheren Ergebnisdatei).
+Gemessen: parse_articles_from_text, validate_and_correct_categories, generate_output, update_working_copy,
+jeder Output-Schritt (step1..step7) sowie die Pipeline fused/stepwise (inkl. Prüfung auf identisches Ergebnis),
+step4 und die Pipeline zusätzlich mit dem MetaAggregate aus generate_output (ohne Kommentar-Scan).
+Start: python -m benchmarks.bench_suite [--sizes 10,1000,10000] [--repeat 3] [--out ergebnis.json] [--compare alt.json]
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.article import MetaAggregate, write_raw_blocks
+from core.config import get_config, set_config
+from core.output_processor import DEFAULT_STEP_ORDER, STEP_FUNCTIONS, compile_pipeline
+from core.parser import parse_articles_from_text, validate_and_correct_categories
+from core.processor import clean_source_text, create_working_copy, generate_output, update_working_copy
+
+from .corpus import generate_digest
+
+RESULTS_FORMAT = 1
+_FM_ARGS = ("Benchmark", 2025, 10, 31, 2025, 10)
+
+
+def run_bench(fn: Callable[[Any], Any], setup: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """setup() liefert das Argument für fn (nicht gemessen); Zeiten aus repeat Läufen, Peak aus einem Extra-Lauf."""
+    times: List[float] = []
+    for _ in range(repeat):
+        arg = setup()
+        gc.collect()
+        started = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - started)
+    # Speicher separat: tracemalloc verlangsamt die Allokationen und würde die Zeiten verfälschen
+    arg = setup()
+    gc.collect()
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "seconds_median": statistics.median(times), "peak_mb": peak / 2**20}
+
+
+def bench_size(n_articles: int, seed: int, repeat: int, select: float, tmp: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """Alle Benchmarks für eine Korpusgröße; zweiter Rückgabewert: fused == stepwise."""
+    src = generate_digest(n_articles, seed=seed, typo_rate=0.02)
+    text = clean_source_text(src)
+    wc_path = create_working_copy(src, f"bench_{n_articles}.md", tmp)
+    articles = parse_articles_from_text(text)
+    validate_and_correct_categories(articles)  # korrigierte Artikel für die Folgestufen
+    selected = articles[:max(1, int(len(articles) * select))]
+    titles = {a["title"] for a in selected}
+    buf = io.StringIO()
+    meta = MetaAggregate()
+    write_raw_blocks(buf, selected, meta)  # Wie generate_output: Felder im selben Durchlauf gesammelt
+    raw_output = buf.getvalue()
+
+    runs = {"n": 0}
+
+    def fresh_dir() -> str:
+        runs["n"] += 1
+        path = os.path.join(tmp, f"out_{n_articles}_{runs['n']}")
+        os.makedirs(path)
+        return path
+
+    def fresh_working_copy() -> str:
+        runs["n"] += 1
+        path = os.path.join(tmp, f"wc_{n_articles}_{runs['n']}.md")
+        shutil.copyfile(wc_path, path)
+        return path
+
+    benches: List[Tuple[str, Callable[[Any], Any], Callable[[], Any], int]] = [
+        ("parse_articles_from_text", parse_articles_from_text, lambda: text, len(text)),
+        # Frische Artikel pro Lauf: validate korrigiert in-place
+        ("validate_and_correct_categories", validate_and_correct_categories,
+         lambda: parse_articles_from_text(text), len(text)),
+        ("generate_output", lambda out_dir: generate_output(selected, "Benchmark", 2025, 10, out_dir),
+         fresh_dir, len(raw_output)),
+        ("update_working_copy", lambda path: update_working_copy(path, titles),
+         fresh_working_copy, os.path.getsize(wc_path)),
+    ]
+    for name in DEFAULT_STEP_ORDER:
+        step = STEP_FUNCTIONS[name]
+        fn = (lambda t, step=step: step(t, *_FM_ARGS)) if name == "step4" else step
+        benches.append((f"output_processor.{name}", fn, lambda: raw_output, len(raw_output)))
+    pipeline = compile_pipeline(DEFAULT_STEP_ORDER)
+    benches.append(("pipeline.fused", lambda t: pipeline.run(t, *_FM_ARGS), lambda: raw_output, len(raw_output)))
+    benches.append(("pipeline.stepwise", lambda t: pipeline.run_stepwise(t, *_FM_ARGS), lambda: raw_output, len(raw_output)))
+    # step4 mit dem MetaAggregate aus generate_output statt Kommentar-Scan (so läuft es in run_generation)
+    benches.append(("output_processor.step4_meta", lambda t: STEP_FUNCTIONS["step4"](t, *_FM_ARGS, meta),
+                    lambda: raw_output, len(raw_output)))
+    benches.append(("pipeline.fused_meta", lambda t: pipeline.run(t, *_FM_ARGS, meta=meta), lambda: raw_output, len(raw_output)))
+
+    results = []
+    for name, fn, setup, size in benches:
+        r = run_bench(fn, setup, repeat)
+        results.append({
+            "bench": name, "articles": n_articles, "bytes": size, **{k: round(v, 6) for k, v in r.items()},
+            "articles_per_second": round(n_articles / r["seconds"], 1) if r["seconds"] else None,
+        })
+    equivalent = (pipeline.run(raw_output, *_FM_ARGS) == pipeline.run_stepwise(raw_output, *_FM_ARGS)
+                  and pipeline.run(raw_output, *_FM_ARGS, meta=meta) == pipeline.run_stepwise(raw_output, *_FM_ARGS, meta=meta))
+    return results, equivalent
+
+
+def git_commit() -> Tuple[Optional[str], bool]:
+    """(Commit-Hash, Arbeitsbaum geändert) – (None, False) außerhalb eines Git-Repos."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[Tuple[str, int, float, float]]:
+    """[(bench, articles, Zeit-Faktor neu/alt, Peak-Faktor neu/alt)] für alle Benchmarks in beiden Dateien."""
+    old_by_key = {(r["bench"], r["articles"]): r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        o = old_by_key.get((r["bench"], r["articles"]))
+        if o is None or not o["seconds"]:
+            continue
+        peak_ratio = r["peak_mb"] / o["peak_mb"] if o["peak_mb"] else 1.0
+        rows.append((r["bench"], r["articles"], r["seconds"] / o["seconds"], peak_ratio))
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", default="10,1000,10000", help="Artikelanzahlen, kommagetrennt (10 .. 100000)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--select", type=float, default=0.5, help="Anteil der Artikel im Output")
+    ap.add_argument("--out", default=None, help="Ergebnisdatei (Default: bench_{commit}.json)")
+    ap.add_argument("--compare", default=None, help="Frühere Ergebnisdatei zum Vergleich")
+    ap.add_argument("--fail-above", type=float, default=None,
+                    help="Exit-Code 1, wenn ein Benchmark um mehr als diesen Faktor langsamer ist (z.B. 1.2)")
+    args = ap.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    commit, dirty = git_commit()
+    report: Dict[str, Any] = {
+        "format": RESULTS_FORMAT, "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit, "dirty": dirty, "python": platform.python_version(), "platform": platform.platform(),
+        "seed": args.seed, "repeat": args.repeat, "select": args.select, "pipeline_equivalent": True, "results": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        # Korrektur-Memos nicht im echten Vokabular-Ordner ablegen
+        set_config(get_config().replace(vocab_dir=os.path.join(tmp, "vocab")))
+        for n in sizes:
+            results, equivalent = bench_size(n, args.seed, args.repeat, args.select, tmp)
+            report["results"].extend(results)
+            report["pipeline_equivalent"] &= equivalent
+            print(f"\n{n} Artikel" + ("" if equivalent else "  !! fused != stepwise"))
+            for r in results:
+                print(f"  {r['bench']:<34} {r['seconds'] * 1000:10.2f} ms   Peak {r['peak_mb']:8.2f} MB")
+
+    out = args.out or f"bench_{commit or 'local'}{'-dirty' if dirty else ''}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nErgebnis: {out}")
+
+    failed = not report["pipeline_equivalent"]
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        print(f"\nVergleich mit {args.compare} (Commit {old.get('commit')}): Faktor neu/alt")
+        for name, n, t_ratio, m_ratio in compare(old, report):
+            slower = args.fail_above is not None and t_ratio > args.fail_above
+            failed |= slower
+            print(f"  {name:<34} {n:>7}   Zeit {t_ratio:6.2f}x   Peak {m_ratio:6.2f}x" + ("  <-- langsamer" if slower else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_tokenizer.py
+"""
+Micro-Benchmark Parser: Artikel pro Sekunde vorher (Regex-Split + Dict-Modell) vs. Tokenizer.
+Start: python -m benchmarks.bench_tokenizer [--articles 10000] [--repeat 5]
+"""
+import argparse
+import time
+from typing import Callable
+
+from core.parser import parse_articles_from_text, tokenize
+from core.processor import clean_source_text
+
+from .bench_memory import legacy_parse
+from .corpus import generate_digest
+
+
+def articles_per_second(fn: Callable[[str], object], text: str, n_articles: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return n_articles / best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--articles", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    text = clean_source_text(generate_digest(args.articles, seed=args.seed))
+    candidates = {
+        "vorher (legacy_parse)": legacy_parse,
+        "tokenize() (Generator)": lambda t: sum(1 for _ in tokenize(t)),
+        "parse_articles_from_text": parse_articles_from_text,
+    }
+    baseline = None
+    print(f"{args.articles} Artikel, {len(text) / 2**20:.1f} MB, bestes von {args.repeat}")
+    for name, fn in candidates.items():
+        rate = articles_per_second(fn, text, args.articles, args.repeat)
+        baseline = baseline or rate
+        print(f"{name:<26} {rate:10.0f} Artikel/s   x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
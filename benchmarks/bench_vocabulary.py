@@ -0,0 +1,68 @@
+# benchmarks/bench_vocabulary.py
+"""
+Micro-Benchmark Vokabular-Abgleich: difflib.get_close_matches gegen alle Begriffe vs. VocabularyMatcher (Trigramm-Index).
+Start: python -m benchmarks.bench_vocabulary [--terms 20000] [--queries 500]
+"""
+import argparse
+import difflib
+import random
+import time
+from typing import List
+
+from core.vocabulary import VocabularyMatcher
+
+_ONSETS = ["b", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t", "w", "z", "sch", "st", "br", "kr", "pf"]
+_VOWELS = ["a", "e", "i", "o", "u", "ä", "ö", "ü", "au", "ei"]
+_CODAS = ["", "", "n", "r", "l", "ch", "ck", "rg", "ld", "ng", "tz"]
+
+
+def generate_terms(n: int, seed: int = 0) -> List[str]:
+    """Synthetische Ortsnamen (2-4 Silben)."""
+    rnd = random.Random(seed)
+    terms = set()
+    while len(terms) < n:
+        syllables = (rnd.choice(_ONSETS) + rnd.choice(_VOWELS) + rnd.choice(_CODAS) for _ in range(rnd.randint(2, 4)))
+        terms.add("".join(syllables).capitalize())
+    return sorted(terms)
+
+
+def typo(term: str, rnd: random.Random) -> str:
+    i = rnd.randrange(len(term))
+    return term[:i] + rnd.choice("aeiounrst") + term[i + 1:]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--terms", type=int, default=20000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    terms = generate_terms(args.terms, args.seed)
+    queries = [typo(rnd.choice(terms), rnd) for _ in range(args.queries)]
+
+    started = time.perf_counter()
+    expected = [next(iter(difflib.get_close_matches(q, terms, n=1, cutoff=0.8)), None) for q in queries]
+    t_difflib = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = VocabularyMatcher(terms)
+    t_index = time.perf_counter() - started
+    started = time.perf_counter()
+    got = [matcher.match(q) for q in queries]
+    t_match = time.perf_counter() - started
+    started = time.perf_counter()
+    for q in queries:
+        matcher.match(q)
+    t_memo = time.perf_counter() - started
+
+    print(f"{args.terms} Begriffe, {args.queries} Anfragen, identische Treffer: {got == expected}")
+    print(f"difflib (alle Begriffe)      {t_difflib:8.3f} s")
+    print(f"Index aufbauen               {t_index:8.3f} s")
+    print(f"VocabularyMatcher            {t_match:8.3f} s   x{t_difflib / t_match:.1f}")
+    print(f"VocabularyMatcher (Memo)     {t_memo:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/corpus.py
+"""
+Synthetische News-Digests für Benchmarks (reproduzierbar über seed).
+Start (Datei schreiben): python -m benchmarks.corpus --articles 100000 --out digest.md [--seed 0] [--typo-rate 0.02]
+"""
+import argparse
+import random
+from typing import IO, Iterator, List
+
+from core.parser import ALLOWED_CATEGORIES
+
+_WORDS = [
+    "Stadt", "Rat", "beschließt", "neue", "Regeln", "für", "Verkehr", "Klima", "Schule", "Bürger", "Protest",
+    "Energie", "Preise", "steigen", "Forschung", "zeigt", "Gesundheit", "Kultur", "Fest", "Gericht", "Urteil",
+    "über", "Straße", "Wald", "Wasser", "Projekt", "„Zukunft“", "Initiative", "–", "Öffentlichkeit", "Daten",
+]
+_TAGS = ["Klima", "Radverkehr", "Schule", "Wohnen", "Wahl", "Wasser", "KI", "Landwirtschaft", "Bahn", "Demo"]
+_ORTE = ["Berlin", "Hamburg", "München", "Köln", "Leipzig", "Dresden", "Kastl", "Amberg", "Nürnberg"]
+# Varianten wie in echten Digests (step5 ist case-insensitive und toleriert Leerzeichen)
+_DATE_SUFFIXES = [" (*Date*)", " (*Date*)", " (*Date*)", " (*date*)", "  (*Date*) "]
+_PLACEHOLDER = '{{< my_link url="Link" >}}'
+
+
+def _typo(term: str, rnd: random.Random) -> str:
+    """Ein fehlender Buchstabe – bleibt für den Vokabular-Abgleich (cutoff 0.8) korrigierbar."""
+    i = rnd.randrange(1, len(term))
+    return term[:i] + term[i + 1:]
+
+
+def _article(i: int, rnd: random.Random, paragraphs: int, typo_rate: float) -> str:
+    title = " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(3, 8)))
+    parts: List[str] = [
+        " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(20, 60))) for _ in range(paragraphs)
+    ]
+    roll = rnd.random()
+    if roll < 0.3:
+        parts.append(_PLACEHOLDER)  # Platzhalter ohne Link (entfernt step6)
+    elif roll < 0.4:
+        parts.append(f"\t{_PLACEHOLDER}  ")
+    elif roll < 0.6:
+        parts.append(f'{{{{< my_link url="https://example.org/artikel/{i}" >}}}}')
+    body = "\n\n\n".join(parts) if rnd.random() < 0.1 else "\n\n".join(parts)  # gelegentlich doppelte Leerzeilen
+    cats = [c if rnd.random() >= typo_rate else _typo(c, rnd)
+            for c in rnd.sample(ALLOWED_CATEGORIES, rnd.randint(1, 2))]
+    tags = ", ".join(rnd.sample(_TAGS, rnd.randint(0, 3)))
+    orte = ", ".join(rnd.sample(_ORTE, rnd.randint(0, 2)))
+    return (
+        f"###### {title} {i}{rnd.choice(_DATE_SUFFIXES)}\n\n{body}\n\n"
+        f"<!--\ncategories: {', '.join(cats)}\ntags: {tags}\norte: {orte}\n-->\n"
+    )
+
+
+def iter_digest(n_articles: int, seed: int = 0, paragraphs: int = 3, typo_rate: float = 0.0,
+                year: int = 2025, month: int = 10) -> Iterator[str]:
+    """Digest stückweise (Frontmatter, dann Artikel mit <!--split--> dazwischen) – auch für 100k Artikel."""
+    rnd = random.Random(seed)
+    yield f'---\ntitle: "Digest"\nmedia:\n    path: "http://kastl/blog-bf/news/{year}/{month:02d}/"\n---\n\n'
+    for i in range(n_articles):
+        if i:
+            yield "\n<!--split-->\n\n"
+        yield _article(i, rnd, paragraphs, typo_rate)
+
+
+def generate_digest(n_articles: int, seed: int = 0, paragraphs: int = 3, typo_rate: float = 0.0) -> str:
+    """Synthetischer News-Digest: Frontmatter + n Artikel ((*Date*)-Titel, Text, my_link, Kommentar-Block) mit <!--split-->."""
+    return "".join(iter_digest(n_articles, seed, paragraphs, typo_rate))
+
+
+def write_digest(f: IO[str], n_articles: int, seed: int = 0, paragraphs: int = 3, typo_rate: float = 0.0) -> None:
+    for piece in iter_digest(n_articles, seed, paragraphs, typo_rate):
+        f.write(piece)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--articles", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--paragraphs", type=int, default=3)
+    ap.add_argument("--typo-rate", type=float, default=0.0, help="Anteil falsch geschriebener Kategorien")
+    ap.add_argument("--out", required=True)
+    args = ap.parse_args()
+    with open(args.out, "w", encoding="utf-8", newline="\n") as f:
+        write_digest(f, args.articles, args.seed, args.paragraphs, args.typo_rate)
+    print(f"{args.articles} Artikel -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,36 @@
-from .parser import parse_articles_from_text, validate_and_correct_categories
-from .processor import create_working_copy, extract_year_month, generate_output, update_working_copy
-from .utils import slugify, make_key, build_frontmatter
\ No newline at end of file
+# core/__init__.py
+"""
+Öffentliche API, lazy geladen: "import core" lädt noch kein Untermodul und legt keine Ordner an;
+core.generate_output usw. importieren ihr Modul beim ersten Zugriff (PEP 562, Modul-__getattr__).
+"""
+import importlib
+
+_EXPORTS = {
+    "parse_articles_from_text": "parser",
+    "validate_and_correct_categories": "parser",
+    "create_working_copy": "processor",
+    "extract_year_month": "processor",
+    "generate_output": "processor",
+    "update_working_copy": "processor",
+    "slugify": "utils",
+    "make_key": "utils",
+    "build_frontmatter": "utils",
+    "Config": "config",
+    "get_config": "config",
+    "set_config": "config",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # Weitere Zugriffe ohne __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,142 @@
+# core/archive.py
+"""
+Index bereits veröffentlichter Artikel: Fingerprints (normalisierter Titel, normalisierter Text) aller Artikel,
+die generate_output geschrieben hat – als Append-only-Datei published_index.tsv in OUTPUT_DIR.
+
+- Pro Output wird einmal angehängt (kein Scan des Ordners), Lookups gehen über Dicts im Speicher (O(1) pro Artikel).
+- Zeilenformat: {art}\t{fingerprint}\t{output}  (art: t = Titel, b = Text)
+- Andere Prozesse (CLI, weitere App-Instanzen) hängen an dieselbe Datei an; refresh() liest nur den neuen Teil.
+"""
+import os
+import re
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .article import Article
+from .utils import get_base_dir
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_INDEX_FILE = "published_index.tsv"
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_DATE_SUFFIX_RE = re.compile(r"\s*\(\*date\*\)\s*$", re.IGNORECASE)
+_PLACEHOLDER_RE = re.compile(r'\{\{<\s*my_link\s+url="Link"\s*>\}\}')
+
+
+def text_fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def normalize_title(title: str) -> str:
+    """Ohne (*Date*), Whitespace zusammengefasst, Groß/Klein egal."""
+    return " ".join(_DATE_SUFFIX_RE.sub("", title).split()).casefold()
+
+
+def normalize_body(raw: str) -> str:
+    """
+    Text ohne Titelzeile, Kommentar-Blöcke und my_link-Platzhalter; Whitespace zusammengefasst.
+    Damit gleichen sich Roh-Block (Upload) und post-prozessierter Output (Leerzeilen, Platzhalter entfernt).
+    """
+    if raw.lstrip().startswith("######"):
+        newline = raw.find("\n")
+        raw = raw[newline + 1:] if newline >= 0 else ""
+    text = _PLACEHOLDER_RE.sub("", _COMMENT_RE.sub("", raw))
+    return " ".join(text.split()).casefold()
+
+
+def article_fingerprints(article: Article) -> Tuple[str, Optional[str]]:
+    """(Titel-Fingerprint, Text-Fingerprint oder None bei leerem Text)."""
+    body = normalize_body(article.raw)
+    return text_fingerprint(normalize_title(article.title)), (text_fingerprint(body) if body else None)
+
+
+class PublishedIndex:
+    """Fingerprint -> Output-Datei, für Titel und Text getrennt."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._titles: Dict[str, str] = {}
+        self._bodies: Dict[str, str] = {}
+        self._offset = 0  # Bis hier gelesen (nur vollständige Zeilen)
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def refresh(self) -> None:
+        """Liest Zeilen, die seit dem letzten Aufruf (auch von anderen Prozessen) angehängt wurden."""
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            except OSError as e:
+                logger.warning(f"Veröffentlichungs-Index nicht lesbar: {e}")
+                return
+            end = data.rfind(b"\n") + 1  # Unvollständige letzte Zeile (Schreiber noch aktiv) später lesen
+            for line in data[:end].decode("utf-8", "replace").splitlines():
+                parts = line.split("\t")
+                if len(parts) != 3:
+                    continue
+                kind, fp, output = parts
+                (self._titles if kind == "t" else self._bodies).setdefault(fp, output)
+            self._offset += end
+
+    def add_output(self, output_name: str, articles: Iterable[Article]) -> int:
+        """Hängt die Fingerprints aller Artikel eines Outputs an (ein Schreibvorgang), gibt die Anzahl zurück."""
+        lines: List[str] = []
+        for a in articles:
+            title_fp, body_fp = article_fingerprints(a)
+            lines.append(f"t\t{title_fp}\t{output_name}\n")
+            if body_fp:
+                lines.append(f"b\t{body_fp}\t{output_name}\n")
+        if not lines:
+            return 0
+        self.refresh()  # Eigene Zeilen nicht doppelt einlesen: Offset vor dem Anhängen nachziehen
+        payload = "".join(lines).encode("utf-8")
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(payload)
+                end = f.tell()
+            for line in lines:
+                kind, fp, output = line.rstrip("\n").split("\t")
+                (self._titles if kind == "t" else self._bodies).setdefault(fp, output)
+            # Nur vorrücken, wenn niemand dazwischen angehängt hat – sonst liest refresh() den Rest (setdefault: idempotent)
+            if end == self._offset + len(payload):
+                self._offset = end
+        return len(lines)
+
+    def lookup(self, article: Article) -> Optional[str]:
+        """Output-Datei, in der der Artikel (gleicher Titel oder gleicher Text) schon erschienen ist, sonst None."""
+        title_fp, body_fp = article_fingerprints(article)
+        return self._titles.get(title_fp) or (self._bodies.get(body_fp) if body_fp else None)
+
+    def published_in(self, articles: Iterable[Article]) -> Dict[str, str]:
+        """Titel -> Output-Datei für alle bereits veröffentlichten Artikel (liest vorher neue Einträge ein)."""
+        self.refresh()
+        found: Dict[str, str] = {}
+        for a in articles:
+            output = self.lookup(a)
+            if output:
+                found[a.title] = output
+        return found
+
+
+_indexes: Dict[str, PublishedIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_published_index(base_dir: Optional[str] = None) -> PublishedIndex:
+    """Prozessweiter Index pro Ausgabe-Ordner (geteilt zwischen Streamlit-Sessions); None = Ausgabe-Ordner der Konfiguration."""
+    path = os.path.join(base_dir or get_base_dir(), PUBLISHED_INDEX_FILE)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = PublishedIndex(path)
+        return _indexes[path]
@@ -0,0 +1,218 @@
+# core/article.py
+import mmap
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# Feld-Namen, die wie bisher per a["..."] lesbar sind (Kompatibilität zum alten Dict-Modell)
+ARTICLE_FIELDS = ("title", "categories", "tags", "orte", "raw", "source_file")
+_MUTABLE_FIELDS = ("categories", "tags", "orte")
+
+Buffer = Union[str, memoryview, mmap.mmap]
+ArticleRef = Tuple[Optional[str], int]  # (Quelldatei, Artikel-ID in ihrer Working Copy) – Titel sind nicht eindeutig
+
+
+def translate_newlines(text: str) -> str:
+    """\\r\\n und einzelne \\r -> \\n (wie der Textmodus von open())."""
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class ArticleSource:
+    """
+    Gemeinsamer Quell-Puffer für alle Artikel eines Textes.
+    - str: Offsets sind Zeichen-Offsets.
+    - memoryview/mmap der Datei: Offsets sind Byte-Offsets (UTF-8), Text wird erst beim Zugriff dekodiert.
+    """
+    __slots__ = ("buffer", "path", "__weakref__")
+
+    def __init__(self, buffer: Buffer, path: Optional[str] = None):
+        self.buffer = buffer
+        self.path = path
+
+    @classmethod
+    def from_text(cls, text: str) -> "ArticleSource":
+        return cls(text)
+
+    @classmethod
+    def from_file(cls, path: str, use_mmap: bool = False) -> "ArticleSource":
+        """
+        Lädt die Datei als Byte-Puffer (memoryview, mit use_mmap=True als mmap).
+        mmap nur für Dateien, die während der Nutzung nicht überschrieben werden.
+        Dateien mit \\r werden wie im Textmodus übersetzt und als str gehalten (Offsets sonst nicht abbildbar).
+        """
+        with open(path, "rb") as f:
+            if use_mmap and f.seek(0, 2) > 0:  # Leere Datei lässt sich nicht mappen
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                f.seek(0)
+                data = f.read()
+        if data.find(b"\r") >= 0:
+            text = translate_newlines(str(data[:], "utf-8"))
+            if isinstance(data, mmap.mmap):
+                data.close()
+            return cls(text, path)
+        return cls(data if isinstance(data, mmap.mmap) else memoryview(data), path)
+
+    @classmethod
+    def from_cleaned_text(cls, text: str) -> "ArticleSource":
+        """Wie from_file für eine im Speicher bereinigte Quelle: Zeilenumbrüche wie im Textmodus (\\r\\n, \\r -> \\n)."""
+        return cls(translate_newlines(text))
+
+    @property
+    def is_text(self) -> bool:
+        return isinstance(self.buffer, str)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def slice(self, start: int, end: int) -> str:
+        """Materialisiert einen Ausschnitt als str."""
+        if self.is_text:
+            return self.buffer[start:end]
+        return str(self.buffer[start:end], "utf-8")
+
+    def text(self) -> str:
+        """Gesamter Text (Kopie, nur für Parser/Debug)."""
+        return self.slice(0, len(self.buffer))
+
+    def close(self) -> None:
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+class ByteOffsets:
+    """Rechnet Zeichen-Offsets eines Textes in UTF-8-Byte-Offsets um (inkrementell, für nahe beieinanderliegende Offsets)."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.ascii = text.isascii()
+        self.char = 0
+        self.byte = 0
+
+    def __call__(self, pos: int) -> int:
+        if self.ascii:
+            return pos
+        if pos >= self.char:
+            self.byte += len(self.text[self.char:pos].encode("utf-8"))
+        else:
+            self.byte -= len(self.text[pos:self.char].encode("utf-8"))
+        self.char = pos
+        return self.byte
+
+
+class Article:
+    """
+    Kompakter Artikel: (start, end) in einen gemeinsamen Quell-Puffer statt eigener raw-Kopie.
+    raw = [Header-Präfix] + Puffer[start:end] + "\\n", wird erst beim Zugriff erzeugt.
+    Lesbar wie das alte Dict-Modell (a["title"], a["raw"], ...).
+    """
+    __slots__ = (
+        "source", "start", "end", "title_start", "title_end", "meta_start", "meta_end",
+        "header_prefix", "categories", "tags", "orte", "source_file", "article_id", "_title",
+    )
+
+    HEADER_PREFIX = "###### "
+
+    def __init__(self, source: ArticleSource, start: int, end: int, title_span: Tuple[int, int],
+                 meta_span: Tuple[int, int], categories: List[str], tags: List[str], orte: List[str],
+                 header_prefix: bool = False):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.title_start, self.title_end = title_span
+        self.meta_start, self.meta_end = meta_span
+        self.header_prefix = header_prefix
+        self.categories = [sys.intern(c) for c in categories]
+        self.tags = [sys.intern(t) for t in tags]
+        self.orte = [sys.intern(o) for o in orte]
+        self.source_file: Optional[str] = None  # Name der hochgeladenen Datei (Mehrfach-Upload)
+        self.article_id: Optional[int] = None   # Position in der Working Copy (vom Store gesetzt)
+        self._title: Optional[str] = None
+
+    @property
+    def title(self) -> str:
+        if self._title is None:
+            self._title = self.source.slice(self.title_start, self.title_end)
+        return self._title
+
+    @property
+    def ref(self) -> ArticleRef:
+        """Identität in einer Auswahl über mehrere Dateien: (Quelldatei, Artikel-ID)."""
+        return (self.source_file, self.article_id)
+
+    @property
+    def raw(self) -> str:
+        body = self.source.slice(self.start, self.end)
+        return (self.HEADER_PREFIX + body if self.header_prefix else body) + "\n"
+
+    @property
+    def comment(self) -> str:
+        """Inhalt des (ersten) Kommentar-Blocks, aus dem Cats/Tags/Orte stammen."""
+        return self.source.slice(self.meta_start, self.meta_end).strip()
+
+    def copy(self) -> "Article":
+        """Unabhängige Kopie (eigene Listen), gleicher Quell-Puffer – z.B. für eine weitere Session."""
+        clone = Article(self.source, self.start, self.end, (self.title_start, self.title_end),
+                        (self.meta_start, self.meta_end), self.categories, self.tags, self.orte,
+                        header_prefix=self.header_prefix)
+        clone.source_file = self.source_file
+        clone.article_id = self.article_id
+        clone._title = self._title
+        return clone
+
+    def __getitem__(self, key: str):
+        if key not in ARTICLE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: List[str]) -> None:
+        if key not in _MUTABLE_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in ARTICLE_FIELDS else default
+
+    def to_dict(self) -> Dict:
+        """Altes Dict-Format (materialisiert raw)."""
+        return {"title": self.title, "categories": self.categories, "tags": self.tags, "orte": self.orte, "raw": self.raw}
+
+    def __repr__(self) -> str:
+        return f"Article({self.title!r}, {self.start}:{self.end})"
+
+
+class MetaAggregate:
+    """
+    Vereinigung von categories/tags/orte mehrerer Artikel als Sets – für das Frontmatter eines Outputs.
+    Kommt aus den beim Parsen (und Validieren) gesetzten Feldern, nicht aus einem erneuten Scan der Kommentare.
+    """
+    __slots__ = ("categories", "tags", "orte")
+
+    def __init__(self, articles: Iterable[Article] = ()):
+        self.categories: Set[str] = set()
+        self.tags: Set[str] = set()
+        self.orte: Set[str] = set()
+        for a in articles:
+            self.add(a)
+
+    def add(self, article: Article) -> None:
+        self.categories.update(article.categories)
+        self.tags.update(article.tags)
+        self.orte.update(article.orte)
+
+    def __repr__(self) -> str:
+        return f"MetaAggregate({len(self.categories)} Kategorien, {len(self.tags)} Tags, {len(self.orte)} Orte)"
+
+
+def write_raw_blocks(f, articles: Iterable[Article], meta: Optional[MetaAggregate] = None) -> None:
+    """
+    Schreibt raw-Blöcke mit <!--split--> dazwischen; raw wird erst hier (pro Artikel) materialisiert.
+    meta: sammelt im selben Durchlauf categories/tags/orte der geschriebenen Artikel.
+    """
+    for i, a in enumerate(articles):
+        if i:
+            f.write("\n\n<!--split-->\n\n")  # Split-Marker für Trennung (inkl. Leerzeilen)
+        f.write(a.raw)
+        if meta is not None:
+            meta.add(a)
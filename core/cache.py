@@ -0,0 +1,384 @@
+# core/cache.py
+import io
+import os
+import json
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, List, Optional, Tuple, Union
+
+from .article import Article, ArticleSource
+from .metrics import span
+from .parser import get_vocabulary_matchers, parse_articles, validate_and_correct_categories
+from .processor import SourceCleaner, working_copy_path, write_working_copy
+from .streaming import iter_chunks
+from .sqlite_store import SQLITE_SUFFIX, SqliteWorkingCopyStore
+from .working_copy import INDEX_SUFFIX, WorkingCopySet, WorkingCopyStore, read_manifest, store_backend
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+_CACHE_FORMAT = 1
+
+
+class ParsedSource:
+    """Fertig geparste + validierte Quelle: Working-Copy-Inhalt (gemeinsamer Puffer), Artikel, Korrekturen, Jahr/Monat."""
+    __slots__ = ("key", "year", "month", "source", "articles", "corrections_str", "size")
+
+    def __init__(self, key: str, year: int, month: int, source: ArticleSource, articles: List[Article], corrections_str: str):
+        self.key = key
+        self.year = year
+        self.month = month
+        self.source = source
+        self.articles = articles
+        self.corrections_str = corrections_str
+        self.size = len(source.buffer)
+
+    def write_working_copy(self, path: str) -> None:
+        """Schreibt den (bereits bereinigten) Working-Copy-Inhalt 1:1 nach path."""
+        if self.source.is_text:
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                f.write(self.source.buffer)
+        else:
+            with open(path, "wb") as f:
+                f.write(self.source.buffer)
+
+    def open_working_copy(self, file_name: str, base_dir: str, backend: Optional[str] = None):
+        """
+        Neue Working Copy für eine Session – ohne erneutes Parsen (Artikel werden nur kopiert).
+        backend: "file" (Markdown + Journal) oder "sqlite"; Default aus NEWS_PARSER_STORE.
+        """
+        if (backend or store_backend()) == "sqlite":
+            return SqliteWorkingCopyStore.create(working_copy_path(file_name, base_dir, SQLITE_SUFFIX), self.articles,
+                                                 self.year, self.month, self.corrections_str, file_name)
+        path = working_copy_path(file_name, base_dir)
+        self.write_working_copy(path)
+        self.write_index(path + INDEX_SUFFIX)
+        return WorkingCopyStore(path, articles=[a.copy() for a in self.articles])
+
+    def write_index(self, path: str) -> None:
+        """Artikel-Index (Offsets + validierte Felder) als JSON, atomar – passend zu write_working_copy."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_index_of(self.year, self.month, self.corrections_str, self.source, self.articles), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def grouped(self) -> Dict[str, List[Article]]:
+        grouped: Dict[str, List[Article]] = {}
+        for a in self.articles:
+            for c in (a.categories or ["Unkategorisiert"]):
+                grouped.setdefault(c, []).append(a)
+        return grouped
+
+
+def source_key(src: Union[str, IO[bytes]]) -> str:
+    """
+    Cache-Key: Hash aus Quelltext + Vokabularen (andere Kategorien/Tags/Orte = andere Korrekturen).
+    src: Quelltext oder binäres Datei-Objekt (UTF-8, wird in Stücken gehasht und danach zurückgespult).
+    """
+    h = hashlib.sha256()
+    if isinstance(src, str):
+        h.update(src.encode("utf-8"))
+    else:
+        src.seek(0)
+        for chunk in iter_chunks(src):
+            h.update(chunk)
+        src.seek(0)
+    for field, matcher in sorted(get_vocabulary_matchers().items()):
+        h.update(f"\x00{field}:{matcher.fingerprint}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class ParseCache:
+    """
+    Prozessweiter LRU-Cache für geparste Quellen (geteilt zwischen Streamlit-Sessions).
+    Begrenzt über Anzahl Einträge und Gesamtgröße der Puffer; optional persistent unter persist_dir.
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 512 * 2**20, persist_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self._entries: "OrderedDict[str, ParsedSource]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "evictions": self.evictions, "entries": len(self._entries), "bytes": self._bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get(self, key: str) -> Optional[ParsedSource]:
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return parsed
+        parsed = self._load(key)
+        if parsed is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._put(parsed)
+        return parsed
+
+    def open_working_copy(self, src: Union[str, IO[bytes]], file_name: str, base_dir: str,
+                          backend: Optional[str] = None) -> Tuple[WorkingCopyStore, ParsedSource, bool]:
+        """
+        Working Copy für eine Session: (Store, ParsedSource, Treffer?).
+        src: Quelltext oder binäres Datei-Objekt (z.B. Upload) – wird nie als Ganzes dekodiert.
+        Miss: Jahr/Monat + Working Copy in einem gestreamten Durchlauf, Parsen, Validieren – und Eintrag anlegen.
+        Treffer: nur Working Copy schreiben, Artikel werden aus dem Cache kopiert.
+        """
+        with span("cache.open_working_copy") as sp:
+            key = source_key(src)
+            parsed = self.get(key)
+            hit = parsed is not None
+            if hit:
+                store = parsed.open_working_copy(file_name, base_dir, backend)
+            else:
+                store, parsed = self._parse_source(key, src, file_name, base_dir, backend)
+            sp.set(bytes_in=parsed.source.buffer, articles=parsed.articles, hit=hit)  # Byte-Puffer oder Text (Zeichen)
+        return store, parsed, hit
+
+    def _parse_source(self, key: str, src: Union[str, IO[bytes]], file_name: str, base_dir: str,
+                      backend: Optional[str]) -> Tuple[WorkingCopyStore, ParsedSource]:
+        with self._lock:
+            self.misses += 1
+        stream = io.StringIO(src) if isinstance(src, str) else io.TextIOWrapper(src, encoding="utf-8", newline="")
+        cleaner = SourceCleaner(iter_chunks(stream))
+        wp = working_copy_path(file_name, base_dir)
+        try:
+            write_working_copy(cleaner, wp)
+        finally:
+            if not isinstance(src, str):
+                stream.detach()  # Upload-Objekt gehört dem Aufrufer
+        source = ArticleSource.from_file(wp)
+        articles = parse_articles(source)
+        corrections_str = validate_and_correct_categories(articles)  # Wirft bei ungültigen Kategorien -> kein Eintrag
+        parsed = ParsedSource(key, cleaner.year, cleaner.month, source, articles, corrections_str)
+        self._put(parsed)
+        self._save(parsed)
+        if (backend or store_backend()) == "sqlite":
+            store = parsed.open_working_copy(file_name, base_dir, "sqlite")
+            os.remove(wp)  # Inhalt ist gelesen (kein mmap), Working Copy ist die Datenbank
+        else:
+            parsed.write_index(wp + INDEX_SUFFIX)
+            store = WorkingCopyStore(wp, articles=[a.copy() for a in articles])
+        return store, parsed
+
+    def _put(self, parsed: ParsedSource) -> None:
+        with self._lock:
+            old = self._entries.pop(parsed.key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[parsed.key] = parsed
+            self._bytes += parsed.size
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    # --- Persistenz: {key}.md (Working-Copy-Inhalt) + {key}.json (Artikel-Index) ---
+    def _paths(self, key: str) -> Tuple[str, str]:
+        return os.path.join(self.persist_dir, f"{key}.md"), os.path.join(self.persist_dir, f"{key}.json")
+
+    def _save(self, parsed: ParsedSource) -> None:
+        if not self.persist_dir:
+            return
+        try:
+            os.makedirs(self.persist_dir, exist_ok=True)
+            content_path, index_path = self._paths(parsed.key)
+            parsed.write_working_copy(content_path)
+            index = _index_of(parsed.year, parsed.month, parsed.corrections_str, parsed.source, parsed.articles)
+            tmp_path = index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)  # Index zuletzt: nur vollständige Einträge werden geladen
+        except OSError as e:
+            logger.warning(f"Parse-Cache konnte nicht gespeichert werden: {e}")
+
+    def _load(self, key: str) -> Optional[ParsedSource]:
+        if not self.persist_dir:
+            return None
+        content_path, index_path = self._paths(key)
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("format") != _CACHE_FORMAT:
+                return None
+            source = _source_for_index(content_path, index)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Parse-Cache-Eintrag {key[:12]} nicht lesbar: {e}")
+            return None
+        if source.is_text and "\r" in source.buffer:
+            return None  # Eintrag aus einem älteren Parse-Worker (\r\n nicht übersetzt) -> neu parsen
+        return _parsed_from_index(key, source, index)
+
+    # --- Mehrere Quellen (Mehrfach-Upload): Treffer aus dem Cache, Misses parallel in Worker-Prozessen ---
+    def open_working_copies(self, files: List[Tuple[str, IO[bytes]]], base_dir: str, backend: Optional[str] = None,
+                            max_workers: Optional[int] = None) -> Tuple[Dict[str, Tuple[WorkingCopyStore, ParsedSource, bool]], Dict[str, str]]:
+        """
+        Wie open_working_copy für mehrere Dateien [(Name, binäres Datei-Objekt)].
+        Rückgabe: ({Name: (Store, ParsedSource, Treffer?)}, {Name: Fehlermeldung}) – ein Fehler betrifft nur seine Datei.
+        Eine einzelne fehlende Datei wird wie bisher gestreamt im eigenen Prozess geparst.
+        """
+        results: Dict[str, Tuple[WorkingCopyStore, ParsedSource, bool]] = {}
+        errors: Dict[str, str] = {}
+        misses: List[Tuple[str, str, IO[bytes]]] = []
+        workers = 1
+        with span("cache.open_working_copies") as sp:
+            for name, f in files:
+                key = source_key(f)
+                parsed = self.get(key)
+                if parsed is not None:
+                    results[name] = (parsed.open_working_copy(name, base_dir, backend), parsed, True)
+                else:
+                    misses.append((name, key, f))
+            if len(misses) == 1:
+                name, key, f = misses[0]
+                try:
+                    store, parsed = self._parse_source(key, f, name, base_dir, backend)
+                    results[name] = (store, parsed, False)
+                except Exception as e:
+                    errors[name] = str(e)
+            elif misses:
+                workers = max(1, min(len(misses), max_workers or os.cpu_count() or 1))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {name: (key, pool.submit(_parse_worker, f.read())) for name, key, f in misses}
+                    for name, (key, future) in futures.items():
+                        try:
+                            content, index = future.result()
+                        except Exception as e:
+                            errors[name] = str(e)
+                            continue
+                        with self._lock:
+                            self.misses += 1
+                        parsed = _parsed_from_index(key, ArticleSource.from_text(content), index)
+                        self._put(parsed)
+                        self._save(parsed)
+                        results[name] = (parsed.open_working_copy(name, base_dir, backend), parsed, False)
+            sp.set(articles=sum(len(r[1].articles) for r in results.values()), files=len(files), parsed=len(misses),
+                   workers=workers)
+        return results, errors
+
+
+def _index_of(year: int, month: int, corrections_str: str, source: ArticleSource, articles: List[Article]) -> Dict:
+    """Artikel-Index einer geparsten Quelle (Offsets + Felder) – Format des Disk-Caches und der Parse-Worker."""
+    return {
+        "format": _CACHE_FORMAT, "year": year, "month": month,
+        "corrections_str": corrections_str, "byte_offsets": not source.is_text,
+        "articles": [
+            [a.start, a.end, a.title_start, a.title_end, a.meta_start, a.meta_end,
+             a.header_prefix, a.categories, a.tags, a.orte]
+            for a in articles
+        ],
+    }
+
+
+def _source_for_index(content_path: str, index: Dict) -> ArticleSource:
+    """Inhalt passend zu den Offsets des Index laden (Byte- oder Zeichen-Offsets)."""
+    if index["byte_offsets"]:
+        return ArticleSource.from_file(content_path)
+    with open(content_path, "r", encoding="utf-8", newline="\n") as f:
+        return ArticleSource.from_text(f.read())
+
+
+def reopen_working_copy(path: str) -> Tuple[Union[WorkingCopyStore, SqliteWorkingCopyStore], Dict]:
+    """
+    Bestehende Working Copy nach einem Neustart öffnen, ohne Parsen und Validieren:
+    Markdown-Backend: Artikel aus {path}.index.json, Stand (entfernte Artikel, Undo/Redo) aus dem Journal;
+    SQLite-Backend: alles aus der Datenbank. Rückgabe: (Store, {year, month, corrections_str}).
+    Wirft OSError/ValueError, wenn Dateien fehlen oder unlesbar sind.
+    """
+    if path.endswith(SQLITE_SUFFIX):
+        store = SqliteWorkingCopyStore(path)
+        meta = store.meta
+        return store, {"year": int(meta["year"]), "month": int(meta["month"]), "corrections_str": meta["corrections_str"]}
+    with open(path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("format") != _CACHE_FORMAT:
+        raise ValueError(f"Index-Format {index.get('format')} nicht unterstützt")
+    parsed = _parsed_from_index("", _source_for_index(path, index), index)
+    return WorkingCopyStore(path, articles=parsed.articles), {
+        "year": parsed.year, "month": parsed.month, "corrections_str": parsed.corrections_str,
+    }
+
+
+def restore_session(manifest_path: str) -> Tuple[WorkingCopySet, Dict[str, Dict]]:
+    """
+    Sitzung aus ihrem Manifest wiederherstellen: (WorkingCopySet, {Dateiname: {year, month, corrections_str}}).
+    Dateien, deren Working Copy fehlt, werden übersprungen.
+    """
+    wc_set = WorkingCopySet(manifest_path)
+    info_by_name: Dict[str, Dict] = {}
+    with span("cache.restore_session") as sp:
+        for name, path in read_manifest(manifest_path):
+            try:
+                store, info = reopen_working_copy(path)
+            except (OSError, ValueError, KeyError, sqlite3.DatabaseError) as e:
+                logger.warning(f"Working Copy von {name} nicht wiederherstellbar: {e}")
+                continue
+            wc_set.add(name, store)
+            info_by_name[name] = info
+        sp.set(files=len(info_by_name), articles=len(wc_set))
+    return wc_set, info_by_name
+
+
+def _parsed_from_index(key: str, source: ArticleSource, index: Dict) -> ParsedSource:
+    articles = [
+        Article(source, start, end, (ts, te), (ms, me), cats, tags, orte, header_prefix=prefixed)
+        for start, end, ts, te, ms, me, prefixed, cats, tags, orte in index["articles"]
+    ]
+    return ParsedSource(key, index["year"], index["month"], source, articles, index["corrections_str"])
+
+
+def _parse_worker(data: bytes) -> Tuple[str, Dict]:
+    """
+    Worker-Prozess: bereinigen, parsen, validieren; gibt (Working-Copy-Inhalt, Index) zurück.
+    Quelle wie in _parse_source (Working Copy + ArticleSource.from_file), nur ohne Datei: \\r\\n wird zu \\n.
+    """
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline="")
+    cleaner = SourceCleaner(iter_chunks(stream))
+    source = ArticleSource.from_cleaned_text("".join(cleaner))
+    articles = parse_articles(source)
+    corrections_str = validate_and_correct_categories(articles)
+    return source.buffer, _index_of(cleaner.year, cleaner.month, corrections_str, source, articles)
+
+
+_parse_cache: Optional[ParseCache] = None
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """
+    Prozessweite Instanz. Konfiguration per Umgebungsvariablen:
+    NEWS_PARSER_CACHE_ENTRIES (Default 16), NEWS_PARSER_CACHE_MB (Default 512),
+    NEWS_PARSER_CACHE_DISK=1 -> persistent unter OUTPUT_DIR/cache.
+    """
+    global _parse_cache
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            config = get_config()
+            _parse_cache = ParseCache(
+                max_entries=config.cache_entries,
+                max_bytes=config.cache_mb * 2**20,
+                persist_dir=config.cache_dir if config.cache_disk else None,
+            )
+        return _parse_cache
@@ -0,0 +1,204 @@
+# core/cli.py
+"""
+Headless Batch-Verarbeitung (ohne Streamlit): python -m core QUELLEN... [Optionen]
+
+Jede Quelle (Datei, Ordner oder Glob) wird geparst, validiert, nach Kategorie oder Regel-Datei
+aufgeteilt und mit der Output-Pipeline nachbearbeitet. Dateien laufen parallel in einem Prozess-Pool.
+"""
+import argparse
+import calendar
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from .article import Article
+from .facets import FacetIndex, _tokenize
+from .metrics import get_registry, merge_stages, record_run, span, write_reports
+from .output_processor import DEFAULT_STEP_ORDER, compile_pipeline
+from .parser import iter_articles_from_stream, validate_and_correct_categories
+from .processor import SourceCleaner, render_raw_output, write_atomic
+from .streaming import iter_chunks
+from .utils import get_base_dir, slugify
+
+logger = logging.getLogger(__name__)
+
+REPORT_NAME = "batch_report.json"
+
+
+def expand_sources(patterns: Sequence[str]) -> List[str]:
+    """Dateien, Ordner (alle *.md darin) und Globs -> sortierte, eindeutige Liste von .md-Dateien."""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, "*.md")))
+        elif any(ch in pattern for ch in "*?["):
+            paths.update(p for p in glob.glob(pattern, recursive=True) if p.endswith(".md"))
+        elif os.path.isfile(pattern):
+            paths.add(pattern)
+        else:
+            raise FileNotFoundError(f"Quelle nicht gefunden: {pattern}")
+    return sorted(os.path.abspath(p) for p in paths)
+
+
+def load_rules(path: str) -> List[Dict]:
+    """
+    Regel-Datei (JSON): {"outputs": [{"name": "klima", "title": "Klima", "categories": [...], "tags": [...], "orte": [...]}]}
+    Ein Artikel landet in einem Output, wenn eine seiner Kategorien, Tags oder Orte in der Regel vorkommt.
+    Statt der Listen geht auch ein Filter-Ausdruck wie in der App: {"name": ..., "query": "tags:Klima AND NOT orte:Berlin"}.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    rules = data.get("outputs", data) if isinstance(data, dict) else data
+    for rule in rules:
+        if "name" not in rule:
+            raise ValueError(f"Regel ohne 'name' in {path}: {rule}")
+        if "query" in rule:
+            _tokenize(rule["query"])  # Früh validieren (ValueError mit Position)
+    return rules
+
+
+def assign_outputs(articles: List[Article], rules: Optional[List[Dict]]) -> Dict[str, Dict]:
+    """Name -> {"title", "articles"}; ohne Regeln eine Ausgabe pro Kategorie (wie die Gruppierung in app.py)."""
+    outputs: Dict[str, Dict] = {}
+    if rules is None:
+        for a in articles:
+            for c in (a.categories or ["Unkategorisiert"]):
+                outputs.setdefault(c, {"title": c, "articles": []})["articles"].append(a)
+        return outputs
+    facets: Optional[FacetIndex] = None
+    for rule in rules:
+        if "query" in rule:
+            facets = facets or FacetIndex(articles)
+            selected = facets.select(rule["query"])
+        else:
+            cats, tags, orte = set(rule.get("categories", ())), set(rule.get("tags", ())), set(rule.get("orte", ()))
+            selected = [
+                a for a in articles
+                if cats.intersection(a.categories) or tags.intersection(a.tags) or orte.intersection(a.orte)
+            ]
+        if selected:
+            outputs[rule["name"]] = {"title": rule.get("title", rule["name"]), "articles": selected}
+    return outputs
+
+
+def output_name(source_path: str, output_key: str) -> str:
+    """Deterministischer Dateiname: {quelle}__{ausgabe}.md (slugifiziert)."""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return f"{slugify(stem)}__{slugify(output_key)}.md"
+
+
+def process_file(source_path: str, out_dir: str, rules: Optional[List[Dict]] = None,
+                 date: Optional[str] = None, step_order: Sequence[str] = DEFAULT_STEP_ORDER) -> Dict:
+    """Verarbeitet eine Quelle vollständig (läuft im Worker-Prozess), gibt einen Report-Eintrag zurück."""
+    started = time.perf_counter()
+    entry: Dict = {"source": source_path, "articles": 0, "corrections": "", "outputs": [], "error": None}
+    with record_run(f"batch:{os.path.basename(source_path)}", out_dir=None) as run:
+        try:
+            _process_file(source_path, out_dir, rules, date, step_order, entry)
+        except Exception as e:  # Eine kaputte Quelle soll den Batch nicht abbrechen
+            entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - started, 4)
+    entry["stages"] = run.stage_summary()
+    return entry
+
+
+def _process_file(source_path: str, out_dir: str, rules: Optional[List[Dict]], date: Optional[str],
+                  step_order: Sequence[str], entry: Dict) -> None:
+    # Gestreamt: Bereinigung + Parsen in Stücken, jeder Artikel hält nur seinen Block
+    with span("parser.iter_articles_from_stream") as sp:
+        with open(source_path, "r", encoding="utf-8") as f:
+            cleaner = SourceCleaner(iter_chunks(f))
+            articles = list(iter_articles_from_stream(cleaner))
+        sp.set(bytes_in=os.path.getsize(source_path), articles=articles)
+    media_year, media_month = cleaner.year, cleaner.month
+    if date:
+        date_year, date_month, date_day = (int(p) for p in date.split("-"))
+    else:
+        date_year, date_month = media_year, media_month
+        date_day = calendar.monthrange(media_year, media_month)[1]  # Wie in app.py: letzter Tag des Monats
+
+    entry["articles"] = len(articles)
+    entry["corrections"] = validate_and_correct_categories(articles)
+
+    pipeline = compile_pipeline(step_order)
+    for key, output in sorted(assign_outputs(articles, rules).items()):
+        out_path = os.path.join(out_dir, output_name(source_path, key))
+        raw, meta = render_raw_output(output["articles"])  # Wie generate_output, nur ohne Umweg über die Datei
+        processed = pipeline.run(raw, output["title"], date_year, date_month, date_day, media_year, media_month,
+                                 meta=meta)
+        with span("cli.write_output") as sp:
+            write_atomic(out_path, lambda f: f.write(processed))  # Überwachte Ordner: nie halbe Dateien
+            sp.set(chars_out=processed, articles=output["articles"])
+        entry["outputs"].append({"path": out_path, "title": output["title"], "articles": len(output["articles"])})
+
+
+def run_batch(sources: List[str], out_dir: str, rules: Optional[List[Dict]] = None, date: Optional[str] = None,
+              workers: Optional[int] = None, step_order: Sequence[str] = DEFAULT_STEP_ORDER) -> Dict:
+    """Verteilt die Quellen auf einen ProcessPoolExecutor; Report in Eingabe-Reihenfolge."""
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    if workers == 1 or len(sources) <= 1:
+        entries = [process_file(src, out_dir, rules, date, step_order) for src in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_file, src, out_dir, rules, date, step_order) for src in sources]
+            entries = [f.result() for f in futures]
+    if workers != 1 and len(sources) > 1:
+        for entry in entries:  # Spans der Worker-Prozesse in die Summen dieses Prozesses übernehmen
+            get_registry().merge(entry["stages"])
+    report = {
+        "sources": len(sources),
+        "articles": sum(e["articles"] for e in entries),
+        "outputs": sum(len(e["outputs"]) for e in entries),
+        "errors": sum(1 for e in entries if e["error"]),
+        "seconds": round(time.perf_counter() - started, 4),
+        "files": entries,
+    }
+    with open(os.path.join(out_dir, REPORT_NAME), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    stages: Dict[str, Dict] = {}
+    for entry in entries:
+        merge_stages(stages, entry["stages"])
+    write_reports({"run": "batch", "started": time.time() - report["seconds"], "seconds": report["seconds"],
+                   "error": None, "stages": stages, "spans": []}, out_dir)
+    return report
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m core", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("sources", nargs="+", help="Markdown-Dateien, Ordner oder Globs (z.B. 'archiv/**/*.md')")
+    base_dir = get_base_dir()  # Beim Aufruf, nicht beim Import (set_config)
+    ap.add_argument("-o", "--out", default=base_dir, help=f"Ausgabe-Ordner (Default: {base_dir})")
+    ap.add_argument("-r", "--rules", help="JSON-Regel-Datei für die Aufteilung (Default: eine Ausgabe pro Kategorie)")
+    ap.add_argument("-d", "--date", help="Artikeldatum YYYY-MM-DD (Default: letzter Tag des Media-Monats)")
+    ap.add_argument("-w", "--workers", type=int, default=None, help="Anzahl Worker-Prozesse (Default: CPU-Anzahl)")
+    ap.add_argument("--steps", default=",".join(DEFAULT_STEP_ORDER), help="Post-Processing-Reihenfolge, kommagetrennt")
+    return ap
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = build_arg_parser().parse_args(argv)
+    try:
+        sources = expand_sources(args.sources)
+        rules = load_rules(args.rules) if args.rules else None
+        step_order = [s.strip() for s in args.steps.split(",") if s.strip()]
+        compile_pipeline(step_order)  # Früh validieren
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    if not sources:
+        print("Keine .md-Quellen gefunden.", file=sys.stderr)
+        return 2
+    report = run_batch(sources, os.path.abspath(args.out), rules, args.date, args.workers, step_order)
+    for entry in report["files"]:
+        status = f"FEHLER {entry['error']}" if entry["error"] else f"{entry['articles']} Artikel -> {len(entry['outputs'])} Ausgaben"
+        print(f"{os.path.basename(entry['source'])}: {status} ({entry['seconds']:.2f}s)")
+    print(f"Gesamt: {report['sources']} Quellen, {report['articles']} Artikel, {report['outputs']} Ausgaben, "
+          f"{report['errors']} Fehler in {report['seconds']:.2f}s – Report: {os.path.join(os.path.abspath(args.out), REPORT_NAME)}")
+    return 1 if report["errors"] else 0
@@ -0,0 +1,96 @@
+# core/config.py
+"""
+Explizite Konfiguration statt Import-Nebenwirkungen: Pfade und Modi werden einmal aus den Umgebungsvariablen
+gelesen (NEWS_PARSER_BASE_DIR, _DEBUG, _VOCAB_DIR, _STORE, _CACHE_*), Ordner erst bei der ersten Nutzung angelegt.
+"""
+import os
+import threading
+from typing import Optional
+
+DEFAULT_BASE_DIR = r"C:\users\hager\tmp\parse_news"
+
+
+class Config:
+    """Ordner, Modi und Cache-Grenzen; ensure_*() legt den jeweiligen Ordner bei Bedarf an."""
+
+    def __init__(self, base_dir: str = DEFAULT_BASE_DIR, debug_mode: str = "off", vocab_dir: Optional[str] = None,
+                 store_backend: str = "file", cache_entries: int = 16, cache_mb: int = 512, cache_disk: bool = False):
+        self.base_dir = base_dir
+        self.debug_mode = debug_mode
+        self.vocab_dir = vocab_dir or os.path.join(base_dir, "vocab")
+        self.store_backend = store_backend
+        self.cache_entries = cache_entries
+        self.cache_mb = cache_mb
+        self.cache_disk = cache_disk
+        self._created = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        return cls(
+            base_dir=os.environ.get("NEWS_PARSER_BASE_DIR", DEFAULT_BASE_DIR),
+            debug_mode=os.environ.get("NEWS_PARSER_DEBUG", "off").strip().lower() or "off",
+            vocab_dir=os.environ.get("NEWS_PARSER_VOCAB_DIR") or None,
+            store_backend=os.environ.get("NEWS_PARSER_STORE", "file").strip().lower(),
+            cache_entries=int(os.environ.get("NEWS_PARSER_CACHE_ENTRIES", "16")),
+            cache_mb=int(os.environ.get("NEWS_PARSER_CACHE_MB", "512")),
+            cache_disk=os.environ.get("NEWS_PARSER_CACHE_DISK", "0") == "1",
+        )
+
+    def replace(self, **changes) -> "Config":
+        """Kopie mit geänderten Werten (Ordner werden neu angelegt, falls nötig)."""
+        values = {key: getattr(self, key) for key in (
+            "base_dir", "debug_mode", "vocab_dir", "store_backend", "cache_entries", "cache_mb", "cache_disk")}
+        if "base_dir" in changes and "vocab_dir" not in changes and values["vocab_dir"] == os.path.join(self.base_dir, "vocab"):
+            values["vocab_dir"] = None  # Default folgt dem neuen base_dir
+        values.update(changes)
+        return Config(**values)
+
+    @property
+    def output_dir(self) -> str:
+        """Working Copies, Outputs, Indizes."""
+        return self.base_dir
+
+    @property
+    def debug_dir(self) -> str:
+        return os.path.join(self.base_dir, "debug")
+
+    @property
+    def cache_dir(self) -> str:
+        """Persistenter Parse-Cache (nur mit cache_disk)."""
+        return os.path.join(self.base_dir, "cache")
+
+    def ensure_dir(self, path: str) -> str:
+        """Legt path einmal pro Prozess an (weitere Aufrufe ohne Dateisystemzugriff), gibt path zurück."""
+        if path not in self._created:
+            with self._lock:
+                os.makedirs(path, exist_ok=True)
+                self._created.add(path)
+        return path
+
+    def ensure_output_dir(self) -> str:
+        return self.ensure_dir(self.output_dir)
+
+    def ensure_debug_dir(self) -> str:
+        return self.ensure_dir(self.debug_dir)
+
+
+_config: Optional[Config] = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """Prozessweite Konfiguration, beim ersten Zugriff aus den Umgebungsvariablen."""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = Config.from_env()
+        return _config
+
+
+def set_config(config: Config) -> Config:
+    """Ersetzt die prozessweite Konfiguration (z.B. Tests, eingebettete Nutzung); gibt die alte zurück."""
+    global _config
+    with _config_lock:
+        old, _config = _config, config
+    return old
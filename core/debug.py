@@ -0,0 +1,153 @@
+# core/debug.py
+import os
+import json
+import queue
+import threading
+import time
+import atexit
+import logging
+from typing import Any, Callable, Optional, Union
+
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+DEBUG_MODES = ("off", "jsonl", "thread")
+DEBUG_FILE = "debug.jsonl"
+
+Payload = Union[Any, Callable[[], Any]]
+
+
+class NullSink:
+    """Modus "off": keine Dateisystem-Arbeit, Payloads werden nicht einmal berechnet."""
+    enabled = False
+    dropped = 0
+
+    def emit(self, step: str, payload: Payload = None, **fields) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlSink:
+    """Modus "jsonl": alle Debug-Daten synchron als eine Zeile pro Ereignis in Config.debug_dir/debug.jsonl."""
+    enabled = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dropped = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _record(self, step: str, payload: Payload, fields: dict) -> str:
+        data = payload() if callable(payload) else payload
+        return json.dumps({"ts": time.time(), "step": step, **fields, "data": data}, ensure_ascii=False) + "\n"
+
+    def _write(self, line: str) -> None:
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)  # Ein write pro Zeile (append) – auch mehrere Prozesse überschreiben sich nicht
+            self._file.flush()
+
+    def emit(self, step: str, payload: Payload = None, **fields) -> None:
+        self._write(self._record(step, payload, fields))
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ThreadedSink(JsonlSink):
+    """
+    Modus "thread": wie "jsonl", aber Serialisieren + Schreiben im Hintergrund-Thread.
+    Die Queue ist begrenzt; ist sie voll, wird das Ereignis verworfen (dropped), statt die UI zu blockieren.
+    """
+
+    def __init__(self, path: str, maxsize: int = 1000):
+        super().__init__(path)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="debug-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, step: str, payload: Payload = None, **fields) -> None:
+        try:
+            self._queue.put_nowait((step, payload, fields))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(self._record(*item))
+            except Exception as e:
+                logger.warning(f"Debug-Ereignis nicht geschrieben: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        self._queue.join()
+        super().flush()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        super().close()
+
+
+_sink: Optional[Union[NullSink, JsonlSink]] = None
+_sink_lock = threading.Lock()
+
+
+def create_sink(mode: str, debug_dir: Optional[str] = None) -> Union[NullSink, JsonlSink]:
+    if mode not in DEBUG_MODES:
+        raise ValueError(f"Unbekannter Debug-Modus: {mode} (erlaubt: {', '.join(DEBUG_MODES)})")
+    if mode == "off":
+        return NullSink()
+    path = os.path.join(debug_dir or get_config().debug_dir, DEBUG_FILE)  # Ordner entsteht beim ersten Schreiben
+    return JsonlSink(path) if mode == "jsonl" else ThreadedSink(path)
+
+
+def get_debug_sink() -> Union[NullSink, JsonlSink]:
+    """Prozessweiter Sink, Modus aus NEWS_PARSER_DEBUG (off | jsonl | thread, Default off)."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = create_sink(get_config().debug_mode)
+                atexit.register(_sink.close)
+    return _sink
+
+
+def set_debug_mode(mode: str) -> Union[NullSink, JsonlSink]:
+    """Wechselt den Modus zur Laufzeit (alter Sink wird geleert und geschlossen)."""
+    global _sink
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = create_sink(mode)
+        atexit.register(_sink.close)
+    return _sink
+
+
+def debug_emit(step: str, payload: Payload = None, **fields) -> None:
+    """Kurzform: get_debug_sink().emit(...). Teure Payloads als Callable übergeben (nur bei aktivem Sink berechnet)."""
+    sink = get_debug_sink()
+    if sink.enabled:
+        sink.emit(step, payload, **fields)
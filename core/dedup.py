@@ -0,0 +1,283 @@
+# core/dedup.py
+"""
+Erkennung fast gleicher Artikel (gleiche Agenturmeldung unter anderem ######-Titel) über MinHash + LSH.
+
+- Shingles: Wort-3-Gramme (aus crc32 je Wort gemischt) des normalisierten Textes (wie im Veröffentlichungs-Index: ohne Titel, Kommentare, Platzhalter).
+- MinHash: NUM_PERM Hashfunktionen (Multiply-Shift, 64 Bit), mit NumPy in Stapeln über alle Artikel;
+  ohne NumPy dieselben Werte in reinem Python (deutlich langsamer).
+- LSH: BANDS Bänder à ROWS Zeilen -> Kandidatenpaare, bestätigt über die geschätzte Jaccard-Ähnlichkeit.
+- Signaturen werden pro Text-Fingerprint in einer Append-only-Datei in OUTPUT_DIR gespeichert.
+"""
+import os
+import sys
+import zlib
+import random
+import logging
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .archive import text_fingerprint, normalize_body
+from .article import Article
+from .metrics import current_span, traced
+from .utils import get_base_dir
+
+try:
+    import numpy as np
+except ImportError:  # Optional: nur für die Stapel-Berechnung
+    np = None
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS, ROWS = 32, 4          # Kandidat ab ca. 40 % Ähnlichkeit, bei 60 % mit ~99 % Wahrscheinlichkeit
+THRESHOLD = 0.6              # Geschätzte Jaccard-Ähnlichkeit für "fast gleich"
+SHINGLE_SIZE = 3
+SEED = 1
+BATCH_SHINGLES = 1 << 15     # Wörter/Shingles pro NumPy-Stapel (NUM_PERM x BATCH_SHINGLES x 8 Byte = 32 MB)
+
+_MASK64 = (1 << 64) - 1
+_rnd = random.Random(SEED)
+_A = [_rnd.getrandbits(64) | 1 for _ in range(NUM_PERM)]
+_B = [_rnd.getrandbits(64) for _ in range(NUM_PERM)]
+_MIX = tuple(_rnd.getrandbits(64) | 1 for _ in range(SHINGLE_SIZE))
+_SIG_BYTES = NUM_PERM * 4
+_FP_BYTES = 16
+
+
+def word_hashes(body: str, memo: Optional[Dict[str, int]] = None) -> List[int]:
+    """
+    crc32 (prozessunabhängig) pro Wort eines normalisierten Textes; memo: Wort -> Hash über mehrere Artikel.
+    Kürzer als SHINGLE_SIZE wird mit 0 aufgefüllt (genau ein Shingle).
+    """
+    memo = {} if memo is None else memo
+    hashes = []
+    for w in body.split():
+        h = memo.get(w)
+        if h is None:
+            h = memo[w] = zlib.crc32(w.encode("utf-8"))
+        hashes.append(h)
+    if len(hashes) < SHINGLE_SIZE:
+        hashes.extend([0] * (SHINGLE_SIZE - len(hashes)))
+    return hashes
+
+
+def _to_bytes(values: Sequence[int]) -> bytes:
+    sig = array("I", values)
+    if sys.byteorder == "big":
+        sig.byteswap()  # Gespeichert wird immer little-endian
+    return sig.tobytes()
+
+
+def _signatures_python(word_lists: List[List[int]]) -> List[bytes]:
+    m1, m2, m3 = _MIX
+    result = []
+    for words in word_lists:
+        # Shingle = Wort-3-Gramm, als 64-Bit-Wert gemischt (gleiche Formel wie in _signatures_numpy)
+        shingles = {(w1 * m1 + w2 * m2 + w3 * m3) & _MASK64 for w1, w2, w3 in zip(words, words[1:], words[2:])}
+        result.append(_to_bytes([min(((a * x + b) & _MASK64) >> 32 for x in shingles) for a, b in zip(_A, _B)]))
+    return result
+
+
+def _signatures_numpy(word_lists: List[List[int]]) -> List[bytes]:
+    a = np.array(_A, dtype=np.uint64)[:, None]
+    b = np.array(_B, dtype=np.uint64)[:, None]
+    m1, m2, m3 = (np.uint64(m) for m in _MIX)
+    result: List[bytes] = []
+    start = 0
+    while start < len(word_lists):
+        # Stapel: so viele Artikel, bis BATCH_SHINGLES erreicht ist (mindestens einer)
+        end, total = start, 0
+        while end < len(word_lists) and (end == start or total + len(word_lists[end]) <= BATCH_SHINGLES):
+            total += len(word_lists[end])
+            end += 1
+        batch = word_lists[start:end]
+        w = np.fromiter((h for words in batch for h in words), dtype=np.uint64, count=total)
+        lengths = np.array([len(words) for words in batch])
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        # Shingle j = Wörter j..j+2; die letzten zwei Positionen jedes Artikels reichen in den nächsten -> ungültig
+        x = np.zeros(total, dtype=np.uint64)
+        x[:total - 2] = w[:-2] * m1 + w[1:-1] * m2 + w[2:] * m3  # uint64 läuft wie & _MASK64 über
+        hashed = (a * x[None, :] + b) >> np.uint64(32)
+        ends = offsets + lengths
+        hashed[:, np.concatenate((ends - 2, ends - 1))] = np.uint64(0xFFFFFFFF)
+        mins = np.minimum.reduceat(hashed, offsets, axis=1).T.astype("<u4")
+        result.extend(row.tobytes() for row in mins)
+        start = end
+    return result
+
+
+def compute_signatures(word_lists: List[List[int]]) -> List[bytes]:
+    """MinHash-Signaturen (NUM_PERM x uint32, little-endian) aus word_hashes()-Listen."""
+    if not word_lists:
+        return []
+    return _signatures_numpy(word_lists) if np is not None else _signatures_python(word_lists)
+
+
+def similarity(sig1: bytes, sig2: bytes) -> float:
+    """Geschätzte Jaccard-Ähnlichkeit: Anteil gleicher MinHash-Werte."""
+    if np is not None:
+        return float(np.mean(np.frombuffer(sig1, dtype="<u4") == np.frombuffer(sig2, dtype="<u4")))
+    a1, a2 = array("I", sig1), array("I", sig2)
+    return sum(1 for x, y in zip(a1, a2) if x == y) / NUM_PERM
+
+
+def _pairs(members: Sequence[int], pairs: Set[Tuple[int, int]]) -> None:
+    for x in range(len(members)):
+        for y in range(x + 1, len(members)):
+            pairs.add((members[x], members[y]))
+
+
+def _lsh_candidates_numpy(index: List[int], signatures: List[bytes]) -> Set[Tuple[int, int]]:
+    # Band-Schlüssel: ROWS Werte pro Band zu einem 64-Bit-Wert gemischt (Kollisionen fallen bei der Prüfung heraus)
+    m = np.frombuffer(b"".join(signatures), dtype="<u4").astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    keys = np.zeros((len(signatures), BANDS), dtype=np.uint64)
+    for r in range(ROWS):
+        keys = keys * np.uint64(_MIX[r % len(_MIX)]) + m[:, :, r]
+    keys = keys * np.uint64(BANDS) + np.arange(BANDS, dtype=np.uint64)  # Band in den Schlüssel
+    flat = keys.ravel()
+    order = np.argsort(flat, kind="stable")
+    sorted_keys = flat[order]
+    same = sorted_keys[1:] == sorted_keys[:-1]
+    pairs: Set[Tuple[int, int]] = set()
+    if not same.any():
+        return pairs
+    rows = order // BANDS
+    # Läufe gleicher Schlüssel (Länge >= 2)
+    boundaries = np.flatnonzero(np.diff(np.concatenate(([False], same, [False])).astype(np.int8)))
+    for lo, hi in zip(boundaries[::2], boundaries[1::2] + 1):
+        _pairs(sorted({index[i] for i in rows[lo:hi].tolist()}), pairs)
+    return pairs
+
+
+def lsh_candidates(signatures: Sequence[Optional[bytes]]) -> Set[Tuple[int, int]]:
+    """Paare (i, j), i < j, die in mindestens einem Band gleiche Werte haben."""
+    index = [i for i, sig in enumerate(signatures) if sig is not None]
+    if np is not None and index:
+        return _lsh_candidates_numpy(index, [signatures[i] for i in index])
+    width = ROWS * 4
+    pairs: Set[Tuple[int, int]] = set()
+    for band in range(BANDS):
+        buckets: Dict[bytes, List[int]] = {}
+        lo, hi = band * width, (band + 1) * width
+        for i in index:
+            buckets.setdefault(signatures[i][lo:hi], []).append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                _pairs(members, pairs)
+    return pairs
+
+
+class SignatureStore:
+    """Text-Fingerprint -> Signatur; Append-only-Datei mit festen Datensätzen (16 Byte Fingerprint + Signatur)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._sigs: Dict[bytes, bytes] = {}
+        self._lock = threading.Lock()
+        record = _FP_BYTES + _SIG_BYTES
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        except OSError as e:
+            logger.warning(f"Signaturen nicht lesbar: {e}")
+            data = b""
+        for pos in range(0, len(data) - record + 1, record):  # Unvollständiger letzter Datensatz wird ignoriert
+            self._sigs[data[pos:pos + _FP_BYTES]] = data[pos + _FP_BYTES:pos + record]
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def get(self, fingerprint: str) -> Optional[bytes]:
+        return self._sigs.get(bytes.fromhex(fingerprint))
+
+    def add_many(self, items: Iterable[Tuple[str, bytes]]) -> None:
+        with self._lock:
+            new = {bytes.fromhex(fp): sig for fp, sig in items if bytes.fromhex(fp) not in self._sigs}
+            if not new:
+                return
+            self._sigs.update(new)
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.write(b"".join(fp + sig for fp, sig in new.items()))
+            except OSError as e:
+                logger.warning(f"Signaturen konnten nicht gespeichert werden: {e}")
+
+
+_stores: Dict[str, SignatureStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_signature_store(base_dir: Optional[str] = None) -> SignatureStore:
+    """Prozessweiter Signatur-Speicher pro Ausgabe-Ordner (Dateiname enthält die MinHash-Parameter); None = Konfiguration."""
+    path = os.path.join(base_dir or get_base_dir(), f"minhash_{NUM_PERM}_{SEED}_{SHINGLE_SIZE}.bin")
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SignatureStore(path)
+        return _stores[path]
+
+
+def _union_groups(n: int, pairs: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+@traced("dedup.find_duplicate_groups", lambda sp, args, kw, res: sp.set(articles=args[0]))
+def find_duplicate_groups(articles: Sequence[Article], store: Optional[SignatureStore] = None,
+                          threshold: float = THRESHOLD) -> List[List[int]]:
+    """
+    Gruppen fast gleicher Artikel als Listen von Indizes in articles (nur Gruppen mit mindestens zwei).
+    store: Signatur-Speicher (bekannte Texte werden nicht neu berechnet); None = nichts speichern.
+    """
+    fingerprints: List[Optional[str]] = []
+    signatures: List[Optional[bytes]] = []
+    missing: List[int] = []
+    missing_words: List[List[int]] = []
+    memo: Dict[str, int] = {}
+    for i, a in enumerate(articles):
+        body = normalize_body(a.raw)
+        fp = text_fingerprint(body) if body else None
+        sig = store.get(fp) if store is not None and fp else None
+        fingerprints.append(fp)
+        signatures.append(sig)
+        if fp and sig is None:
+            missing.append(i)
+            missing_words.append(word_hashes(body, memo))
+    for i, sig in zip(missing, compute_signatures(missing_words)):
+        signatures[i] = sig
+    if store is not None and missing:
+        store.add_many((fingerprints[i], signatures[i]) for i in missing)
+
+    candidates = lsh_candidates(signatures)
+    pairs = [(i, j) for i, j in candidates if similarity(signatures[i], signatures[j]) >= threshold]
+    sp = current_span()
+    if sp is not None:
+        sp.set(computed=len(missing), candidates=len(candidates), numpy=np is not None)
+    return _union_groups(len(articles), pairs)
+
+
+def duplicate_titles(articles: Sequence[Article], groups: List[List[int]]) -> Dict[str, List[str]]:
+    """Titel -> Titel der anderen Artikel derselben Gruppe (für die Auswahl-Liste)."""
+    result: Dict[str, List[str]] = {}
+    for group in groups:
+        titles = list(dict.fromkeys(articles[i].title for i in group))
+        for t in titles:
+            result[t] = [o for o in titles if o != t]
+    return result
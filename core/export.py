@@ -0,0 +1,139 @@
+# core/export.py
+"""
+Split-Export: mehrere Outputs in einem Lauf (z.B. ein Digest pro Kategorie) statt N-mal "Output erzeugen".
+
+- Zuordnung Output-Titel -> Artikel-Titel: pro Kategorie, Tag oder Ort (split_assignment) oder über Filter-Ausdrücke
+  (query_assignment). Ein Artikel mit mehreren Werten landet in jedem passenden Output (wie python -m core ohne Regeln).
+- Post-Processing aller Outputs (volle Pipeline, step4 aus dem MetaAggregate) parallel in Worker-Prozessen;
+  abbrechbar, bis der erste Output geschrieben wird.
+- Danach werden alle exportierten Artikel in EINER Operation aus der Working Copy entfernt (ein Journal-Eintrag, ein Undo).
+"""
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .article import Article, ArticleRef, MetaAggregate
+from .facets import FACET_FIELDS, UNCATEGORIZED, FacetIndex
+from .metrics import get_registry, record_run, span
+from .processor import get_output_allocator, record_published, render_raw_output
+from .utils import slugify
+
+if TYPE_CHECKING:
+    from .output_processor import OutputPipeline
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_MIN_BYTES = 1 << 20  # Darunter lohnt der Start von Worker-Prozessen nicht
+
+
+def split_assignment(articles: Iterable[Article], field: str, title_prefix: str = "") -> Dict[str, List[ArticleRef]]:
+    """
+    Output-Titel ({title_prefix}{Wert}) -> Article.ref für jeden Wert von field (categories/tags/orte), nach Titel sortiert.
+    Ohne Kategorie: Output "Unkategorisiert"; ohne Tag/Ort wird ein Artikel nicht exportiert.
+    """
+    if field not in FACET_FIELDS:
+        raise ValueError(f"Unbekanntes Feld: {field} (erlaubt: {', '.join(FACET_FIELDS)})")
+    assignment: Dict[str, List[ArticleRef]] = {}
+    for a in articles:
+        values = (a.categories or [UNCATEGORIZED]) if field == "categories" else a[field]
+        for value in dict.fromkeys(values):
+            assignment.setdefault(f"{title_prefix}{value}", []).append(a.ref)
+    return dict(sorted(assignment.items()))
+
+
+def query_assignment(facets: FacetIndex, queries: Dict[str, str]) -> Dict[str, List[ArticleRef]]:
+    """Output-Titel -> Article.ref der Treffer eines Filter-Ausdrucks (Syntax wie im Filter der App); leere Outputs fallen weg."""
+    assignment: Dict[str, List[ArticleRef]] = {}
+    for out_title, expr in queries.items():
+        refs = [a.ref for a in facets.select(expr)]
+        if refs:
+            assignment[out_title] = refs
+    return assignment
+
+
+def parse_queries(text: str) -> Dict[str, str]:
+    """Zeilen "Titel = Filter" (z.B. "Klima = tags:Klima OR categories:\"Umwelt & Klima\"") -> {Titel: Filter}."""
+    queries: Dict[str, str] = {}
+    for n, line in enumerate(text.splitlines(), 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        out_title, sep, expr = line.partition("=")
+        if not sep or not out_title.strip() or not expr.strip():
+            raise ValueError(f"Zeile {n}: erwartet 'Titel = Filter'")
+        queries[out_title.strip()] = expr.strip()
+    return queries
+
+
+def _pipeline_worker(pipeline: "OutputPipeline", raw: str, fm_args: tuple, meta: MetaAggregate) -> Tuple[str, Dict]:
+    """Post-Processing eines Outputs im Worker-Prozess; Spans gehen als Stufen-Summen zurück."""
+    with record_run("export.worker", out_dir=None) as run:
+        processed = pipeline.run(raw, *fm_args, meta=meta)
+    return processed, run.stage_summary()
+
+
+def run_split_export(job, store, assignment: Dict[str, Iterable[ArticleRef]], date_year: int, date_month: int, date_day: int,
+                     media_year: int, media_month: int, base_dir: str, pipeline: Optional["OutputPipeline"] = None,
+                     max_workers: Optional[int] = None) -> List[str]:
+    """
+    Ein Output pro Eintrag von assignment (Output-Titel -> Article.ref), alle mit derselben Datums-/Media-Angabe.
+    job: core.jobs.Job oder None; store wie bei run_generation. Gibt die Pfade der Outputs zurück (Reihenfolge von assignment).
+    """
+    def progress(value: float, stage: str, cancellable: bool = True) -> None:
+        if job is not None:
+            job.update(value, stage, cancellable)
+
+    if pipeline is None:
+        from .output_processor import get_default_pipeline
+        pipeline = get_default_pipeline()
+    progress(0.05, "Artikel zuordnen")
+    outputs: List[Tuple[str, List[Article], str, MetaAggregate]] = []
+    for out_title, refs in assignment.items():
+        selected = store.select_refs(refs)
+        if not selected:
+            continue
+        raw, meta = render_raw_output(selected)
+        outputs.append((out_title, selected, raw, meta))
+    if not outputs:
+        raise ValueError("Keine der zugeordneten Artikel ist noch in der Working Copy")
+
+    processed: List[str] = [""] * len(outputs)
+    total_chars = sum(len(raw) for _, _, raw, _ in outputs)
+    workers = 1 if total_chars < PARALLEL_MIN_BYTES else max(1, min(len(outputs), max_workers or os.cpu_count() or 1))
+    with span("export.post_processing", outputs=len(outputs), workers=workers) as sp:
+        if workers == 1:
+            for i, (out_title, _, raw, meta) in enumerate(outputs):
+                progress(0.1 + 0.6 * i / len(outputs), f"Post-Processing {out_title}")
+                processed[i] = pipeline.run(raw, out_title, date_year, date_month, date_day, media_year, media_month, meta=meta)
+        else:
+            progress(0.1, f"Post-Processing ({len(outputs)} Outputs, {workers} Prozesse)")
+            pool = ProcessPoolExecutor(max_workers=workers)
+            try:
+                futures = {
+                    pool.submit(_pipeline_worker, pipeline, raw,
+                                (out_title, date_year, date_month, date_day, media_year, media_month), meta): i
+                    for i, (out_title, _, raw, meta) in enumerate(outputs)
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    processed[futures[future]], stages = future.result()
+                    get_registry().merge(stages)
+                    progress(0.1 + 0.6 * done / len(outputs), f"Post-Processing {done}/{len(outputs)}")
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)  # Abbruch: wartende Outputs gar nicht erst starten
+        sp.set(chars_in=total_chars, articles=sum(len(selected) for _, selected, _, _ in outputs))
+
+    progress(0.75, "Outputs schreiben", cancellable=False)  # Ab hier entstehen Dateien und Index-Einträge
+    paths: List[str] = []
+    allocator = get_output_allocator(base_dir)
+    with span("export.write_outputs") as sp:
+        for (out_title, selected, _, _), text in zip(outputs, processed):
+            path = allocator.publish(slugify(out_title), lambda f, text=text: f.write(text))
+            record_published(base_dir, path, selected)
+            paths.append(path)
+        sp.set(chars_out=sum(len(text) for text in processed))
+
+    progress(0.9, "Working Copy aktualisieren", cancellable=False)
+    exported = {a.ref for _, selected, _, _ in outputs for a in selected}
+    store.remove_refs(exported, f"Split: {len(paths)} Outputs")  # Eine Operation für alle Outputs (ein Undo)
+    logger.info(f"Split-Export: {len(paths)} Outputs, {len(exported)} Artikel ({workers} Prozess(e))")
+    return paths
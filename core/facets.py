@@ -0,0 +1,217 @@
+# core/facets.py
+"""
+Invertierter Index über Kategorien, Tags und Orte: Wert -> Bitset der Artikel-IDs (Python-int, Bit i = Artikel i).
+
+- Filter-Ausdrücke: tags:Klima AND orte:Berlin, categories:"Umwelt & Klima" OR NOT tags:Wahl, (…), Wert ohne Feld = beliebiges Feld.
+- Zählungen pro Wert werden beim Entfernen (remove) und Wiederherstellen (restore) nachgeführt, nicht neu berechnet.
+- IDs sind die Positionen im Block-Index des WorkingCopyStore.
+"""
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .article import Article
+
+FACET_FIELDS = ("categories", "tags", "orte")
+UNCATEGORIZED = "Unkategorisiert"  # Wie grouped(): Artikel ohne Kategorie
+
+FIELD_ALIASES = {
+    "categories": "categories", "category": "categories", "kategorie": "categories", "kategorien": "categories", "kat": "categories",
+    "tags": "tags", "tag": "tags",
+    "orte": "orte", "ort": "orte",
+}
+_OPERATORS = {"and": "AND", "und": "AND", "or": "OR", "oder": "OR", "not": "NOT", "nicht": "NOT"}
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|(\w+):("[^"]*"|[^\s()"]+)|("[^"]*"|[^\s()"]+))')
+
+
+def _values(article: Article, field: str) -> List[str]:
+    values = article[field]
+    return (values or [UNCATEGORIZED]) if field == "categories" else values
+
+
+def iter_bits(mask: int) -> List[int]:
+    """Gesetzte Bits eines Bitsets, aufsteigend."""
+    bits = bin(mask)[:1:-1]  # Bit 0 zuerst
+    ids = []
+    i = bits.find("1")
+    while i >= 0:
+        ids.append(i)
+        i = bits.find("1", i + 1)
+    return ids
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _tokenize(expr: str) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """[(art, feld, wert)]: art = ( ) AND OR NOT TERM."""
+    tokens = []
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        m = _TOKEN_RE.match(expr, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"Filter nicht lesbar ab: {expr[pos:]}")
+        pos = m.end()
+        if m.group(1):
+            tokens.append(("(", None, None))
+        elif m.group(2):
+            tokens.append((")", None, None))
+        elif m.group(3):
+            field = FIELD_ALIASES.get(m.group(3).lower())
+            if field is None:
+                raise ValueError(f"Unbekanntes Feld: {m.group(3)} (erlaubt: {', '.join(FACET_FIELDS)})")
+            tokens.append(("TERM", field, m.group(4).strip('"')))
+        elif m.group(5).lower() in _OPERATORS:
+            tokens.append((_OPERATORS[m.group(5).lower()], None, None))
+        else:
+            tokens.append(("TERM", None, m.group(5).strip('"')))
+    return tokens
+
+
+def query_mask(expr: str, mask: Callable[[Optional[str], str], int], live: int) -> int:
+    """
+    Bitset der Treffer eines Filter-Ausdrucks (AND bindet stärker als OR; leerer Ausdruck = alle).
+    mask(feld, wert): Bitset der noch vorhandenen Artikel mit dem Wert; live: Bitset aller noch vorhandenen.
+    """
+    tokens = _tokenize(expr)
+    if not tokens:
+        return live
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def parse_or() -> int:
+        nonlocal pos
+        result = parse_and()
+        while peek() == "OR":
+            pos += 1
+            result |= parse_and()
+        return result
+
+    def parse_and() -> int:
+        nonlocal pos
+        result = parse_not()
+        while peek() in ("AND", "NOT", "TERM", "("):  # Nebeneinander = AND
+            if peek() == "AND":
+                pos += 1
+            result &= parse_not()
+        return result
+
+    def parse_not() -> int:
+        nonlocal pos
+        if peek() == "NOT":
+            pos += 1
+            return live & ~parse_not()
+        return parse_atom()
+
+    def parse_atom() -> int:
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError("Filter endet unerwartet")
+        kind, field, value = tokens[pos]
+        pos += 1
+        if kind == "(":
+            result = parse_or()
+            if peek() != ")":
+                raise ValueError("Fehlende schließende Klammer")
+            pos += 1
+            return result
+        if kind != "TERM":
+            raise ValueError(f"Unerwartet: {kind}")
+        return mask(field, value)
+
+    result = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"Unerwartet: {tokens[pos][0]}")
+    return result & live
+
+
+class FacetIndex:
+    """Wert -> Bitset pro Feld, Bitset der noch vorhandenen Artikel und Live-Zählungen pro Wert."""
+
+    def __init__(self, articles: Sequence[Article]):
+        self._articles = articles
+        self._bits: Dict[str, Dict[str, int]] = {field: {} for field in FACET_FIELDS}
+        self._counts: Dict[str, Dict[str, int]] = {field: {} for field in FACET_FIELDS}
+        self._folded: Dict[str, Dict[str, List[str]]] = {field: {} for field in FACET_FIELDS}  # casefold -> Werte
+        self._lock = threading.Lock()
+        # Bits pro Wert erst als ID-Listen sammeln (ein int-OR pro Artikel wäre O(n²))
+        ids: Dict[str, Dict[str, List[int]]] = {field: {} for field in FACET_FIELDS}
+        for i, a in enumerate(articles):
+            for field in FACET_FIELDS:
+                for v in dict.fromkeys(_values(a, field)):
+                    ids[field].setdefault(v, []).append(i)
+        for field, by_value in ids.items():
+            for v, id_list in by_value.items():
+                self._bits[field][v] = mask_of(id_list)
+                self._counts[field][v] = len(id_list)
+                self._folded[field].setdefault(v.casefold(), []).append(v)
+        self.live = (1 << len(articles)) - 1
+
+    def __len__(self) -> int:
+        return popcount(self.live)
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """Artikel verlassen die Working Copy: Live-Bitset und Zählungen nachführen (O(Anzahl × Werte))."""
+        with self._lock:
+            removed = [i for i in dict.fromkeys(ids) if self.live >> i & 1]
+            for i in removed:
+                a = self._articles[i]
+                for field in FACET_FIELDS:
+                    counts = self._counts[field]
+                    for v in dict.fromkeys(_values(a, field)):
+                        counts[v] -= 1
+            self.live &= ~mask_of(removed)
+
+    def restore(self, ids: Iterable[int]) -> None:
+        """Gegenstück zu remove (Undo): Artikel sind wieder vorhanden."""
+        with self._lock:
+            restored = [i for i in dict.fromkeys(ids) if not self.live >> i & 1]
+            for i in restored:
+                a = self._articles[i]
+                for field in FACET_FIELDS:
+                    counts = self._counts[field]
+                    for v in dict.fromkeys(_values(a, field)):
+                        counts[v] += 1
+            self.live |= mask_of(restored)
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Wert -> Anzahl noch vorhandener Artikel (nur Werte > 0), absteigend."""
+        items = [(v, n) for v, n in self._counts[field].items() if n > 0]
+        items.sort(key=lambda item: (-item[1], item[0]))
+        return dict(items)
+
+    def mask(self, field: Optional[str], value: str) -> int:
+        """Bitset der noch vorhandenen Artikel mit dem Wert (Groß/Klein egal); field None = beliebiges Feld."""
+        fields = FACET_FIELDS if field is None else (field,)
+        key = value.strip().casefold()
+        result = 0
+        for f in fields:
+            for v in self._folded[f].get(key, ()):
+                result |= self._bits[f][v]
+        return result & self.live
+
+    def query(self, expr: str) -> int:
+        """Bitset der Treffer eines Filter-Ausdrucks (AND bindet stärker als OR; leerer Ausdruck = alle)."""
+        return query_mask(expr, self.mask, self.live)
+
+    def ids(self, mask: int) -> List[int]:
+        return iter_bits(mask & self.live)
+
+    def select(self, expr: str) -> List[Article]:
+        """Noch vorhandene Artikel, die den Filter erfüllen (Datei-Reihenfolge)."""
+        return [self._articles[i] for i in self.ids(self.query(expr))]
+
+
+def mask_of(ids: Iterable[int]) -> int:
+    """Bitset aus IDs über ein bytearray (linear statt wiederholtem int-OR)."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
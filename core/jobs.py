@@ -0,0 +1,152 @@
+# core/jobs.py
+"""
+Hintergrund-Jobs (Thread-Pool) für lange Vorgänge wie die Output-Erzeugung: das Streamlit-Skript
+übergibt den Job und fragt danach nur noch Status/Fortschritt ab, statt zu blockieren.
+
+- Job-ID, Status (queued/running/done/failed/cancelled), Fortschritt 0..1 mit Stufen-Text, Ergebnis oder Fehler.
+- Abbrechen: cancel() setzt ein Flag; der Job bricht beim nächsten update() ab (JobCancelled),
+  solange er sich nicht als nicht mehr abbrechbar markiert hat (z.B. ab dem Schreiben von Dateien).
+- Prozessweiter Runner über get_job_runner() (geteilt zwischen Streamlit-Sessions).
+"""
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import record_run
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+MAX_WORKERS = 4
+KEEP_FINISHED = 50  # Abgeschlossene Jobs, die noch abgefragt werden können
+
+
+class JobCancelled(Exception):
+    """Job wurde per cancel() abgebrochen."""
+
+
+class Job:
+    """Zustand eines Hintergrund-Jobs; Felder werden vom Worker geschrieben und von der UI gelesen."""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = "queued"
+        self.progress = 0.0
+        self.stage = "Wartet"
+        self.cancellable = True
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+        self._future: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def update(self, progress: float, stage: str, cancellable: bool = True) -> None:
+        """Fortschritt melden; wirft JobCancelled, wenn abgebrochen wurde und der Job bis hier abbrechbar war."""
+        if self.cancellable and self._cancel.is_set():
+            raise JobCancelled(stage)
+        self.progress = max(0.0, min(1.0, progress))
+        self.stage = stage
+        self.cancellable = cancellable
+
+    def cancel(self) -> bool:
+        """Abbruch anfordern; False, wenn der Job schon fertig oder nicht mehr abbrechbar ist."""
+        if self.done or not self.cancellable:
+            return False
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():  # Noch nicht gestartet
+            self._finish("cancelled")
+        return True
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wartet auf das Ende (für CLI/Tests), gibt done zurück."""
+        if self._future is not None:
+            try:
+                self._future.result(timeout)
+            except Exception:
+                pass
+        return self.done
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+        if status == "done":
+            self.progress = 1.0
+        self.status = status
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "name": self.name, "status": self.status, "progress": round(self.progress, 3),
+            "stage": self.stage, "error": self.error, "created": self.created, "finished": self.finished,
+        }
+
+
+class JobRunner:
+    """Thread-Pool + Job-Tabelle (abgeschlossene Jobs werden nach KEEP_FINISHED verworfen)."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, keep_finished: int = KEEP_FINISHED):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._keep = keep_finished
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Startet fn(job, *args, **kwargs) im Hintergrund; Spans des Jobs werden als Run name erfasst."""
+        job = Job(name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        if job.cancel_requested:
+            job._finish("cancelled")
+            return
+        job.status = "running"
+        try:
+            with record_run(job.name):  # Spans -> run_report.json + metrics.prom
+                result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            job._finish("cancelled")
+            logger.info(f"Job {job.name} ({job.id}) abgebrochen")
+        except Exception as e:
+            job._finish("failed", error=f"{type(e).__name__}: {e}")
+            logger.error(f"Job {job.name} ({job.id}) fehlgeschlagen: {e}")
+        else:
+            job._finish("done", result=result)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self._keep)]:
+            del self._jobs[job_id]
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,286 @@
+# core/metrics.py
+"""
+Leichtgewichtige Instrumentierung: Spans (Wall-Time, Bytes bzw. Zeichen rein/raus, Artikelanzahl) um die Stufen
+von core.parser, core.processor und core.output_processor.
+
+- span(name) / @traced(name, measure): misst einen Abschnitt, Verschachtelung wird über einen Thread-lokalen Stack erfasst.
+- Jeder Span fließt in prozessweite Summen (get_registry()) und – falls aktiv – in den laufenden Run.
+- record_run(name): sammelt die Spans eines Vorgangs (Upload, Generieren, Batch-Datei) und schreibt
+  run_report.json (JSON) und metrics.prom (Prometheus-Textformat) nach OUTPUT_DIR.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from .utils import get_base_dir
+
+logger = logging.getLogger(__name__)
+
+RUN_REPORT_FILE = "run_report.json"
+PROMETHEUS_FILE = "metrics.prom"
+MAX_SPANS_PER_RUN = 10000  # Schutz gegen sehr große Runs (z.B. Spans pro Artikel)
+_BASE_DIR: Any = object()  # Default von record_run: Ausgabe-Ordner der Konfiguration (None heißt dort "nicht schreiben")
+
+_local = threading.local()
+
+
+def _size(value: Any) -> int:
+    """Größe eines Wertes per len (str: Zeichen, bytes/memoryview/mmap: Bytes), int direkt."""
+    if isinstance(value, int):
+        return value
+    return len(value)
+
+
+class Span:
+    """Ein gemessener Abschnitt; Felder werden per set(...) im Abschnitt oder vom measure-Callback gesetzt."""
+    __slots__ = ("name", "depth", "started", "seconds", "bytes_in", "bytes_out", "chars_in", "chars_out", "articles", "attrs")
+
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.started = time.time()
+        self.seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.articles = 0
+        self.attrs: Dict[str, Any] = {}
+
+    def set(self, bytes_in: Any = None, bytes_out: Any = None, articles: Any = None,
+            chars_in: Any = None, chars_out: Any = None, **attrs) -> "Span":
+        """
+        bytes_in/bytes_out: bytes/memoryview/mmap oder Anzahl Bytes (z.B. os.path.getsize);
+        chars_in/chars_out: str oder Anzahl Zeichen – Text wird nicht kodiert, nur gezählt.
+        Ein str unter bytes_* zählt als Zeichen (Puffer wie ArticleSource.buffer können beides sein).
+        articles: Liste oder Anzahl; weitere Felder als attrs.
+        """
+        for value, field, text_field in ((bytes_in, "bytes_in", "chars_in"), (bytes_out, "bytes_out", "chars_out"),
+                                         (chars_in, "chars_in", "chars_in"), (chars_out, "chars_out", "chars_out")):
+            if value is not None:
+                setattr(self, text_field if isinstance(value, str) else field, _size(value))
+        if articles is not None:
+            self.articles = articles if isinstance(articles, int) else len(articles)
+        self.attrs.update(attrs)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name, "depth": self.depth, "seconds": round(self.seconds, 6),
+            "bytes_in": self.bytes_in, "bytes_out": self.bytes_out, "chars_in": self.chars_in, "chars_out": self.chars_out,
+            "articles": self.articles, **self.attrs,
+        }
+
+
+def _new_stats() -> Dict[str, float]:
+    return {"calls": 0, "errors": 0, "seconds": 0.0, "seconds_max": 0.0, "bytes_in": 0, "bytes_out": 0,
+            "chars_in": 0, "chars_out": 0, "articles": 0}
+
+
+def _add(stats: Dict[str, float], span: Span, error: bool) -> None:
+    stats["calls"] += 1
+    stats["errors"] += int(error)
+    stats["seconds"] += span.seconds
+    stats["seconds_max"] = max(stats["seconds_max"], span.seconds)
+    stats["bytes_in"] += span.bytes_in
+    stats["bytes_out"] += span.bytes_out
+    stats["chars_in"] += span.chars_in
+    stats["chars_out"] += span.chars_out
+    stats["articles"] += span.articles
+
+
+def merge_stages(into: Dict[str, Dict[str, float]], stages: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Addiert Stufen-Summen (seconds_max: Maximum) in into."""
+    for name, other in stages.items():
+        stats = into.setdefault(name, _new_stats())
+        for key, value in other.items():
+            stats[key] = max(stats[key], value) if key == "seconds_max" else stats[key] + value
+    return into
+
+
+class MetricsRegistry:
+    """Prozessweite Summen pro Stufe (Aufrufe, Fehler, Sekunden, Bytes, Artikel) + die letzten Runs."""
+
+    def __init__(self, keep_runs: int = 20):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self.runs: Deque[Dict[str, Any]] = deque(maxlen=keep_runs)
+
+    def record(self, span: Span, error: bool = False) -> None:
+        with self._lock:
+            _add(self._stats.setdefault(span.name, _new_stats()), span, error)
+
+    def merge(self, stages: Dict[str, Dict[str, float]]) -> None:
+        """Übernimmt Summen aus einem anderen Prozess (z.B. Batch-Worker)."""
+        with self._lock:
+            merge_stages(self._stats, stages)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def to_prometheus(self) -> str:
+        """Prometheus-Textformat (Counter pro Stufe, Label stage)."""
+        metrics = [
+            ("calls", "counter", "Aufrufe pro Stufe"),
+            ("errors", "counter", "Fehlgeschlagene Aufrufe pro Stufe"),
+            ("seconds", "counter", "Wall-Time pro Stufe in Sekunden"),
+            ("seconds_max", "gauge", "Längster Aufruf pro Stufe in Sekunden"),
+            ("bytes_in", "counter", "Eingelesene Bytes (Dateien, Byte-Puffer) pro Stufe"),
+            ("bytes_out", "counter", "Erzeugte Bytes (Dateien, Byte-Puffer) pro Stufe"),
+            ("chars_in", "counter", "Eingelesene Zeichen (Text) pro Stufe"),
+            ("chars_out", "counter", "Erzeugte Zeichen (Text) pro Stufe"),
+            ("articles", "counter", "Verarbeitete Artikel pro Stufe"),
+        ]
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for key, kind, help_text in metrics:
+            metric = f"news_parser_stage_{key}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name in sorted(snapshot):
+                lines.append(f'{metric}{{stage="{name}"}} {snapshot[name][key]:g}')
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+class RunRecorder:
+    """Sammelt die Spans eines Vorgangs (nur im startenden Thread)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.seconds = 0.0
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.error: Optional[str] = None
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < MAX_SPANS_PER_RUN:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        stages: Dict[str, Dict[str, float]] = {}
+        for s in self.spans:
+            _add(stages.setdefault(s.name, _new_stats()), s, bool(s.attrs.get("error")))
+        return stages
+
+    def report(self) -> Dict[str, Any]:
+        # Spans werden beim Schließen angehängt (innere zuerst) -> nach Startzeit sortiert ausgeben
+        spans = sorted(self.spans, key=lambda s: (s.started, s.depth))
+        return {
+            "run": self.name, "started": self.started, "seconds": round(self.seconds, 6), "error": self.error,
+            "dropped_spans": self.dropped, "stages": self.stage_summary(), "spans": [s.to_dict() for s in spans],
+        }
+
+
+def _stack() -> List[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_reports(report: Dict[str, Any], out_dir: Optional[str] = None) -> None:
+    """Schreibt run_report.json (dieser Run) und metrics.prom (prozessweite Summen); out_dir None = Ausgabe-Ordner der Konfiguration."""
+    out_dir = out_dir or get_base_dir()
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        _write_atomic(os.path.join(out_dir, RUN_REPORT_FILE), json.dumps(report, ensure_ascii=False, indent=2))
+        _write_atomic(os.path.join(out_dir, PROMETHEUS_FILE), _registry.to_prometheus())
+    except OSError as e:
+        logger.warning(f"Metriken konnten nicht geschrieben werden: {e}")
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """Misst den Block; Felder über sp.set(bytes_in=..., chars_out=..., articles=..., ...)."""
+    stack = _stack()
+    sp = Span(name, len(stack))
+    sp.attrs.update(attrs)
+    stack.append(sp)
+    started = time.perf_counter()
+    error = False
+    try:
+        yield sp
+    except BaseException as e:
+        error = True
+        sp.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        sp.seconds = time.perf_counter() - started
+        stack.pop()
+        _registry.record(sp, error)
+        run = getattr(_local, "run", None)
+        if run is not None:
+            run.add(sp)
+
+
+def current_span() -> Optional[Span]:
+    """Innerster offener Span des aktuellen Threads (z.B. um aus einer Stufe Zusatzfelder zu setzen)."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def traced(name: str, measure: Optional[Callable[[Span, tuple, dict, Any], None]] = None) -> Callable:
+    """Decorator: Span um jeden Aufruf; measure(span, args, kwargs, result) setzt Bytes/Artikel nach dem Aufruf."""
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name) as sp:
+                result = fn(*args, **kwargs)
+                if measure is not None:
+                    measure(sp, args, kwargs, result)
+                return result
+        return wrapper
+    return decorator
+
+
+def text_in_out(sp: Span, args: tuple, kwargs: dict, result: Any) -> None:
+    """measure für Funktionen text -> text (erstes Argument rein, Ergebnis raus)."""
+    sp.set(chars_in=args[0] if args else None, chars_out=result)
+
+
+@contextmanager
+def record_run(name: str, out_dir: Optional[str] = _BASE_DIR) -> Iterator[RunRecorder]:
+    """
+    Sammelt alle Spans des aktuellen Threads bis zum Ende des Blocks.
+    out_dir: Default = Ausgabe-Ordner der Konfiguration (beim Schreiben gelesen);
+    None: nichts schreiben (z.B. im Batch-Worker, Summen gehen über stage_summary() zurück).
+    """
+    previous = getattr(_local, "run", None)
+    run = _local.run = RunRecorder(name)
+    started = time.perf_counter()
+    try:
+        yield run
+    except BaseException as e:
+        run.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        run.seconds = time.perf_counter() - started
+        _local.run = previous
+        report = run.report()
+        _registry.runs.append(report)
+        if out_dir is not None:
+            write_reports(report, None if out_dir is _BASE_DIR else out_dir)
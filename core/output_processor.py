@@ -1,32 +1,24 @@
 # core/output_processor.py
 import re
-from typing import List
-
-def build_frontmatter(title: str, date_year: int, date_month: int, date_day: int, media_year: int, media_month: int, categories: List[str], tags: List[str], orte: List[str]) -> str:
-    """
-    Generiert Frontmatter: date mit date_year/month/day, Media-Path mit media_year/month (unabhängig).
-    """
-    date_str = f"{date_year}-{date_month:02d}-{date_day:02d}T00:00:00+02:00"  # Unabhängig: Vollständiges Date
-    cats = ", ".join(sorted(set(c for c in categories if c)))
-    tags_s = ", ".join(sorted(set(t for t in tags if t)))
-    orte_s = ", ".join(sorted(set(o for o in orte if o)))
-    return f"""---
-title: "{title}"
-date: {date_str}
-series: [Blog, Kurznachrichten]
-categories: [{cats}]
-tags: [{tags_s}]
-orte: [{orte_s}]
-media:
-    path: "http://kastl/blog-bf/news/{media_year}/{media_month:02d}/"  # Unabhängig: Nur media_year/month
-layout: card-columns
----
-"""
+import logging
+import threading
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .article import MetaAggregate
+from .metrics import current_span, span, text_in_out, traced
+from .utils import build_frontmatter  # Gemeinsamer Frontmatter-Builder
+
+logger = logging.getLogger(__name__)
+
+# Robuste Regex für Kommentare (einmal kompiliert)
+_COMMENT_RE = re.compile(r'<!--(.*?)-->', re.DOTALL)
 
 def get_last_day_of_month(year: int, month: int) -> int:
     """Hilfsfunktion: Letzter Tag des Monats (z.B. 31 für Oktober)."""
     return calendar.monthrange(year, month)[1]
 
+@traced("output_processor.step1", text_in_out)
 def step1_remove_single_empty_line_after_text(text: str) -> str:
     """
     Schritt 1: Nach jeder Textzeile (nicht-leer) eine Leerzeile entfernen, wenn vorhanden.
@@ -56,6 +48,7 @@ def step1_remove_single_empty_line_after_text(text: str) -> str:
     
     return ''.join(result_lines)
 
+@traced("output_processor.step2", text_in_out)
 def step2_ensure_empty_lines_around_headings(text: str) -> str:
     """
     Schritt 2: Stelle sicher, dass vor und nach jeder Überschrift (###### Titel) mindestens eine Leerzeile steht.
@@ -76,6 +69,7 @@ def step2_ensure_empty_lines_around_headings(text: str) -> str:
             result_lines.append(line)
     return ''.join(result_lines)
 
+@traced("output_processor.step3", text_in_out)
 def step3_ensure_empty_lines_around_comments(text: str) -> str:
     """
     Schritt 3: Stelle sicher, dass vor jedem Kommentar-Beginn (<!-- am Zeilenanfang) und nach jedem Ende (--> am Zeilenanfang) mindestens eine Leerzeile steht.
@@ -104,38 +98,44 @@ def step3_ensure_empty_lines_around_comments(text: str) -> str:
             i += 1
     return ''.join(result_lines)
 
-def step4_add_frontmatter(text: str, title: str, date_year: int, date_month: int, date_day: int, media_year: int, media_month: int) -> str:
-    """
-    Schritt 4: Extrahiere Cats/Tags/Orte aus Kommentar-Blöcken und hänge Frontmatter vorne an.
-    - Sammle alle einzigartigen aus <!-- ... -->.
-    - Baue YAML mit build_frontmatter (date & media unabhängig).
-    """
-    # Extrahiere Cats/Tags/Orte aus allen Kommentar-Blöcken
-    all_cats = set()
-    all_tags = set()
-    all_orte = set()
-    
-    # Robuste Regex für Kommentare
-    comment_matches = re.findall(r'<!--(.*?)-->', text, re.DOTALL)
-    for comment in comment_matches:
-        for line in comment.splitlines():
+def collect_comment_metadata(text: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Sammle alle einzigartigen Cats/Tags/Orte aus <!-- ... --> (ein Regex-Durchlauf, keine Kopie)."""
+    all_cats: Set[str] = set()
+    all_tags: Set[str] = set()
+    all_orte: Set[str] = set()
+    for match in _COMMENT_RE.finditer(text):
+        for line in match.group(1).splitlines():
             line = line.strip()
             if line.lower().startswith('categories:'):
-                cats = [c.strip() for c in line.split(':', 1)[1].split(',') if c.strip()]
-                all_cats.update(cats)
+                all_cats.update(c.strip() for c in line.split(':', 1)[1].split(',') if c.strip())
             elif line.lower().startswith('tags:'):
-                tags = [t.strip() for t in line.split(':', 1)[1].split(',') if t.strip()]
-                all_tags.update(tags)
+                all_tags.update(t.strip() for t in line.split(':', 1)[1].split(',') if t.strip())
             elif line.lower().startswith('orte:'):
-                orte = [o.strip() for o in line.split(':', 1)[1].split(',') if o.strip()]
-                all_orte.update(orte)
-    
-    # Baue Frontmatter (date & media unabhängig)
-    fm = build_frontmatter(title, date_year, date_month, date_day, media_year, media_month, list(all_cats), list(all_tags), list(all_orte))
-    
+                all_orte.update(o.strip() for o in line.split(':', 1)[1].split(',') if o.strip())
+    return all_cats, all_tags, all_orte
+
+def frontmatter_for(text: str, title: str, date_year: int, date_month: int, date_day: int, media_year: int, media_month: int,
+                    meta: Optional[MetaAggregate] = None) -> str:
+    """Frontmatter aus meta (beim Schreiben gesammelt); nur ohne meta werden die Kommentar-Blöcke von text gescannt."""
+    if meta is None:
+        cats, tags, orte = collect_comment_metadata(text)
+    else:
+        cats, tags, orte = meta.categories, meta.tags, meta.orte
+    return build_frontmatter(title, date_year, date_month, cats, tags, orte,
+                             day=date_day, media_year=media_year, media_month=media_month)
+
+@traced("output_processor.step4", text_in_out)
+def step4_add_frontmatter(text: str, title: str, date_year: int, date_month: int, date_day: int, media_year: int, media_month: int,
+                          meta: Optional[MetaAggregate] = None) -> str:
+    """
+    Schritt 4: Frontmatter vorne anhängen (date & media unabhängig).
+    - Cats/Tags/Orte aus meta (MetaAggregate der geschriebenen Artikel), sonst aus allen <!-- ... --> des Textes.
+    """
+    fm = frontmatter_for(text, title, date_year, date_month, date_day, media_year, media_month, meta)
     # Füge vorne an (mit \n\n für Abstand)
     return fm + "\n\n" + text
 
+@traced("output_processor.step5", text_in_out)
 def step5_remove_date_after_heading(text: str) -> str:
     """
     Entfernt '(*Date*)' wenn es direkt am Ende einer '######' Überschrift steht.
@@ -148,6 +148,7 @@ def step5_remove_date_after_heading(text: str) -> str:
         text
     )
 
+@traced("output_processor.step6", text_in_out)
 def step6_remove_placeholder_link_shortcodes(text: str) -> str:
     """
     Entfernt exakt Zeilen, die nur '{{< my_link url="Link" >}}' (mit beliebigen Spaces/Tabs) enthalten.
@@ -160,6 +161,7 @@ def step6_remove_placeholder_link_shortcodes(text: str) -> str:
         text
     )
 
+@traced("output_processor.step7", text_in_out)
 def step7_reduce_multiple_empty_lines(text: str) -> str:
     """
     Letzter Schritt: Prüfe auf mehr als eine Leerzeile hintereinander (\n\n\n+), und ersetze durch genau eine Leerzeile (\n\n).
@@ -169,5 +171,246 @@ def step7_reduce_multiple_empty_lines(text: str) -> str:
     original_len = len(text)
     text = re.sub(r'\n{3,}', '\n\n', text)
     matches = original_len - len(text)
-    print(f"DEBUG Step7: {matches} Zeichen Mehrfach-Leerzeilen reduziert (0 = keine)")  # Entferne später
-    return text
\ No newline at end of file
+    sp = current_span()
+    if sp is not None:
+        sp.set(reduced_chars=matches)
+    logger.debug(f"Step7: {matches} Zeichen Mehrfach-Leerzeilen reduziert (0 = keine)")
+    return text
+
+# =====================================================================
+# Fusionierte Pipeline: alle Schritte in EINEM Durchlauf über die Zeilen
+# =====================================================================
+
+# Standard-Reihenfolge wie bisher in app.py (Frontmatter zuerst, dann 1-3, 5-7)
+DEFAULT_STEP_ORDER: Tuple[str, ...] = ("step4", "step1", "step2", "step3", "step5", "step6", "step7")
+
+# Zeichen, die str.splitlines() zusätzlich zu \n als Zeilenumbruch wertet -> Fallback auf Einzelschritte
+_FOREIGN_LINE_BREAKS_RE = re.compile('[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+# Zeilenweise Varianten der Regexe aus Schritt 5/6 (fullmatch auf Zeile ohne \n)
+_DATE_HEADING_LINE_RE = re.compile(r'(######\s*.*?)\s*\(\*date\*\)\s*', re.IGNORECASE)
+_LINK_LINE_RE = re.compile(r'[ \t]*\{\{<\s*my_link\s+url="Link"\s*>\}\}\s*')
+_LINK_START_RE = re.compile(r'[ \t]*\{\{<')
+
+
+class _NeedsStepwise(Exception):
+    """Intern: Text enthält Konstrukte, die nur die Einzelschritte exakt abbilden (z.B. zeilenübergreifende Regex-Treffer)."""
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Wie text.splitlines(keepends=True) für reine \\n-Texte, aber als Generator."""
+    find = text.find
+    start = 0
+    while True:
+        end = find('\n', start)
+        if end < 0:
+            if start < len(text):
+                yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+def _stage_step1(lines: Iterable[str]) -> Iterator[str]:
+    """Zeilen-Stufe zu step1: letzte Leerzeile eines Leerzeilen-Blocks nach Text entfällt."""
+    seen_text = False
+    pending: Optional[str] = None
+    for line in lines:
+        if line.strip():
+            pending = None  # Letzte Leerzeile vor dem Text wird verworfen
+            seen_text = True
+            yield line
+        elif not seen_text:
+            yield line
+        else:
+            if pending is not None:
+                yield pending
+            pending = line
+
+
+def _stage_step2(lines: Iterable[str]) -> Iterator[str]:
+    """Zeilen-Stufe zu step2: Leerzeilen um ###### Überschriften."""
+    prev_filled = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('######'):
+            if prev_filled:
+                yield '\n'
+            if line.endswith('\n'):
+                yield line
+                yield '\n'
+            else:
+                yield line + '\n'  # Letzte Zeile ohne \n: angehängtes \n schließt nur die Zeile ab
+        else:
+            yield line
+        prev_filled = bool(stripped)
+
+
+def _stage_step3(lines: Iterable[str]) -> Iterator[str]:
+    """Zeilen-Stufe zu step3: Leerzeilen um Kommentar-Beginn/-Ende (eine Zeile Lookahead)."""
+    prev_filled = False
+    after_close = False
+    for line in lines:
+        filled = bool(line.strip())
+        if after_close and filled:
+            yield '\n'
+        after_close = False
+        if line.lstrip().startswith('<!--'):
+            if prev_filled:
+                yield '\n'
+        elif '-->' in line:
+            after_close = True
+        yield line
+        prev_filled = filled
+
+
+def _stage_step5(lines: Iterable[str]) -> Iterator[str]:
+    """Zeilen-Stufe zu step5: '(*Date*)' am Ende von Überschriften, inkl. folgender Leerzeilen (wie \\s* in der Regex)."""
+    swallowing = False
+    for line in lines:
+        if swallowing:
+            if not line.strip():
+                continue
+            swallowing = False
+        if line.startswith('######'):
+            content = line[:-1] if line.endswith('\n') else line
+            if not content[6:].strip():
+                raise _NeedsStepwise()  # '######\s*' würde in die nächste Zeile greifen
+            match = _DATE_HEADING_LINE_RE.fullmatch(content)
+            if match:
+                yield match.group(1) + '\n'
+                swallowing = True
+                continue
+        elif line.lstrip()[:8].lower() == '(*date*)':
+            raise _NeedsStepwise()  # '(*Date*)' auf eigener Zeile nach einer Überschrift
+        yield line
+
+
+def _stage_step6(lines: Iterable[str]) -> Iterator[str]:
+    """Zeilen-Stufe zu step6: Platzhalter-Zeilen {{< my_link url="Link" >}} samt folgender Leerzeilen entfernen."""
+    swallowing = False
+    for line in lines:
+        if swallowing:
+            if not line.strip():
+                continue
+            swallowing = False
+        if _LINK_START_RE.match(line):
+            content = line[:-1] if line.endswith('\n') else line
+            if _LINK_LINE_RE.fullmatch(content):
+                swallowing = True
+                continue
+            if '>}}' not in content:
+                raise _NeedsStepwise()  # Shortcode könnte über mehrere Zeilen gehen
+        yield line
+
+
+def _stage_step7(lines: Iterable[str]) -> Iterator[str]:
+    """Zeilen-Stufe zu step7: mehr als zwei \\n hintereinander auf zwei reduzieren."""
+    run = 0
+    for line in lines:
+        if line == '\n':
+            run += 1
+            if run >= 3:
+                continue
+        elif line.endswith('\n'):
+            run = 1
+        else:
+            run = 0
+        yield line
+
+
+# Name -> (Einzelschritt, Zeilen-Stufe); step4 ist keine Zeilen-Stufe (Frontmatter wird vorangestellt)
+STEP_FUNCTIONS: Dict[str, Callable[..., str]] = {
+    "step1": step1_remove_single_empty_line_after_text,
+    "step2": step2_ensure_empty_lines_around_headings,
+    "step3": step3_ensure_empty_lines_around_comments,
+    "step4": step4_add_frontmatter,
+    "step5": step5_remove_date_after_heading,
+    "step6": step6_remove_placeholder_link_shortcodes,
+    "step7": step7_reduce_multiple_empty_lines,
+}
+
+_LINE_STAGES: Dict[str, Callable[[Iterable[str]], Iterator[str]]] = {
+    "step1": _stage_step1,
+    "step2": _stage_step2,
+    "step3": _stage_step3,
+    "step5": _stage_step5,
+    "step6": _stage_step6,
+    "step7": _stage_step7,
+}
+
+
+class OutputPipeline:
+    """
+    Kompilierte Post-Processing-Pipeline: wendet die Schritte in der gegebenen Reihenfolge
+    in einem einzigen Streaming-Durchlauf über die Zeilen an (byte-identisch zur Einzelschritt-Kette).
+    Texte mit Sonderfällen (fremde Zeilenumbrüche, zeilenübergreifende Treffer) laufen über die Einzelschritte.
+    """
+
+    def __init__(self, order: Sequence[str] = DEFAULT_STEP_ORDER):
+        unknown = [name for name in order if name not in STEP_FUNCTIONS]
+        if unknown:
+            raise ValueError(f"Unbekannte Schritte: {', '.join(unknown)}")
+        self.order: Tuple[str, ...] = tuple(order)
+
+    def __repr__(self) -> str:
+        return f"OutputPipeline({list(self.order)})"
+
+    def run(self, text: str, title: str = "", date_year: int = 0, date_month: int = 0, date_day: int = 0,
+            media_year: int = 0, media_month: int = 0, meta: Optional[MetaAggregate] = None) -> str:
+        """
+        Verarbeitet text; die Frontmatter-Parameter werden nur für step4 benötigt.
+        meta: categories/tags/orte der Artikel in text (aus generate_output) – step4 scannt dann keine Kommentare.
+        """
+        fm_args = (title, date_year, date_month, date_day, media_year, media_month)
+        with span("output_processor.pipeline", steps=",".join(self.order)) as sp:
+            try:
+                result = self._run_fused(text, fm_args, meta)
+                sp.set(mode="fused")
+            except _NeedsStepwise:
+                result = self.run_stepwise(text, *fm_args, meta=meta)
+                sp.set(mode="stepwise")
+            sp.set(chars_in=text, chars_out=result, articles=text.count("######"))
+            return result
+
+    def run_stepwise(self, text: str, title: str = "", date_year: int = 0, date_month: int = 0, date_day: int = 0,
+                     media_year: int = 0, media_month: int = 0, meta: Optional[MetaAggregate] = None) -> str:
+        """Referenz: Einzelschritte nacheinander (bisheriges Verhalten)."""
+        for name in self.order:
+            if name == "step4":
+                text = step4_add_frontmatter(text, title, date_year, date_month, date_day, media_year, media_month, meta)
+            else:
+                text = STEP_FUNCTIONS[name](text)
+        return text
+
+    def _run_fused(self, text: str, fm_args: tuple, meta: Optional[MetaAggregate] = None) -> str:
+        if _FOREIGN_LINE_BREAKS_RE.search(text):
+            raise _NeedsStepwise()
+        lines: Iterable[str] = _iter_lines(text)
+        for name in self.order:
+            if name == "step4":
+                # Cats/Tags/Orte ändern sich durch die Zeilen-Stufen nicht -> aus meta bzw. dem Eingangstext
+                fm = frontmatter_for(text, *fm_args, meta)
+                if _FOREIGN_LINE_BREAKS_RE.search(fm):
+                    raise _NeedsStepwise()
+                lines = chain(_iter_lines(fm + "\n\n"), lines)
+            else:
+                lines = _LINE_STAGES[name](lines)
+        return ''.join(lines)
+
+
+def compile_pipeline(order: Sequence[str] = DEFAULT_STEP_ORDER) -> OutputPipeline:
+    """Erzeugt eine Pipeline für die gegebene Schritt-Reihenfolge (z.B. ("step4", "step1", ..., "step7"))."""
+    return OutputPipeline(order)
+
+
+_default_pipeline: Optional[OutputPipeline] = None
+_default_pipeline_lock = threading.Lock()
+
+
+def get_default_pipeline() -> OutputPipeline:
+    """Prozessweit einmal kompilierte Pipeline in DEFAULT_STEP_ORDER."""
+    global _default_pipeline
+    with _default_pipeline_lock:
+        if _default_pipeline is None:
+            _default_pipeline = compile_pipeline(DEFAULT_STEP_ORDER)
+        return _default_pipeline
@@ -1,12 +1,13 @@
 # core/parser.py
-import os
-import json
 import re
-import difflib
-from typing import List, Dict, Tuple
+import itertools
+from typing import IO, Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple, Union
 
-# FIX: Importiere OUTPUT_DIR / DEBUG_DIR aus utils (zentral und sauber)
-from .utils import OUTPUT_DIR, DEBUG_DIR  # DEBUG_DIR wird hier erstellt
+from .debug import debug_emit  # Debug-Artefakte: NEWS_PARSER_DEBUG=off|jsonl|thread
+from .metrics import text_in_out, traced
+from .article import Article, ArticleSource, ByteOffsets
+from .streaming import CHUNK_SIZE, Spool, iter_chunks
+from .vocabulary import VocabularyMatcher, correct_fields, get_matcher
 
 ALLOWED_CATEGORIES = [
     "Politik", "Gesellschaft", "Bildung & Erziehung", "Wissenschaft & Forschung",
@@ -15,71 +16,156 @@ ALLOWED_CATEGORIES = [
     "Mobilität & Verkehr", "Engagement & Protest", "Recht & Justiz"
 ]
 
+# Block-Trenner und Header-Fallback werden per str.find gesucht (entspricht r"\s*\n?<!--split-->\s*\n?" / r"\n######\s")
+SPLIT_MARKER = "<!--split-->"
+_HEADER_MARKER = "\n######"
+# Einmal kompilierte Regexe (Titel, Kommentar)
+_TITLE_RE = re.compile(r"######\s*(.+?)\n")
+_COMMENT_RE = re.compile(r"<!--(.*?)-->", re.DOTALL)
+
+class BlockToken(NamedTuple):
+    """Ein Block aus tokenize(): Grenzen, Titel-/Kommentar-Span (Zeichen-Offsets) und Felder aus dem Kommentar."""
+    start: int
+    end: int
+    header_prefix: bool                       # Block = "###### " + text[start:end] (######-Fallback)
+    title_span: Optional[Tuple[int, int]]     # None: Block ohne Titel (wird nicht zum Artikel)
+    meta_span: Tuple[int, int]                # Inhalt des ersten <!-- ... -->, (start, start) wenn keiner
+    categories: List[str]
+    tags: List[str]
+    orte: List[str]
+
+@traced("parser.load_and_strip_frontmatter", text_in_out)
 def load_and_strip_frontmatter(text: str) -> str:
-    """Schritt 1: Entferne Frontmatter, schreibe Debug-File."""
+    """Schritt 1: Entferne Frontmatter, Debug über den Debug-Sink."""
     cleaned = re.sub(r'^---\n(.*?)\n---\n', '', text, flags=re.M | re.S)
-    debug_path = os.path.join(DEBUG_DIR, "debug_step1_no_frontmatter.txt")
-    with open(debug_path, "w", encoding="utf-8") as f:
-        f.write(cleaned)
-    print(f"Debug: Step 1 geschrieben nach {debug_path}")  # Oder logger
+    debug_emit("step1_no_frontmatter", cleaned)
     return cleaned
 
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Wie text[start:end].strip(), aber als Offsets (ohne Kopie)."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def _iter_split_pieces(text: str) -> Iterator[Tuple[int, int]]:
+    """Stücke zwischen <!--split-->-Markern; Whitespace um die Marker gehört (wie bei der Regex) zum Trenner."""
+    find = text.find
+    pos = 0
+    marker = find(SPLIT_MARKER)
+    while marker >= 0:
+        sep_start = marker
+        while sep_start > pos and text[sep_start - 1].isspace():
+            sep_start -= 1
+        sep_end = marker + len(SPLIT_MARKER)
+        while sep_end < len(text) and text[sep_end].isspace():
+            sep_end += 1
+        yield pos, sep_start
+        pos = sep_end
+        marker = find(SPLIT_MARKER, pos)
+    yield pos, len(text)
+
+def _iter_header_parts(text: str) -> Iterator[Tuple[int, int]]:
+    """Teile nach jedem \n######<Whitespace> (Teil vor dem ersten Header entfällt)."""
+    find = text.find
+    part_start = None
+    i = find(_HEADER_MARKER)
+    while i >= 0:
+        after = i + len(_HEADER_MARKER)
+        if after < len(text) and text[after].isspace():
+            if part_start is not None:
+                yield part_start, i
+            part_start = after + 1
+            i = find(_HEADER_MARKER, part_start)
+        else:
+            i = find(_HEADER_MARKER, i + 1)
+    if part_start is not None:
+        yield part_start, len(text)
+
+def iter_block_spans(text: str) -> Iterator[Tuple[int, int, bool]]:
+    """
+    Streamt (start, end, header_prefix) aller Blöcke in einem Durchlauf.
+    Der erste Block wird zurückgehalten, bis ein zweiter gefunden ist – bleibt es bei einem, gilt der ######-Fallback.
+    """
+    first = None
+    count = 0
+    for start, end in _iter_split_pieces(text):
+        start, end = _strip_span(text, start, end)
+        if end - start < 5:  # Filter leere
+            continue
+        count += 1
+        if count == 1:
+            first = (start, end, False)
+            continue
+        if count == 2:
+            yield first
+        yield start, end, False
+    if count == 1:
+        # Fallback: Wenn nur 1 Block, split auf \n###### (rekonstruiere mit Header)
+        has_parts = False
+        for start, end in _iter_header_parts(text):
+            has_parts = True
+            yield _strip_span(text, start, end) + (True,)
+        if not has_parts:
+            yield first
+
+def split_into_block_spans(text: str) -> List[Tuple[int, int, bool]]:
+    """
+    Wie split_into_raw_blocks, liefert aber (start, end, header_prefix) statt Kopien.
+    header_prefix=True: Block stammt aus dem ######-Fallback und beginnt mit "###### " + text[start:end].
+    """
+    return list(iter_block_spans(text))
+
+@traced("parser.split_into_raw_blocks", lambda sp, args, kw, res: sp.set(chars_in=args[0], articles=res))
 def split_into_raw_blocks(text: str) -> List[str]:
     """FIX: Split auf <!--split-->, Fallback auf ###### wenn nur 1 Block."""
-    blocks = re.split(r"\s*\n?<!--split-->\s*\n?", text)
-    blocks = [b.strip() for b in blocks if len(b.strip()) >= 5]  # Filter leere
-    
-    # Fallback: Wenn nur 1 Block, split auf \n###### (rekonstruiere mit Header)
-    if len(blocks) == 1:
-        sub_parts = re.split(r'\n######\s', text)  # Split auf Header
-        if len(sub_parts) > 1:
-            blocks = [f"###### {sub_parts[i].strip()}" for i in range(1, len(sub_parts))]  # Jeder Part als Block
-    
-    return blocks
+    return [(Article.HEADER_PREFIX if prefixed else "") + text[start:end] for start, end, prefixed in split_into_block_spans(text)]
 
 def extract_title_from_block(block: str) -> Tuple[str, bool]:
     """Hilfsfunktion: Extrahiere Titel aus Block."""
-    match = re.search(r"######\s*(.+?)\n", block)
+    match = _TITLE_RE.search(block)
     if match:
         return match.group(1).strip(), True
     return "", False
 
 def extract_comment_from_block(block: str) -> str:
     """Hilfsfunktion: Extrahiere Kommentar aus Block."""
-    match = re.search(r"<!--(.*?)-->", block, re.DOTALL)
+    match = _COMMENT_RE.search(block)
     return match.group(1).strip() if match else ""
 
+def _split_values(value: str) -> List[str]:
+    return [p.strip() for p in value.split(",") if p.strip()]
+
 def parse_comment_block(comment: str) -> Tuple[List[str], List[str], List[str]]:
-    """Unverändert (Stub für Kategorien/Tags)."""
+    """Cats/Tags/Orte aus einem Kommentar (Zeilen 'categories:', 'tags:', 'orte:', Groß/Klein egal; spätere gewinnen)."""
     cats, tags, orte = [], [], []
-    for line in [l.strip() for l in comment.splitlines() if l.strip()]:
-        if line.lower().startswith("categories:"):
-            cats = [p.strip() for p in line.split(":", 1)[1].split(",") if p.strip()]
-        elif line.lower().startswith("tags:"):
-            tags = [p.strip() for p in line.split(":", 1)[1].split(",") if p.strip()]
-        elif line.lower().startswith("orte:"):
-            orte = [p.strip() for p in line.split(":", 1)[1].split(",") if p.strip()]
+    for line in comment.splitlines():
+        line = line.strip()
+        first = line[:1]
+        # Nur das Präfix klein schreiben statt der ganzen Zeile
+        if first in ("c", "C"):
+            if line[:11].lower() == "categories:":
+                cats = _split_values(line[11:])
+        elif first in ("t", "T"):
+            if line[:5].lower() == "tags:":
+                tags = _split_values(line[5:])
+        elif first in ("o", "O"):
+            if line[:5].lower() == "orte:":
+                orte = _split_values(line[5:])
     return cats, tags, orte
 
-def extract_single_article(block: str, block_index: int) -> Dict:
-    """Hilfsfunktion: Extrahiere einen Artikel aus Block, mit per-Artikel-Debug."""
-    title, has_title = extract_title_from_block(block)
-    if not has_title:
+def extract_single_article(block: str, block_index: int) -> Article:
+    """Hilfsfunktion: Extrahiere einen Artikel aus Block, mit per-Artikel-Debug (Sink)."""
+    article = _article_from_span(ArticleSource.from_text(block), block, 0, len(block), False)
+    if article is None:
         raise ValueError(f"Kein Titel in Block {block_index}")
-    comment = extract_comment_from_block(block)
-    cats, tags, orte = parse_comment_block(comment)
-    article = {
-        "title": title, "categories": cats, "tags": tags, "orte": orte,
-        "raw": block + "\n"
-    }
-    # Debug pro Artikel
-    debug_path = os.path.join(DEBUG_DIR, f"debug_step3_article_{block_index}.json")
-    with open(debug_path, "w", encoding="utf-8") as f:
-        json.dump(article, f, ensure_ascii=False, indent=2)
-    print(f"Debug: Step 3 Artikel {block_index} geschrieben nach {debug_path}")
+    # Debug pro Artikel (nur bei aktivem Sink, raw wird erst dann materialisiert)
+    debug_emit("step3_article", article.to_dict, index=block_index)
     return article
 
-def extract_articles_from_blocks(blocks: List[str]) -> List[Dict]:
+@traced("parser.extract_articles_from_blocks", lambda sp, args, kw, res: sp.set(articles=res))
+def extract_articles_from_blocks(blocks: List[str]) -> List[Article]:
     """Schritt 3: Extrahiere Artikel aus Blöcken."""
     articles = []
     for i, block in enumerate(blocks):
@@ -90,49 +176,227 @@ def extract_articles_from_blocks(blocks: List[str]) -> List[Dict]:
             print(f"Warnung: Überspringe Block {i}: {e}")
     return articles
 
+def get_vocabulary_matchers() -> Dict[str, VocabularyMatcher]:
+    """Feld -> Matcher: Kategorien gegen ALLOWED_CATEGORIES, Tags/Orte nur wenn ein Vokabular hinterlegt ist."""
+    matchers = {"categories": get_matcher("categories", ALLOWED_CATEGORIES)}
+    for field in ("tags", "orte"):
+        matcher = get_matcher(field)
+        if matcher is not None:
+            matchers[field] = matcher
+    return matchers
+
 # NEU: Interne Funktion für detaillierte Validierung (mit Debug)
-def validate_articles(articles: List[Dict]) -> Tuple[List[Dict], str]:
-    """Schritt 4: Validiere/Korrigiere Kategorien, schreibe Debug-JSON."""
-    all_cats = {c.strip() for a in articles for c in a["categories"] if c != "Unkategorisiert"}
-    invalid = [c for c in all_cats if c not in ALLOWED_CATEGORIES]
-    corrections = []
-    if invalid:
-        for inv in invalid:
-            match = difflib.get_close_matches(inv, ALLOWED_CATEGORIES, n=1, cutoff=0.8)
-            if match:
-                corr = match[0]
-                corrections.append((inv, corr))
-                for a in articles:
-                    a["categories"] = [corr if c.strip() == inv else c for c in a["categories"]]
-            else:
-                raise ValueError(f"Ungültige Kategorie: {inv}")
+@traced("parser.validate_articles", lambda sp, args, kw, res: sp.set(articles=res[0], corrections=res[1].count(" to ")))
+def validate_articles(articles: List[Article]) -> Tuple[List[Article], str]:
+    """Schritt 4: Validiere/Korrigiere Kategorien (und Tags/Orte mit Vokabular), Debug über den Debug-Sink."""
+    corrections = correct_fields(articles, get_vocabulary_matchers())
     # Debug: Vollständige validated Articles
-    debug_path = os.path.join(DEBUG_DIR, "debug_step4_validated.json")
-    with open(debug_path, "w", encoding="utf-8") as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
-    print(f"Debug: Step 4 geschrieben nach {debug_path}")
+    debug_emit("step4_validated", lambda: [a.to_dict() for a in articles])
     return articles, " | ".join([f"{old} to {new}" for old, new in corrections])
 
 # FIX: Wrapper-Funktion für Kompatibilität (returnt nur den String, modifiziert Articles in-place)
-def validate_and_correct_categories(articles: List[Dict]) -> str:
+def validate_and_correct_categories(articles: List[Article]) -> str:
     """Kompatible API: Validiert und korrigiert (modifiziert Articles), returnt Korrektur-String."""
     _, corrections_str = validate_articles(articles)  # Ruft interne Funktion auf (inkl. Debug)
     return corrections_str
 
-def parse_articles_from_text(text: str) -> List[Dict]:
+def _token_for_span(text: str, start: int, end: int, prefixed: bool) -> BlockToken:
+    """Titel, Kommentar und Felder eines Blocks (Suche nur innerhalb des Blocks)."""
+    if prefixed:
+        # "###### " + Block: Titel ist die erste Zeile des Blocks (nur wenn danach ein \n folgt)
+        newline = text.find("\n", start, end)
+        title_span = _strip_span(text, start, newline) if newline >= 0 else None
+    else:
+        t_m = _TITLE_RE.search(text, start, end)
+        title_span = _strip_span(text, *t_m.span(1)) if t_m else None
+    com_m = _COMMENT_RE.search(text, start, end)
+    if com_m:
+        meta_span = com_m.span(1)
+        cats, tags, orte = parse_comment_block(com_m.group(1))
+    else:
+        meta_span = (start, start)
+        cats, tags, orte = [], [], []
+    return BlockToken(start, end, prefixed, title_span, meta_span, cats, tags, orte)
+
+def tokenize(text: str) -> Iterator[BlockToken]:
+    """Ein Durchlauf über text: Blockgrenzen, Titel-Span, Kommentar-Span und categories/tags/orte pro Block (Generator)."""
+    for start, end, prefixed in iter_block_spans(text):
+        yield _token_for_span(text, start, end, prefixed)
+
+def _article_from_token(source: ArticleSource, token: BlockToken,
+                        to_offset: Optional[Callable[[int], int]] = None) -> Article:
+    start, end, title_span, meta_span = token.start, token.end, token.title_span, token.meta_span
+    if to_offset is not None:
+        # Aufsteigend umrechnen, damit ByteOffsets jeden Abschnitt nur einmal kodiert
+        mapped = {pos: to_offset(pos) for pos in sorted({start, end, *title_span, *meta_span})}
+        start, end = mapped[start], mapped[end]
+        title_span = (mapped[title_span[0]], mapped[title_span[1]])
+        meta_span = (mapped[meta_span[0]], mapped[meta_span[1]])
+    return Article(source, start, end, title_span, meta_span, token.categories, token.tags, token.orte,
+                   header_prefix=token.header_prefix)
+
+def _article_from_span(source: ArticleSource, text: str, start: int, end: int, prefixed: bool,
+                       to_offset: Optional[Callable[[int], int]] = None) -> Optional[Article]:
+    """Baut einen Artikel aus einem Block-Span von text; None, wenn der Block keinen Titel hat."""
+    token = _token_for_span(text, start, end, prefixed)
+    return _article_from_token(source, token, to_offset) if token.title_span is not None else None
+
+def iter_articles(source: ArticleSource) -> Iterator[Article]:
+    """Streamt die Artikel eines Quell-Puffers; Artikel referenzieren den Puffer nur per Offsets."""
+    if source.is_text:
+        text, to_offset = source.buffer, None
+    else:
+        text = source.text()  # Nur für die Dauer des Parsens
+        to_offset = ByteOffsets(text)
+    for token in tokenize(text):
+        if token.title_span is not None:
+            yield _article_from_token(source, token, to_offset)
+
+@traced("parser.parse_articles", lambda sp, args, kw, res: sp.set(bytes_in=args[0].buffer, articles=res))
+def parse_articles(source: ArticleSource) -> List[Article]:
+    """Parst alle Artikel eines Quell-Puffers; Artikel referenzieren den Puffer nur per Offsets."""
+    return list(iter_articles(source))
+
+@traced("parser.load_articles", lambda sp, args, kw, res: sp.set(articles=res))
+def load_articles(path: str, use_mmap: bool = False) -> List[Article]:
+    """Parst eine Datei (z.B. Working Copy) direkt aus ihrem Byte-Puffer."""
+    return parse_articles(ArticleSource.from_file(path, use_mmap=use_mmap))
+
+@traced("parser.parse_articles_from_text", lambda sp, args, kw, res: sp.set(chars_in=args[0], articles=res))
+def parse_articles_from_text(text: str) -> List[Article]:
     """FIX: Nutzt neuen split_into_raw_blocks für korrekte Trennung."""
-    articles = []
-    blocks = split_into_raw_blocks(text)
-    for block in blocks:
-        t_m = re.search(r"######\s*(.+?)\n", block)
-        if not t_m:
-            continue
-        title = t_m.group(1).strip()
-        com_m = re.search(r"<!--(.*?)-->", block, re.DOTALL)
-        comment = com_m.group(1).strip() if com_m else ""
-        cats, tags, orte = parse_comment_block(comment)
-        articles.append({
-            "title": title, "categories": cats, "tags": tags, "orte": orte,
-            "raw": block + "\n"  # Vollständiger Block
-        })
-    return articles
\ No newline at end of file
+    return parse_articles(ArticleSource.from_text(text))
+
+
+# --- Streaming: Artikel aus einem Datei-Objekt, ohne den ganzen Text im Speicher ---
+def _iter_split_fragments(chunks: Iterable[str]) -> Iterator[Optional[str]]:
+    """Text-Fragmente zwischen <!--split-->-Markern über Chunk-Grenzen hinweg; None steht für einen Marker."""
+    keep = len(SPLIT_MARKER) - 1  # Angefangener Marker am Chunk-Ende
+    carry = ""
+    for chunk in chunks:
+        data = carry + chunk
+        pos = 0
+        marker = data.find(SPLIT_MARKER)
+        while marker >= 0:
+            if marker > pos:
+                yield data[pos:marker]
+            yield None
+            pos = marker + len(SPLIT_MARKER)
+            marker = data.find(SPLIT_MARKER, pos)
+        cut = max(pos, len(data) - keep)
+        if cut > pos:
+            yield data[pos:cut]
+        carry = data[cut:]
+    if carry:
+        yield carry
+
+def _iter_split_pieces_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Stücke zwischen <!--split-->-Markern (ungestrippt), jeweils einmal zusammengesetzt."""
+    parts: List[str] = []
+    for fragment in _iter_split_fragments(chunks):
+        if fragment is None:
+            yield "".join(parts)
+            parts = []
+        else:
+            parts.append(fragment)
+    yield "".join(parts)
+
+def _iter_header_parts_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Wie _iter_header_parts, über Chunk-Grenzen hinweg (Teil vor dem ersten Header entfällt)."""
+    marker_len = len(_HEADER_MARKER)
+    parts: Optional[List[str]] = None  # None: noch vor dem ersten Header
+    carry = ""
+    for chunk in chunks:
+        data = carry + chunk
+        pos = 0
+        i = data.find(_HEADER_MARKER)
+        while i >= 0:
+            after = i + marker_len
+            if after >= len(data):
+                break  # Zeichen nach dem Marker kommt erst mit dem nächsten Chunk
+            if data[after].isspace():
+                if parts is not None:
+                    parts.append(data[pos:i])
+                    yield "".join(parts)
+                parts = []
+                pos = after + 1
+                i = data.find(_HEADER_MARKER, pos)
+            else:
+                i = data.find(_HEADER_MARKER, i + 1)
+        cut = i if i >= 0 else max(pos, len(data) - (marker_len - 1))
+        if parts is not None and cut > pos:
+            parts.append(data[pos:cut])
+        carry = data[cut:]
+    if parts is not None:
+        parts.append(carry)
+        yield "".join(parts)
+
+def _iter_kept_pieces(chunks: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    for piece in _iter_split_pieces_stream(chunks):
+        piece = piece.strip()
+        if len(piece) >= 5:  # Filter leere
+            yield piece, False
+
+def iter_blocks_from_chunks(chunks: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    """
+    Streaming-Variante von iter_block_spans: (Block, header_prefix) aus Text-Chunks.
+    Bis ein zweiter Block feststeht, wird der gelesene Text gespoolt; bleibt es bei einem Block,
+    gilt wie bisher der ######-Fallback über den ganzen (gespoolten) Text. Sonst hält der Speicher nur den aktuellen Block.
+    """
+    chunks = iter(chunks)
+    spool = Spool()
+
+    def recorded() -> Iterator[str]:
+        for chunk in chunks:
+            spool.write(chunk)
+            yield chunk
+
+    try:
+        count = 0
+        started, length, trailing_ws, counted = False, 0, 0, False
+        for fragment in _iter_split_fragments(recorded()):
+            if fragment is None:  # Neues Stück
+                started, length, trailing_ws, counted = False, 0, 0, False
+                continue
+            if counted:
+                continue
+            if not started:
+                fragment = fragment.lstrip()
+                if not fragment:
+                    continue
+                started = True
+            body = fragment.rstrip()
+            if body:
+                length += trailing_ws + len(body)  # Gestrippte Länge des Stücks bis hier
+                trailing_ws = len(fragment) - len(body)
+            else:
+                trailing_ws += len(fragment)
+            if length >= 5:
+                counted = True
+                count += 1
+                if count == 2:
+                    break
+        if count == 2:
+            # Normalfall: gespoolter Anfang + Rest des Streams, Block für Block
+            yield from _iter_kept_pieces(itertools.chain(spool.chunks(), chunks))
+        elif count == 1:
+            # Fallback: Wenn nur 1 Block, split auf \n###### (rekonstruiere mit Header)
+            has_parts = False
+            for part in _iter_header_parts_stream(spool.chunks()):
+                has_parts = True
+                yield part.strip(), True
+            if not has_parts:
+                yield from _iter_kept_pieces(spool.chunks())
+    finally:
+        spool.close()
+
+def iter_articles_from_stream(stream: Union[IO[str], Iterable[str]], chunk_size: int = CHUNK_SIZE) -> Iterator[Article]:
+    """
+    Streamt Artikel aus einem Text-Datei-Objekt (oder Iterable von Text-Chunks), z.B. SourceCleaner.
+    Jeder Artikel hält nur seinen eigenen Block; Speicher ist durch den größten Artikel begrenzt.
+    """
+    chunks = iter_chunks(stream, chunk_size) if hasattr(stream, "read") else stream
+    for block, prefixed in iter_blocks_from_chunks(chunks):
+        article = _article_from_span(ArticleSource.from_text(block), block, 0, len(block), prefixed)
+        if article is not None:
+            yield article
@@ -1,18 +1,33 @@
 # core/processor.py
 import os
 import re
+import io
 import hashlib
+import threading
 from datetime import datetime
-from typing import List, Dict, Set
+from typing import IO, TYPE_CHECKING, Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Set, Tuple, Union
 import logging
 
-from .parser import parse_articles_from_text  # Nutzen für verbleibende raw
+from .archive import get_published_index
+from .article import Article, ArticleRef, MetaAggregate, write_raw_blocks
+from .metrics import span, text_in_out, traced
+from .streaming import Spool, iter_chunks
+from .working_copy import WorkingCopyStore, open_store  # Block-Index statt erneutem Rewrite-Parsen
 from .utils import build_frontmatter, slugify  # Nicht für Raw-Output
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+if TYPE_CHECKING:
+    from .output_processor import OutputPipeline  # Schritte werden erst beim ersten Generieren geladen
+
 logger = logging.getLogger(__name__)
 
-def create_working_copy(src_text: str, file_name: str, base_dir: str) -> str:
+def working_copy_path(file_name: str, base_dir: str, ext: str = ".md") -> str:
+    """Pfad für eine neue Working Copy: working_{md5(file_name)[:8]}_{Zeitstempel}{ext} (ext: .md oder .sqlite)"""
+    hash_part = hashlib.md5(file_name.encode()).hexdigest()[:8]
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(base_dir, f"working_{hash_part}_{ts}{ext}")
+
+@traced("processor.clean_source_text", text_in_out)
+def clean_source_text(src_text: str) -> str:
     """RAW: Entferne Frontmatter + alles vor erstem ###### (für 'nur Artikel'), behalte Whitespace danach 1:1."""
     # Entferne Frontmatter
     cleaned = re.sub(r'^---\n(.*?)\n---\n', '', src_text, flags=re.M | re.S)
@@ -21,68 +36,340 @@ def create_working_copy(src_text: str, file_name: str, base_dir: str) -> str:
     if first_heading_match:
         cleaned = cleaned[first_heading_match.start():]
     # KEIN Strip, KEINE anderen Änderungen – roh!
-    
-    hash_part = hashlib.md5(file_name.encode()).hexdigest()[:8]
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = os.path.join(base_dir, f"working_{hash_part}_{ts}.md")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(cleaned)
+    return cleaned
+
+_OPENING_RE = re.compile(r"^---\n", re.M)
+_CLOSING = "\n---\n"
+_FM_CLOSING = "\n---"
+
+class SourceCleaner:
+    """
+    Streaming-Variante von clean_source_text + extract_year_month für große Quellen.
+    Iterieren liefert den bereinigten Text in Chunks (gleiches Ergebnis wie clean_source_text),
+    year/month stehen nach dem Durchlauf bereit. Gepuffert wird nur unentschiedener Text
+    (offener ---Block, Text vor dem ersten ######) – ab SPOOL_MAX_SIZE in einer Temp-Datei.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = chunks
+        self.year, self.month = _year_month_from_frontmatter(None)
+        self._fm_state = "wait"  # wait -> capture (erster ---Block) -> done
+
+    def __iter__(self) -> Iterator[str]:
+        return self._cut_before_heading(self._strip_frontmatter())
+
+    def _strip_frontmatter(self) -> Iterator[str]:
+        """Entfernt alle ^---\n ... \n---\n Blöcke wie re.sub in clean_source_text."""
+        pending = Spool()   # Offener Block ab "---\n", solange kein Abschluss gefunden ist
+        buf = ""            # Beginnt immer am Zeilenanfang oder mit dem \n davor
+        in_block = False
+        try:
+            for chunk in _with_end_marker(self._chunks):
+                final = chunk is None
+                if not final:
+                    buf += chunk
+                while True:
+                    if not in_block:
+                        m = _OPENING_RE.search(buf)
+                        if m is None:
+                            if final:
+                                yield buf
+                                buf = ""
+                            else:
+                                cut = buf.rfind("\n")  # Angefangene Zeile könnte ein "---" werden
+                                if cut > 0:
+                                    yield buf[:cut]
+                                    buf = buf[cut:]
+                            break
+                        if m.start():
+                            yield buf[:m.start()]
+                        buf = buf[m.start():]
+                        in_block = True
+                        if self._fm_state == "wait":
+                            self._fm_state = "capture"
+                    # Offener Block: buf + pending beginnen mit "---\n"; Abschluss-\n frühestens ab dem Inhalt
+                    start = max(0, 4 - pending.size)
+                    if self._fm_state == "capture":
+                        k = buf.find(_FM_CLOSING, start)
+                        if k >= 0:
+                            self._fm_state = "done"
+                            fm = (pending.read() + buf[:k])[4:] if pending.size else buf[4:k]
+                            self.year, self.month = _year_month_from_frontmatter(fm)
+                    j = buf.find(_CLOSING, start)
+                    if j >= 0:
+                        pending.clear()
+                        buf = buf[j + len(_CLOSING):]
+                        in_block = False
+                        continue
+                    if final:
+                        # Kein Abschluss: Block bleibt unverändert stehen
+                        yield from pending.chunks()
+                        yield buf
+                        buf = ""
+                        break
+                    cut = max(start, len(buf) - (len(_CLOSING) - 1))
+                    pending.write(buf[:cut])
+                    buf = buf[cut:]
+                    break
+        finally:
+            pending.close()
+
+    def _cut_before_heading(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Schneidet alles vor dem ersten ###### ab; ohne ###### bleibt der Text vollständig."""
+        before = Spool()
+        tail = ""
+        found = False
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if found:
+                    yield chunk
+                    continue
+                data = tail + chunk
+                i = data.find("######")
+                if i >= 0:
+                    found = True
+                    before.clear()
+                    yield data[i:]
+                    continue
+                keep = min(len(data), 5)
+                before.write(data[:len(data) - keep])
+                tail = data[len(data) - keep:]
+            if not found:
+                before.write(tail)
+                for chunk in before.chunks():
+                    yield chunk
+        finally:
+            before.close()
+
+def _with_end_marker(chunks: Iterable[str]) -> Iterator[Optional[str]]:
+    """Chunks, gefolgt von None als Ende-Markierung."""
+    yield from chunks
+    yield None
+
+@traced("processor.write_working_copy", lambda sp, args, kw, res: sp.set(bytes_out=os.path.getsize(args[1])))
+def write_working_copy(chunks: Iterable[str], path: str) -> None:
+    # newline="\n": Working Copy bleibt byte-genau parsebar (ArticleSource.from_file), auch unter Windows
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+@traced("processor.create_working_copy", lambda sp, args, kw, res: sp.set(chars_in=args[0] if isinstance(args[0], str) else None, bytes_out=os.path.getsize(res)))
+def create_working_copy(src: Union[str, IO[str]], file_name: str, base_dir: str) -> str:
+    """
+    Schreibt die bereinigte Quelle (wie clean_source_text) als neue Working Copy, gibt den Pfad zurück.
+    src: Quelltext oder Text-Datei-Objekt – beides läuft gestreamt durch SourceCleaner.
+    """
+    stream = io.StringIO(src) if isinstance(src, str) else src
+    path = working_copy_path(file_name, base_dir)
+    write_working_copy(SourceCleaner(iter_chunks(stream)), path)
     return path
 
+def _year_month_from_frontmatter(fm: Optional[str]) -> tuple[int, int]:
+    if fm is None:
+        return 2025, 10
+    path_match = re.search(r'media:\s*path:\s*"[^"]*/(\d{4})/(\d{2})/"', fm)
+    return (int(path_match.group(1)), int(path_match.group(2))) if path_match else (2025, 10)
+
+@traced("processor.extract_year_month", lambda sp, args, kw, res: sp.set(chars_in=args[0]))
 def extract_year_month(text: str) -> tuple[int, int]:
     """Unverändert."""
     fm = re.search(r'^---\n(.*?)\n---', text, flags=re.M | re.S)
-    if not fm:
-        return 2025, 10
-    path_match = re.search(r'media:\s*path:\s*"[^"]*/(\d{4})/(\d{2})/"', fm.group(1))
-    return (int(path_match.group(1)), int(path_match.group(2))) if path_match else (2025, 10)
+    return _year_month_from_frontmatter(fm.group(1) if fm else None)
+
+_COUNTER_SUFFIX_RE = re.compile(r"^(.+)_(\d{2,})$")
+
+class OutputNameAllocator:
+    """
+    Freie Output-Namen {slug}.md, {slug}_02.md, {slug}_03.md, ... in O(1):
+    Zähler pro Slug aus einem einzigen Verzeichnis-Scan, danach nur noch hochgezählt.
+    Der Name wird atomar belegt (publish: os.link der fertigen Datei, claim: O_EXCL) – parallele Sessions/Prozesse
+    bekommen nie denselben Namen.
+    Lücken (gelöschte Outputs) werden nicht wieder aufgefüllt. Ein Suffix _NN zählt nur, wenn {slug}.md selbst existiert
+    (bericht_2024.md ist ein eigener Slug und schiebt "bericht" nicht auf _2025).
+    """
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._next: Dict[str, int] = {}  # Slug -> nächster Zähler (1 = ohne Suffix)
+        self._lock = threading.Lock()
+        try:
+            with os.scandir(base_dir) as entries:
+                stems = {entry.name[:-3] for entry in entries if entry.name.endswith(".md")}
+        except FileNotFoundError:
+            stems = set()
+        for stem in stems:
+            self._bump(stem, 1)
+            m = _COUNTER_SUFFIX_RE.match(stem)
+            if m and m.group(1) in stems:
+                self._bump(m.group(1), int(m.group(2)))
 
-def generate_output(selected: List[Dict], title: str, year: int, month: int, base_dir: str) -> str:
-    """RAW: Concat raw-Blöcke aus selected mit <!--split--> dazwischen – KEIN FM, KEINE Änderung!"""
+    def _bump(self, slug: str, counter: int) -> None:
+        self._next[slug] = max(self._next.get(slug, 1), counter + 1)
+
+    def _next_path(self, slug: str) -> str:
+        with self._lock:
+            counter = self._next.get(slug, 1)
+            self._next[slug] = counter + 1
+        # Führende Null für Sortierung (_02, _03, ...)
+        return os.path.join(self.base_dir, f"{slug}.md" if counter == 1 else f"{slug}_{counter:02d}.md")
+
+    def claim(self, slug: str) -> str:
+        """Legt den nächsten freien Namen als leere Datei an und gibt den Pfad zurück."""
+        while True:
+            path = self._next_path(slug)
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                continue  # Von außen angelegt (anderer Prozess) -> nächster Zähler
+            os.close(fd)
+            return path
+
+    def publish(self, slug: str, write: Callable[[IO[str]], None]) -> str:
+        """
+        Schreibt den Inhalt komplett in eine Temp-Datei und belegt erst dann den nächsten freien Namen atomar per
+        os.link (scheitert mit FileExistsError, wenn der Name existiert) – unter dem Namen gibt es nie eine leere
+        oder halbe Datei. Ohne Hardlinks (z.B. FAT, manche Netzlaufwerke): leere Datei per claim + os.replace.
+        """
+        tmp_path = os.path.join(self.base_dir, f"{slug}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                write(f)
+            while True:
+                path = self._next_path(slug)
+                try:
+                    os.link(tmp_path, path)
+                except FileExistsError:
+                    continue  # Von außen angelegt (anderer Prozess) -> nächster Zähler
+                except (OSError, AttributeError):
+                    return self._publish_replace(slug, tmp_path, path)
+                return path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _publish_replace(self, slug: str, tmp_path: str, path: str) -> str:
+        """Fallback ohne Hardlinks: path (sonst den nächsten Namen) per O_EXCL belegen, dann die fertige Temp-Datei darüber schieben."""
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        except FileExistsError:
+            path = self.claim(slug)
+        try:
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            raise
+        return path
+
+
+_allocators: Dict[str, OutputNameAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def get_output_allocator(base_dir: str) -> OutputNameAllocator:
+    """Prozessweiter Allocator pro Ausgabe-Ordner (ein Scan pro Ordner und Prozess)."""
+    key = os.path.abspath(base_dir)
+    with _allocators_lock:
+        if key not in _allocators:
+            _allocators[key] = OutputNameAllocator(base_dir)
+        return _allocators[key]
+
+
+def write_atomic(path: str, write: Callable[[IO[str]], None]) -> None:
+    """write(f) in eine Temp-Datei neben path, dann os.replace – Leser sehen nie eine halb geschriebene Datei."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class GeneratedOutput(NamedTuple):
+    """Ergebnis von generate_output: Pfad des Raw-Outputs + categories/tags/orte der Artikel darin (für step4)."""
+    path: str
+    meta: MetaAggregate
+
+
+@traced("processor.generate_output", lambda sp, args, kw, res: sp.set(articles=args[0], bytes_out=os.path.getsize(res.path) if res else 0))
+def generate_output(selected: List[Article], title: str, year: int, month: int, base_dir: str) -> Optional[GeneratedOutput]:
+    """
+    RAW: Concat raw-Blöcke aus selected mit <!--split--> dazwischen – KEIN FM, KEINE Änderung!
+    Beim Schreiben werden die (validierten) Felder der Artikel als MetaAggregate gesammelt.
+    """
     if not selected:
         return None
-    
-    # Sammle raw-Blöcke
-    raw_blocks = [a["raw"] for a in selected]
-    
-    # Join mit Split-Marker für Trennung (inkl. Leerzeilen)
-    raw_content = "\n\n<!--split-->\n\n".join(raw_blocks)
-    
-    slug = slugify(title)
-    base_path = os.path.join(base_dir, f"{slug}.md")
-    
-    # FIX: Counter mit führenden Nullen (z.B. _01, _02) für Sortierung, wenn existiert
-    counter = 1
-    while os.path.exists(base_path):
-        counter += 1
-        formatted_counter = f"{counter:02d}"  # Führende Null: 01, 02, ...
-        base_path = os.path.join(base_dir, f"{slug}_{formatted_counter}.md")
-    
-    path = base_path
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(raw_content)
-    logger.info(f"Output-Datei erstellt (Counter: {formatted_counter if counter > 1 else 'kein'}): {os.path.basename(path)}")
-    return path
 
-# core/processor.py
-# ... (create_working_copy, extract_year_month, generate_output unverändert)
-
-def update_working_copy(working_path: str, selected_titles: Set[str]) -> None:
-    """PRAGMATISCH: Parse WC, filter verbleibende, concat raw mit \n\n dazwischen."""
-    with open(working_path, "r", encoding="utf-8") as f:
-        wc_text = f.read()
-    
-    articles = parse_articles_from_text(wc_text)
-    
-    remaining = [a for a in articles if a["title"] not in selected_titles]
-    
-    if not remaining:
-        open(working_path, "w").close()  # Leere WC
-        return
-    
-    # FIX: Concat mit \n\n zwischen Blöcken für Leerzeile
-    raw_blocks = [a["raw"] for a in remaining]
-    new_content = "\n\n<!--split-->\n\n".join(raw_blocks)
-    
-    with open(working_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
+    meta = MetaAggregate()
+    path = get_output_allocator(base_dir).publish(slugify(title), lambda f: write_raw_blocks(f, selected, meta))
+    logger.info(f"Output-Datei erstellt: {os.path.basename(path)}")
+    record_published(base_dir, path, selected)
+    return GeneratedOutput(path, meta)
+
+def render_raw_output(selected: List[Article]) -> Tuple[str, MetaAggregate]:
+    """Wie generate_output, aber im Speicher: (Raw-Text, MetaAggregate) – für Aufrufer, die erst nach dem Post-Processing schreiben."""
+    buf = io.StringIO()
+    meta = MetaAggregate()
+    write_raw_blocks(buf, selected, meta)
+    return buf.getvalue(), meta
+
+def record_published(base_dir: str, path: str, selected: List[Article]) -> None:
+    """Fingerprints der Artikel eines Outputs in den Veröffentlichungs-Index (für Duplikat-Markierung beim nächsten Upload)."""
+    try:
+        get_published_index(base_dir).add_output(os.path.basename(path), selected)
+    except OSError as e:
+        logger.warning(f"Veröffentlichungs-Index nicht aktualisiert: {e}")
+
+@traced("processor.update_working_copy", lambda sp, args, kw, res: sp.set(articles=len(args[1])))
+def update_working_copy(working_path: str, selected_titles: Set[str], label: str = "") -> None:
+    """
+    Entferne ausgewählte Titel aus der WC (Backend nach Endung): Markdown – eine Zeile im Journal, die Datei bleibt
+    unverändert; SQLite – eine Transaktion. Undo in beiden Fällen möglich.
+    """
+    store = open_store(working_path)
+    store.remove_titles(selected_titles, label)
+
+def run_generation(job, store: WorkingCopyStore, refs: Iterable[ArticleRef], title: str, date_year: int, date_month: int, date_day: int,
+                   media_year: int, media_month: int, base_dir: str, pipeline: Optional["OutputPipeline"] = None) -> str:
+    """
+    Output-Erzeugung wie der Button "Output erzeugen": Raw-Output im Speicher, Post-Processing (Pipeline),
+    fertigen Output einmal schreiben, dann die Artikel aus der Working Copy entfernen. Gibt den Pfad des Outputs zurück.
+    job: core.jobs.Job (Fortschritt + Abbruch) oder None. Abbrechbar bis zum Schreiben des Outputs.
+    store: WorkingCopyStore, SqliteWorkingCopyStore oder WorkingCopySet (mehrere hochgeladene Dateien).
+    refs: ausgewählte Artikel als Article.ref (Dateiname, ID) – gleichnamige Artikel anderer Feeds bleiben unberührt.
+    """
+    def progress(value: float, stage: str, cancellable: bool = True) -> None:
+        if job is not None:
+            job.update(value, stage, cancellable)
+
+    if pipeline is None:
+        from .output_processor import get_default_pipeline
+        pipeline = get_default_pipeline()
+    progress(0.05, "Artikel auswählen")
+    selected = store.select_refs(refs)
+    if not selected:
+        raise ValueError("Keine der ausgewählten Artikel ist noch in der Working Copy")
+    progress(0.2, "Output zusammenstellen")
+    with span("processor.render_output") as sp:
+        raw_output, meta = render_raw_output(selected)
+        sp.set(chars_out=raw_output, articles=selected)
+    progress(0.4, "Post-Processing")
+    # Schritte 4 + 1 + 2 + 3 + 5 + 6 + 7 in einem Durchlauf (Reihenfolge: DEFAULT_STEP_ORDER)
+    processed = pipeline.run(raw_output, title, date_year, date_month, date_day, media_year, media_month, meta=meta)
+    progress(0.8, "Output speichern", cancellable=False)  # Ab hier entstehen Dateien und Index-Einträge
+    with span("processor.write_output") as sp:
+        # Einmal unter dem endgültigen Namen – Leser sehen nie den Raw-Output
+        out_path = get_output_allocator(base_dir).publish(slugify(title), lambda f: f.write(processed))
+        sp.set(chars_out=processed)
+    record_published(base_dir, out_path, selected)
+    progress(0.9, "Working Copy aktualisieren", cancellable=False)
+    store.remove_refs([a.ref for a in selected], os.path.basename(out_path))  # Tombstones + Journal-Zeile (Undo möglich)
+    logger.info(f"Output post-prozessiert ({pipeline}): {os.path.basename(out_path)}")
+    return out_path
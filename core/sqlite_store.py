@@ -0,0 +1,367 @@
+# core/sqlite_store.py
+"""
+Working Copy in SQLite statt als Markdown-Datei + Journal (Backend "sqlite", NEWS_PARSER_STORE=sqlite).
+Gleiche Schnittstelle wie WorkingCopyStore; gedacht für Archive mit sehr vielen Artikeln:
+
+- Tabellen articles, categories, tags, orte (ein Wert pro Zeile, indiziert) und outputs (+ output_articles).
+- Anlegen mit Batch-Inserts in einer Transaktion; Gruppieren, Zählen und Titel-Suche als indizierte Abfragen,
+  ohne alle Artikel zu laden. Artikel-Objekte werden erst bei Bedarf (articles/live_articles) erzeugt.
+- Entfernen (Auswahl + Markieren + Output-Eintrag) ist eine Transaktion; Undo/Redo wie beim Journal
+  über den Zustand der Output-Einträge (applied/undone/discarded).
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .article import Article, ArticleRef, ArticleSource
+from .facets import FACET_FIELDS, UNCATEGORIZED
+from .metrics import span
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIX = ".sqlite"
+SCHEMA_VERSION = 1
+_BATCH = 5000   # Zeilen pro executemany
+_IN_CHUNK = 500  # Parameter pro IN (...) – unter dem SQLite-Limit älterer Versionen
+# Noch vorhandene Artikel ohne Kategorie (UNCATEGORIZED in counts, ids_with und grouped)
+_UNCATEGORIZED_FROM = ("FROM articles WHERE removed_op IS NULL "
+                       "AND NOT EXISTS (SELECT 1 FROM categories c WHERE c.article_id = articles.id)")
+
+_SCHEMA = f"""
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE articles (
+    id INTEGER PRIMARY KEY,         -- Position wie im Block-Index des WorkingCopyStore
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,             -- Block ohne Header-Präfix (wie Puffer[start:end])
+    header_prefix INTEGER NOT NULL,
+    title_start INTEGER NOT NULL, title_end INTEGER NOT NULL,  -- Zeichen-Offsets in body
+    meta_start INTEGER NOT NULL, meta_end INTEGER NOT NULL,
+    source_file TEXT,
+    removed_op INTEGER              -- NULL = vorhanden
+);
+CREATE INDEX articles_title ON articles (title);
+CREATE INDEX articles_removed ON articles (removed_op);
+{"".join(f'''
+CREATE TABLE {field} (article_id INTEGER NOT NULL, pos INTEGER NOT NULL, value TEXT NOT NULL);
+CREATE INDEX {field}_value ON {field} (value, article_id);
+CREATE INDEX {field}_article ON {field} (article_id);''' for field in FACET_FIELDS)}
+CREATE TABLE outputs (op INTEGER PRIMARY KEY, label TEXT NOT NULL, created REAL NOT NULL, state TEXT NOT NULL);
+CREATE TABLE output_articles (op INTEGER NOT NULL, article_id INTEGER NOT NULL);
+CREATE INDEX output_articles_op ON output_articles (op);
+"""
+
+
+def _chunks(values: Sequence, size: int = _IN_CHUNK) -> Iterator[Sequence]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class SqliteWorkingCopyStore:
+    """Working Copy in einer SQLite-Datei; Verbindung wird zwischen UI- und Job-Threads geteilt (mit Lock)."""
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._articles: Optional[List[Article]] = None
+        self._removed: Optional[set] = None
+        version = self.meta.get("schema")
+        if version != str(SCHEMA_VERSION):
+            self._conn.close()
+            raise ValueError(f"Schema-Version {version} nicht unterstützt")
+
+    @classmethod
+    def create(cls, path: str, articles: Iterable[Article], year: int = 0, month: int = 0,
+               corrections_str: str = "", source_file: Optional[str] = None) -> "SqliteWorkingCopyStore":
+        """
+        Neue Datenbank aus geparsten Artikeln (Batch-Inserts in einer Transaktion, Indizes inklusive).
+        source_file: Name der hochgeladenen Datei für alle Artikel (sonst a.source_file).
+        """
+        with span("sqlite_store.create") as sp:
+            tmp_path = path + ".tmp"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            conn = sqlite3.connect(tmp_path)
+            try:
+                conn.executescript(_SCHEMA)
+                n = 0
+                with conn:
+                    conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                        ("schema", str(SCHEMA_VERSION)), ("year", str(year)), ("month", str(month)),
+                        ("corrections_str", corrections_str),
+                    ])
+                    rows: List[tuple] = []
+                    values: Dict[str, List[tuple]] = {field: [] for field in FACET_FIELDS}
+                    for n, a in enumerate(articles, 1):
+                        _append_rows(rows, values, n - 1, a, source_file or a.source_file)
+                        if len(rows) >= _BATCH:
+                            _flush_rows(conn, rows, values)
+                    _flush_rows(conn, rows, values)
+            finally:
+                conn.close()
+            os.replace(tmp_path, path)  # Nur vollständige Datenbanken unter dem endgültigen Namen
+            sp.set(articles=n, bytes_out=os.path.getsize(path))
+        return cls(path)
+
+    @property
+    def meta(self) -> Dict[str, str]:
+        """year, month, corrections_str (Angaben der Quelle) und Schema-Version."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT key, value FROM meta"))
+
+    # --- Index ---
+    @property
+    def total(self) -> int:
+        """Anzahl Artikel inkl. entfernter (Umfang des ID-Raums)."""
+        if self._articles is not None:
+            return len(self._articles)
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles WHERE removed_op IS NULL").fetchone()[0]
+
+    def _removed_ids(self) -> set:
+        with self._lock:
+            if self._removed is None:
+                self._removed = {i for i, in self._conn.execute("SELECT id FROM articles WHERE removed_op IS NOT NULL")}
+            return self._removed
+
+    @property
+    def articles(self) -> List[Article]:
+        """Alle Artikel (auch entfernte) als Article-Objekte – einmal geladen, danach im Speicher."""
+        with self._lock:
+            if self._articles is None:
+                with span("sqlite_store.load_articles") as sp:
+                    self._articles = self._load()
+                    sp.set(articles=self._articles)
+            return self._articles
+
+    def live_ids(self) -> List[int]:
+        with self._lock:
+            return [i for i, in self._conn.execute("SELECT id FROM articles WHERE removed_op IS NULL ORDER BY id")]
+
+    def live_articles(self) -> List[Article]:
+        removed = self._removed_ids()
+        return [a for i, a in enumerate(self.articles) if i not in removed]
+
+    def ids_for_titles(self, titles: Iterable[str]) -> List[int]:
+        """Noch vorhandene Artikel-IDs zu den Titeln (Index auf title), in Datei-Reihenfolge."""
+        titles = list(set(titles))
+        ids: List[int] = []
+        with self._lock:
+            for chunk in _chunks(titles):
+                ids.extend(i for i, in self._conn.execute(
+                    f"SELECT id FROM articles WHERE removed_op IS NULL AND title IN ({','.join('?' * len(chunk))})", chunk))
+        ids.sort()
+        return ids
+
+    def select_ids(self, ids: Iterable[int]) -> List[Article]:
+        """Noch vorhandene Artikel zu den IDs, in Datei-Reihenfolge (lädt nur diese Zeilen, falls nicht im Speicher)."""
+        removed = self._removed_ids()
+        total = self.total
+        return self._by_ids([i for i in sorted(set(ids)) if 0 <= i < total and i not in removed])
+
+    def select_refs(self, refs: Iterable[ArticleRef]) -> List[Article]:
+        """Wie WorkingCopyStore.select_refs."""
+        return self.select_ids(i for _, i in refs)
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Wert -> Anzahl noch vorhandener Artikel (GROUP BY über den Index), absteigend."""
+        if field not in FACET_FIELDS:
+            raise ValueError(f"Unbekanntes Feld: {field}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT v.value, COUNT(DISTINCT v.article_id) AS n FROM {field} v JOIN articles a ON a.id = v.article_id "
+                f"WHERE a.removed_op IS NULL GROUP BY v.value ORDER BY n DESC, v.value").fetchall()
+            if field == "categories":
+                none = self._conn.execute(f"SELECT COUNT(*) {_UNCATEGORIZED_FROM}").fetchone()[0]
+                if none:
+                    rows.append((UNCATEGORIZED, none))
+                    rows.sort(key=lambda row: (-row[1], row[0]))
+        return dict(rows)
+
+    def ids_with(self, field: str, value: str) -> List[int]:
+        """Noch vorhandene Artikel mit dem Wert (indizierte Abfrage, ohne Artikel zu laden); Unkategorisiert wie in counts."""
+        if field not in FACET_FIELDS:
+            raise ValueError(f"Unbekanntes Feld: {field}")
+        with self._lock:
+            if field == "categories" and value == UNCATEGORIZED:
+                return [i for i, in self._conn.execute(f"SELECT id {_UNCATEGORIZED_FROM} ORDER BY id")]
+            return [i for i, in self._conn.execute(
+                f"SELECT DISTINCT v.article_id FROM {field} v JOIN articles a ON a.id = v.article_id "
+                f"WHERE v.value = ? AND a.removed_op IS NULL ORDER BY v.article_id", (value,))]
+
+    def set_source_file(self, name: str) -> None:
+        """Quelldatei aller Artikel – steht seit create() in der Tabelle, nur bei Abweichung wird sie umgeschrieben."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("UPDATE articles SET source_file = ? WHERE source_file IS NOT ?", (name, name))
+            for a in self._articles or ():
+                a.source_file = name
+
+    def grouped(self) -> Dict[str, List[Article]]:
+        """Kategorie -> Artikel per Abfrage über den Kategorie-Index (Reihenfolge der Artikel: Datei-Reihenfolge)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.value, c.article_id FROM categories c JOIN articles a ON a.id = c.article_id "
+                "WHERE a.removed_op IS NULL ORDER BY c.article_id, c.pos").fetchall()
+            uncategorized = [i for i, in self._conn.execute(f"SELECT id {_UNCATEGORIZED_FROM} ORDER BY id")]
+        ids = sorted({i for _, i in rows} | set(uncategorized))
+        by_id = dict(zip(ids, self._by_ids(ids)))
+        grouped: Dict[str, List[Article]] = {}
+        for value, article_id in rows:
+            grouped.setdefault(value, []).append(by_id[article_id])
+        if uncategorized:
+            grouped[UNCATEGORIZED] = [by_id[i] for i in uncategorized]
+        return grouped
+
+    def _by_ids(self, ids: List[int]) -> List[Article]:
+        """Artikel zu IDs: aus dem Speicher, falls geladen, sonst nur diese Zeilen lesen."""
+        if self._articles is not None:
+            return [self._articles[i] for i in ids]
+        found: List[Article] = []
+        with self._lock:
+            for chunk in _chunks(sorted(set(ids))):
+                found.extend(self._load(chunk))
+        by_id = dict(zip(sorted(set(ids)), found))
+        return [by_id[i] for i in ids]
+
+    def _load(self, ids: Optional[Sequence[int]] = None) -> List[Article]:
+        """Artikel-Zeilen + Werte (Reihenfolge wie beim Einlesen) zu Article-Objekten, sortiert nach id; ids None = alle."""
+        where, params = ("", ()) if ids is None else (f"IN ({','.join('?' * len(ids))})", tuple(ids))
+        rows = self._conn.execute(
+            f"SELECT id, body, header_prefix, title_start, title_end, meta_start, meta_end, source_file "
+            f"FROM articles {'WHERE id ' + where if where else ''} ORDER BY id", params).fetchall()
+        values: Dict[str, Dict[int, List[str]]] = {}
+        for field in FACET_FIELDS:
+            by_id: Dict[int, List[str]] = {}
+            for article_id, value in self._conn.execute(
+                    f"SELECT article_id, value FROM {field} {'WHERE article_id ' + where if where else ''} "
+                    f"ORDER BY article_id, pos", params):
+                by_id.setdefault(article_id, []).append(value)
+            values[field] = by_id
+        articles = []
+        for article_id, body, prefixed, ts, te, ms, me, source_file in rows:
+            a = Article(ArticleSource.from_text(body), 0, len(body), (ts, te), (ms, me),
+                        *(values[field].get(article_id, []) for field in FACET_FIELDS), header_prefix=bool(prefixed))
+            a.source_file = source_file
+            a.article_id = article_id
+            articles.append(a)
+        return articles
+
+    # --- Änderungen (je eine Transaktion) ---
+    def remove_ids(self, ids: Iterable[int], label: str = "", op: Optional[int] = None) -> List[int]:
+        """Wie WorkingCopyStore.remove_ids: markieren + Output-Eintrag in einer Transaktion; leert den Redo-Stapel."""
+        with self._lock:
+            removed_set = self._removed_ids()
+            removed = [i for i in dict.fromkeys(ids) if i not in removed_set]
+            if not removed and op is None:
+                return []
+            op = time.time_ns() if op is None else op
+            with self._conn:
+                self._conn.execute("UPDATE outputs SET state = 'discarded' WHERE state = 'undone'")
+                self._conn.execute("INSERT INTO outputs VALUES (?, ?, ?, 'applied')", (op, " ".join(label.split()), time.time()))
+                self._conn.executemany("INSERT INTO output_articles VALUES (?, ?)", [(op, i) for i in removed])
+                for chunk in _chunks(removed):
+                    self._conn.execute(f"UPDATE articles SET removed_op = ? WHERE id IN ({','.join('?' * len(chunk))})",
+                                       (op, *chunk))
+            removed_set.update(removed)
+        return removed
+
+    def remove_titles(self, titles: Iterable[str], label: str = "", op: Optional[int] = None) -> List[int]:
+        """Auswahl über den Titel-Index und Entfernen unter einem Lock – keine zweite Sitzung dazwischen."""
+        with self._lock:
+            return self.remove_ids(self.ids_for_titles(titles), label, op)
+
+    def remove_refs(self, refs: Iterable[ArticleRef], label: str = "", op: Optional[int] = None) -> List[int]:
+        """Wie WorkingCopyStore.remove_refs."""
+        return self.remove_ids((i for _, i in refs), label, op)
+
+    def _top(self, state: str, newest: bool) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT op FROM outputs WHERE state = ? ORDER BY op {'DESC' if newest else 'ASC'} LIMIT 1", (state,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def last_applied(self) -> Optional[int]:
+        return self._top("applied", newest=True)
+
+    @property
+    def last_undone(self) -> Optional[int]:
+        return self._top("undone", newest=False)  # Zuletzt zurückgenommen = älteste zurückgenommene
+
+    def undo(self, op: Optional[int] = None) -> Optional[List[int]]:
+        return self._switch(op, self.last_applied, "undone")
+
+    def redo(self, op: Optional[int] = None) -> Optional[List[int]]:
+        return self._switch(op, self.last_undone, "applied")
+
+    def _switch(self, op: Optional[int], top: Optional[int], state: str) -> Optional[List[int]]:
+        with self._lock:
+            if top is None or (op is not None and top != op):
+                return None
+            ids = [i for i, in self._conn.execute("SELECT article_id FROM output_articles WHERE op = ? ORDER BY article_id", (top,))]
+            with self._conn:
+                self._conn.execute("UPDATE outputs SET state = ? WHERE op = ?", (state, top))
+                for chunk in _chunks(ids):
+                    self._conn.execute(f"UPDATE articles SET removed_op = ? WHERE id IN ({','.join('?' * len(chunk))})",
+                                       (top if state == "applied" else None, *chunk))
+            removed_set = self._removed_ids()
+            if state == "applied":
+                removed_set.update(ids)
+            else:
+                removed_set.difference_update(ids)
+        return ids
+
+    def history(self) -> List[Dict]:
+        """Operationen, neueste zuerst: {op, label, articles, applied} (verworfene Redo-Einträge ausgenommen)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT o.op, o.label, o.state, COUNT(oa.article_id) FROM outputs o "
+                "LEFT JOIN output_articles oa ON oa.op = o.op WHERE o.state != 'discarded' "
+                "GROUP BY o.op ORDER BY o.op DESC").fetchall()
+        return [{"op": op, "label": label, "articles": n, "applied": state == "applied"} for op, label, state, n in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def delete(self) -> None:
+        """Schließt die Verbindung und löscht die Datenbank (Ende der Sitzung)."""
+        self.close()
+        for path in (self.path, self.path + "-wal", self.path + "-shm"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _append_rows(rows: List[tuple], values: Dict[str, List[tuple]], article_id: int, a: Article,
+                 source_file: Optional[str]) -> None:
+    body = a.source.slice(a.start, a.end)
+
+    def rel(pos: int) -> int:  # Offset im Block in Zeichen (Quelle kann Byte-Offsets haben)
+        return len(a.source.slice(a.start, pos))
+
+    rows.append((article_id, a.title, body, int(a.header_prefix), rel(a.title_start), rel(a.title_end),
+                 rel(a.meta_start), rel(a.meta_end), source_file, None))
+    for field in FACET_FIELDS:
+        values[field].extend((article_id, pos, v) for pos, v in enumerate(a[field]))
+
+
+def _flush_rows(conn: sqlite3.Connection, rows: List[tuple], values: Dict[str, List[tuple]]) -> None:
+    conn.executemany("INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    for field, field_rows in values.items():
+        conn.executemany(f"INSERT INTO {field} VALUES (?, ?, ?)", field_rows)
+        field_rows.clear()
+    rows.clear()
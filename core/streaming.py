@@ -0,0 +1,49 @@
+# core/streaming.py
+import tempfile
+from typing import IO, Iterator
+
+CHUNK_SIZE = 1 << 16             # Zeichen pro read()
+SPOOL_MAX_SIZE = 8 * 2**20       # Unentschiedener Text bleibt bis hier im Speicher, danach Temp-Datei
+
+
+def iter_chunks(f: IO, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """Liest ein Datei-Objekt in Stücken (str oder bytes, je nach Modus)."""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class Spool:
+    """
+    Puffer für Text, über den erst später entschieden wird (z.B. offener ---Block, Text vor dem ersten ######).
+    Bis max_size im Speicher, darüber in einer Temp-Datei – der Speicherbedarf bleibt begrenzt.
+    """
+
+    def __init__(self, max_size: int = SPOOL_MAX_SIZE):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+", encoding="utf-8", newline="")
+        self.size = 0
+
+    def write(self, text: str) -> None:
+        if text:
+            self._file.seek(0, 2)
+            self._file.write(text)
+            self.size += len(text)
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        """Liest den bisherigen Inhalt von vorne (Schreiben danach hängt wieder an)."""
+        self._file.seek(0)
+        return iter_chunks(self._file, chunk_size)
+
+    def read(self) -> str:
+        self._file.seek(0)
+        return self._file.read()
+
+    def clear(self) -> None:
+        self._file.seek(0)
+        self._file.truncate()
+        self.size = 0
+
+    def close(self) -> None:
+        self._file.close()
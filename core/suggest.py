@@ -0,0 +1,335 @@
+# core/suggest.py
+"""
+Kategorie-Vorschläge für Artikel ohne Kategorie: TF-IDF + ein Schwerpunkt-Vektor (Centroid) pro Kategorie,
+offline aus früheren Outputs trainiert (python -m core.suggest OUTPUT_ORDNER...).
+
+- Merkmale: Wörter (ab 3 Buchstaben, Groß/Klein egal) aus Titel + normalisiertem Text; Gewicht (1 + log tf) · idf, L2-normiert.
+- Modell: idf-Vektor und Gewichtsmatrix (Merkmale × ALLOWED_CATEGORIES, float32) in category_model.bin in OUTPUT_DIR;
+  beim Laden per mmap eingeblendet (nur das Vokabular wird gelesen).
+- Bewertung: alle Artikel eines Uploads als dünne Matrix mal Gewichtsmatrix in einer Multiplikation
+  (SciPy wenn vorhanden, sonst NumPy über reduceat, ohne NumPy in reinem Python); Score = Kosinus zum Centroid.
+"""
+import argparse
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .archive import normalize_body
+from .article import Article
+from .metrics import current_span, traced
+from .parser import ALLOWED_CATEGORIES
+from .utils import get_base_dir
+
+try:
+    import numpy as np
+except ImportError:  # Optional: nur für die Stapel-Bewertung
+    np = None
+try:
+    from scipy import sparse
+except ImportError:  # Optional: sonst NumPy-reduceat
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "category_model.bin"
+MODEL_MAGIC = b"NPCATM1\n"
+MIN_DF = 2                 # Wörter aus nur einem Trainings-Artikel zählen nicht
+MAX_FEATURES = 1 << 17
+MIN_SCORE = 0.05           # Schwächere Vorschläge werden nicht angezeigt
+TOP_K = 3
+_ALIGN = 64
+_WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+
+def article_words(article: Article) -> List[str]:
+    """Wörter aus Titel und Text (ohne Kommentare/Platzhalter, wie im Veröffentlichungs-Index)."""
+    return _WORD_RE.findall(f"{article.title.casefold()} {normalize_body(article.raw)}")
+
+
+def _weights(counts: Dict[int, int], idf: Sequence[float]) -> Dict[int, float]:
+    """Spalte -> (1 + log tf) · idf, L2-normiert."""
+    row = {col: (1.0 + math.log(tf)) * idf[col] for col, tf in counts.items()}
+    norm = math.sqrt(sum(v * v for v in row.values()))
+    return {col: v / norm for col, v in row.items()} if norm else {}
+
+
+class CategoryModel:
+    """Vokabular (Wort -> Spalte), idf und Gewichtsmatrix; Arrays liegen eingeblendet in der Modelldatei."""
+
+    def __init__(self, categories: List[str], vocab: List[str], idf, weights, info: Optional[Dict] = None):
+        self.categories = categories
+        self.vocab = {w: i for i, w in enumerate(vocab)}
+        self.idf = idf            # float32[F]
+        self.weights = weights    # float32[F × C], zeilenweise (NumPy: Form (F, C))
+        if np is not None and not isinstance(weights, np.ndarray):  # Frisch trainiert (array.array)
+            self.idf = np.asarray(idf, dtype=np.float32)
+            self.weights = np.asarray(weights, dtype=np.float32).reshape(len(vocab), len(categories))
+        self.info = info or {}
+        self._mmap: Optional[mmap.mmap] = None
+
+    # --- Training ---
+    @classmethod
+    def train(cls, articles: Iterable[Article], categories: Sequence[str] = ALLOWED_CATEGORIES,
+              min_df: int = MIN_DF, max_features: int = MAX_FEATURES) -> "CategoryModel":
+        """Centroid pro Kategorie aus allen Artikeln mit (erlaubter) Kategorie; andere Artikel werden übersprungen."""
+        cat_index = {c: i for i, c in enumerate(categories)}
+        docs: List[Tuple[Counter, List[int]]] = []
+        df: Counter = Counter()
+        for a in articles:
+            labels = sorted({cat_index[c] for c in a.categories if c in cat_index})
+            if not labels:
+                continue
+            counts = Counter(article_words(a))
+            df.update(counts.keys())
+            docs.append((counts, labels))
+        vocab = sorted((w for w, n in df.items() if n >= min_df), key=lambda w: (-df[w], w))[:max_features]
+        vocab.sort()
+        col = {w: i for i, w in enumerate(vocab)}
+        n_docs = len(docs)
+        idf = [math.log((1 + n_docs) / (1 + df[w])) + 1.0 for w in vocab]  # Geglättet wie üblich
+        n_cats = len(categories)
+        centroids: List[Dict[int, float]] = [{} for _ in categories]
+        per_cat = [0] * n_cats
+        for counts, labels in docs:
+            row = _weights({col[w]: tf for w, tf in counts.items() if w in col}, idf)
+            for c in labels:
+                per_cat[c] += 1
+                acc = centroids[c]
+                for j, v in row.items():
+                    acc[j] = acc.get(j, 0.0) + v
+        weights = array("f", bytes(4 * len(vocab) * n_cats))
+        for c, acc in enumerate(centroids):
+            norm = math.sqrt(sum(v * v for v in acc.values()))
+            for j, v in acc.items():
+                weights[j * n_cats + c] = v / norm
+        info = {"documents": n_docs, "per_category": dict(zip(categories, per_cat)), "trained_at": time.time()}
+        return cls(list(categories), vocab, array("f", idf), weights, info)
+
+    # --- Persistenz ---
+    def save(self, path: str) -> None:
+        """Kopf (JSON: Kategorien, Vokabular, Info), dann idf und Gewichte als little-endian float32 – atomar."""
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        header = json.dumps({"categories": self.categories, "vocab": vocab, "info": self.info}, ensure_ascii=False).encode("utf-8")
+        start = len(MODEL_MAGIC) + 4 + len(header)
+        padding = -start % _ALIGN  # Arrays auf _ALIGN Bytes ausgerichtet (mmap/NumPy)
+        idf, weights = array("f", self.idf), array("f", _flat(self.weights))
+        if sys.byteorder == "big":
+            idf.byteswap()
+            weights.byteswap()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(MODEL_MAGIC + struct.pack("<I", len(header)) + header + b"\0" * padding)
+                f.write(idf.tobytes())
+                f.write(weights.tobytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "CategoryModel":
+        """Liest nur den Kopf; idf und Gewichte bleiben per mmap in der Datei (Seiten werden bei Bedarf geladen)."""
+        with open(path, "rb") as f:
+            if f.read(len(MODEL_MAGIC)) != MODEL_MAGIC:
+                raise ValueError(f"Kein Kategorie-Modell: {path}")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            offset = len(MODEL_MAGIC) + 4 + header_len
+            offset += -offset % _ALIGN
+            n_features, n_cats = len(header["vocab"]), len(header["categories"])
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if n_features else None
+        if mm is None:
+            idf, weights = array("f"), array("f")
+        elif np is not None:
+            idf = np.frombuffer(mm, dtype="<f4", count=n_features, offset=offset)
+            weights = np.frombuffer(mm, dtype="<f4", count=n_features * n_cats, offset=offset + 4 * n_features).reshape(n_features, n_cats)
+        elif sys.byteorder == "little":
+            view = memoryview(mm)
+            idf = view[offset:offset + 4 * n_features].cast("f")
+            weights = view[offset + 4 * n_features:offset + 4 * n_features * (n_cats + 1)].cast("f")
+        else:  # Big-endian ohne NumPy: kopieren und drehen
+            idf = array("f", mm[offset:offset + 4 * n_features])
+            weights = array("f", mm[offset + 4 * n_features:offset + 4 * n_features * (n_cats + 1)])
+            idf.byteswap()
+            weights.byteswap()
+        model = cls(header["categories"], header["vocab"], idf, weights, header.get("info"))
+        model._mmap = mm
+        return model
+
+    # --- Vorschläge ---
+    def term_counts(self, articles: Sequence[Article]) -> Tuple[List[int], List[int], List[int]]:
+        """Worthäufigkeiten als CSR (indptr, indices, tf); unbekannte Wörter fallen weg."""
+        vocab = self.vocab
+        indptr: List[int] = [0]
+        indices: List[int] = []
+        tf: List[int] = []
+        for a in articles:
+            counts: Dict[int, int] = {}
+            for w in article_words(a):
+                j = vocab.get(w)
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+            indices.extend(counts.keys())
+            tf.extend(counts.values())
+            indptr.append(len(indices))
+        return indptr, indices, tf
+
+    def vectorize(self, articles: Sequence[Article]):
+        """TF-IDF-Zeilen als CSR (indptr, indices, data), L2-normiert – mit NumPy als Arrays."""
+        indptr, indices, tf = self.term_counts(articles)
+        if np is None:
+            data: List[float] = []
+            for r in range(len(articles)):
+                lo, hi = indptr[r], indptr[r + 1]
+                data.extend(_weights(dict(zip(indices[lo:hi], tf[lo:hi])), self.idf).values())
+            return indptr, indices, data
+        indptr_a = np.asarray(indptr, dtype=np.int64)
+        indices_a = np.asarray(indices, dtype=np.int64)
+        data_a = (1.0 + np.log(np.asarray(tf, dtype=np.float32))) * self.idf[indices_a]
+        rows = np.flatnonzero(np.diff(indptr_a))  # Segmente beginnen bei indptr der nicht-leeren Zeilen
+        if rows.size:
+            norms = np.sqrt(np.add.reduceat(data_a * data_a, indptr_a[rows]))
+            data_a /= np.repeat(norms, np.diff(indptr_a)[rows])
+        return indptr_a, indices_a, data_a
+
+    def scores(self, articles: Sequence[Article]):
+        """Kosinus zu jedem Kategorie-Centroid: Zeilen = Artikel, Spalten = categories (NumPy-Array oder Listen)."""
+        indptr, indices, data = self.vectorize(articles)
+        n, n_cats = len(articles), len(self.categories)
+        if np is None:
+            w = self.weights
+            result = []
+            for r in range(n):
+                row = [0.0] * n_cats
+                for k in range(indptr[r], indptr[r + 1]):
+                    base, v = indices[k] * n_cats, data[k]
+                    for c in range(n_cats):
+                        row[c] += v * w[base + c]
+                result.append(row)
+            return result
+        if sparse is not None:
+            x = sparse.csr_matrix((data, indices, indptr), shape=(n, len(self.vocab)))
+            return np.asarray(x @ self.weights)
+        result = np.zeros((n, n_cats), dtype=np.float32)
+        rows = np.flatnonzero(np.diff(indptr))  # Artikel ohne bekannte Wörter bleiben 0
+        if rows.size:
+            # Σ_k data[k] · W[indices[k]] pro Zeile in einem Schritt
+            result[rows] = np.add.reduceat(data[:, None] * self.weights[indices], indptr[rows], axis=0)
+        return result
+
+    @traced("suggest.suggest", lambda sp, args, kw, res: sp.set(articles=args[1]))
+    def suggest(self, articles: Sequence[Article], top: int = TOP_K, min_score: float = MIN_SCORE) -> List[List[Tuple[str, float]]]:
+        """Pro Artikel bis zu top (Kategorie, Score), absteigend, nur Score >= min_score."""
+        if not articles:
+            return []
+        scores = self.scores(articles)
+        result = []
+        for row in (scores.tolist() if np is not None else scores):
+            ranked = sorted(range(len(row)), key=lambda c: -row[c])[:top]
+            result.append([(self.categories[c], round(row[c], 3)) for c in ranked if row[c] >= min_score])
+        sp = current_span()
+        if sp is not None:
+            sp.set(numpy=np is not None, scipy=sparse is not None)
+        return result
+
+    def close(self) -> None:
+        self.idf = self.weights = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:  # Noch Views auf die Arrays im Umlauf: schließt der GC
+                pass
+            self._mmap = None
+
+
+def _flat(weights) -> Iterable[float]:
+    return weights.ravel().tolist() if np is not None and isinstance(weights, np.ndarray) else weights
+
+
+def suggest_categories(model: CategoryModel, articles: Sequence[Article]) -> Dict[str, List[Tuple[str, float]]]:
+    """Titel -> Vorschläge (nur Artikel mit mindestens einem Vorschlag)."""
+    return {a.title: s for a, s in zip(articles, model.suggest(articles)) if s}
+
+
+_models: Dict[str, Tuple[int, Optional[CategoryModel]]] = {}
+_models_lock = threading.Lock()
+
+
+def get_category_model(base_dir: Optional[str] = None) -> Optional[CategoryModel]:
+    """
+    Prozessweites Modell aus base_dir (None ohne Modelldatei); neu geladen, wenn die Datei neu trainiert wurde.
+    base_dir None = Ausgabe-Ordner der Konfiguration.
+    """
+    path = os.path.join(base_dir or get_base_dir(), MODEL_FILE)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _models_lock:
+        cached = _models.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                model = CategoryModel.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Kategorie-Modell {path} nicht lesbar: {e}")
+                model = None
+            _models[path] = (mtime, model)
+        return _models[path][1]
+
+
+def iter_training_articles(paths: Iterable[str]) -> Iterable[Article]:
+    """Artikel aus früheren Outputs (Working Copies working_* werden übersprungen)."""
+    from .parser import parse_articles_from_text
+    from .processor import clean_source_text
+    for path in paths:
+        if os.path.basename(path).startswith("working_"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            yield from parse_articles_from_text(clean_source_text(f.read()))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from .cli import expand_sources
+    ap = argparse.ArgumentParser(prog="python -m core.suggest", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    base_dir = get_base_dir()  # Beim Aufruf, nicht beim Import (set_config)
+    ap.add_argument("sources", nargs="*", default=[base_dir], help=f"Frühere Outputs: Dateien, Ordner oder Globs (Default: {base_dir})")
+    ap.add_argument("-o", "--out", default=os.path.join(base_dir, MODEL_FILE), help="Modelldatei")
+    ap.add_argument("--min-df", type=int, default=MIN_DF, help=f"Mindestanzahl Artikel pro Wort (Default: {MIN_DF})")
+    ap.add_argument("--max-features", type=int, default=MAX_FEATURES, help=f"Höchstens so viele Wörter (Default: {MAX_FEATURES})")
+    ap.add_argument("--holdout", type=float, default=0.0, help="Anteil zum Testen zurückhalten und Trefferquote ausgeben (z.B. 0.1)")
+    args = ap.parse_args(argv)
+    try:
+        articles = list(iter_training_articles(expand_sources(args.sources)))
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    if args.holdout > 0:
+        step = max(2, round(1 / args.holdout))
+        test = [a for i, a in enumerate(articles) if i % step == 0 and a.categories]
+        model = CategoryModel.train((a for i, a in enumerate(articles) if i % step), min_df=args.min_df, max_features=args.max_features)
+        hits = sum(1 for a, s in zip(test, model.suggest(test, top=1, min_score=0.0)) if s and s[0][0] in a.categories)
+        print(f"Test: {hits}/{len(test)} Artikel mit richtigem ersten Vorschlag ({hits / max(1, len(test)):.1%})")
+    model = CategoryModel.train(articles, min_df=args.min_df, max_features=args.max_features)
+    if not model.info["documents"]:
+        print("Keine Artikel mit Kategorie gefunden.", file=sys.stderr)
+        return 2
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    model.save(args.out)
+    print(f"Modell: {model.info['documents']} Artikel, {len(model.vocab)} Wörter, {len(model.categories)} Kategorien -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,18 +1,29 @@
 # core/utils.py
-import os
 import re
 import hashlib
-from typing import List
+from typing import Iterable, Optional
+
+from .config import get_config
 
 def get_base_dir() -> str:
-    return os.environ.get("NEWS_PARSER_BASE_DIR", r"C:\users\hager\tmp\parse_news")
+    return get_config().base_dir
+
+def get_debug_mode() -> str:
+    """Debug-Ausgaben: off (Default, keine Dateien) | jsonl (eine Datei debug/debug.jsonl) | thread (jsonl im Hintergrund)."""
+    return get_config().debug_mode
 
-# NEU: Zentrale Konstante für OUTPUT_DIR (basierend auf get_base_dir)
-OUTPUT_DIR = get_base_dir()
+def get_vocab_dir() -> str:
+    """Kontrollierte Vokabulare ({feld}.txt) und Korrektur-Memos; Default: {OUTPUT_DIR}/vocab."""
+    return get_config().vocab_dir
 
-# NEU: Debug-Ordner (wird in parser.py verwendet)
-DEBUG_DIR = os.path.join(OUTPUT_DIR, "debug")
-os.makedirs(DEBUG_DIR, exist_ok=True)  # Erstelle bei Import
+# OUTPUT_DIR / DEBUG_DIR: bei jedem Zugriff aus der aktuellen Konfiguration (PEP 562), damit set_config() nach dem Import wirkt.
+# Defaults von Funktionen daher nicht an diese Namen binden, sondern None übergeben und get_base_dir() im Aufruf lesen.
+_LAZY_DIRS = {"OUTPUT_DIR": "base_dir", "DEBUG_DIR": "debug_dir"}
+
+def __getattr__(name: str):
+    if name in _LAZY_DIRS:
+        return getattr(get_config(), _LAZY_DIRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def slugify(title: str) -> str:
     s = re.sub(r"\s+", "_", title.strip().lower())
@@ -22,11 +33,23 @@ def slugify(title: str) -> str:
 def make_key(category: str, title: str) -> str:
     return hashlib.md5(f"{category}::{title}".encode("utf-8")).hexdigest()
 
-def build_frontmatter(title: str, year: int, month: int, categories: List[str], tags: List[str], orte: List[str]) -> str:
-    date_str = f"{year}-{month:02d}-20T12:23:04+02:00"
-    cats = ", ".join(sorted(set(c for c in categories if c)))
-    tags_s = ", ".join(sorted(set(t for t in tags if t)))
-    orte_s = ", ".join(sorted(set(o for o in orte if o)))
+def _frontmatter_list(values: Iterable[str]) -> str:
+    unique = values if isinstance(values, (set, frozenset)) else set(values)  # Sets (MetaAggregate) nicht erneut deduplizieren
+    return ", ".join(sorted(v for v in unique if v))
+
+def build_frontmatter(title: str, year: int, month: int, categories: Iterable[str], tags: Iterable[str], orte: Iterable[str],
+                      day: Optional[int] = None, media_year: Optional[int] = None, media_month: Optional[int] = None) -> str:
+    """
+    Frontmatter eines Outputs (einzige Implementierung, auch für step4 der Output-Pipeline).
+    year/month/day: Artikeldatum (ohne day wie bisher der 20. um 12:23:04); media_year/media_month: Media-Path,
+    unabhängig vom Datum (Default: year/month). Cats/Tags/Orte sortiert, ohne Leere und Doppelte.
+    """
+    date_str = f"{year}-{month:02d}-20T12:23:04+02:00" if day is None else f"{year}-{month:02d}-{day:02d}T00:00:00+02:00"
+    media_year = year if media_year is None else media_year
+    media_month = month if media_month is None else media_month
+    cats = _frontmatter_list(categories)
+    tags_s = _frontmatter_list(tags)
+    orte_s = _frontmatter_list(orte)
     return f"""---
 title: "{title}"
 date: {date_str}
@@ -35,7 +58,7 @@ categories: [{cats}]
 tags: [{tags_s}]
 orte: [{orte_s}]
 media:
-    path: "http://kastl/blog-bf/news/{year}/{month:02d}/"
+    path: "http://kastl/blog-bf/news/{media_year}/{media_month:02d}/"  # Unabhängig: Nur media_year/month
 layout: card-columns
 ---
 """
\ No newline at end of file
@@ -0,0 +1,200 @@
+# core/vocabulary.py
+import os
+import json
+import difflib
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .utils import get_vocab_dir
+
+logger = logging.getLogger(__name__)
+
+_MEMO_FORMAT = 1
+_PAD_START, _PAD_END = "\x02\x02", "\x03\x03"
+
+# Feld -> Verhalten bei Werten ohne Treffer: "raise" (wie bisher bei Kategorien) | "keep" (Wert bleibt stehen)
+FIELD_POLICIES = {"categories": "raise", "tags": "keep", "orte": "keep"}
+# Werte, die nie geprüft werden (Platzhalter)
+FIELD_SKIP = {"categories": ("Unkategorisiert",)}
+_UNKNOWN_MESSAGES = {"categories": "Ungültige Kategorie"}
+
+
+def _trigrams(term: str) -> set:
+    padded = _PAD_START + term + _PAD_END  # Rand-Trigramme: auch kurze Begriffe haben welche
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class VocabularyMatcher:
+    """
+    Fuzzy-Abgleich gegen ein kontrolliertes Vokabular (Kategorien, Tags, Orte).
+    Ergebnis wie difflib.get_close_matches(term, terms, n=1, cutoff), aber:
+    - Kandidaten nur aus einem vorab berechneten Trigramm-Index (statt Vergleich mit allen Begriffen),
+    - Memo-Tabelle für bereits entschiedene Begriffe, optional persistent unter memo_path.
+    """
+
+    def __init__(self, terms: Iterable[str], cutoff: float = 0.8, memo_path: Optional[str] = None):
+        self.terms: List[str] = list(dict.fromkeys(terms))
+        self.cutoff = cutoff
+        self.memo_path = memo_path
+        self._known = set(self.terms)
+        self._index: Dict[str, List[int]] = {}
+        for i, term in enumerate(self.terms):
+            for gram in _trigrams(term):
+                self._index.setdefault(gram, []).append(i)
+        h = hashlib.sha256()
+        h.update("\x1f".join(sorted(self.terms)).encode("utf-8"))
+        h.update(f"\x00{cutoff}".encode("ascii"))
+        self.fingerprint = h.hexdigest()
+        self._memo: Dict[str, Optional[str]] = {}
+        self._memo_dirty = False
+        self._lock = threading.Lock()
+        self._load_memo()
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._known
+
+    def match(self, term: str) -> Optional[str]:
+        """Begriff selbst (falls bekannt), sonst bester Treffer >= cutoff oder None."""
+        if term in self._known:
+            return term
+        try:
+            return self._memo[term]
+        except KeyError:
+            pass
+        result = self._best_match(term)
+        with self._lock:
+            self._memo[term] = result
+            self._memo_dirty = True
+        return result
+
+    def _best_match(self, word: str) -> Optional[str]:
+        shared: Dict[int, int] = {}
+        for gram in _trigrams(word):
+            for i in self._index.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        if not shared:
+            return None
+        # Gleiche Prüfung und Rangfolge wie get_close_matches: (ratio, Begriff) maximal.
+        # Kandidaten mit vielen gemeinsamen Trigrammen zuerst; danach muss ein Kandidat den bisher besten
+        # Score erreichen können (Obergrenzen real_quick_ratio/quick_ratio), sonst wird er übersprungen.
+        s = difflib.SequenceMatcher()
+        s.set_seq2(word)
+        n = len(word)
+        best: Optional[Tuple[float, str]] = None
+        threshold = self.cutoff
+        for i in sorted(shared, key=shared.__getitem__, reverse=True):
+            term = self.terms[i]
+            m = len(term)
+            if 2.0 * min(m, n) / (m + n) < threshold:  # = real_quick_ratio, ohne SequenceMatcher
+                continue
+            s.set_seq1(term)
+            if s.quick_ratio() < threshold:
+                continue
+            score = s.ratio()
+            if score >= threshold and (best is None or (score, term) > best):
+                best = (score, term)
+                threshold = score
+        return best[1] if best else None
+
+    # --- Memo-Persistenz: {"format", "fingerprint", "memo"}; anderes Vokabular -> Memo verworfen ---
+    def _load_memo(self) -> None:
+        if not self.memo_path or not os.path.exists(self.memo_path):
+            return
+        try:
+            with open(self.memo_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Vokabular-Memo nicht lesbar: {e}")
+            return
+        if data.get("format") == _MEMO_FORMAT and data.get("fingerprint") == self.fingerprint:
+            self._memo.update(data.get("memo", {}))
+
+    def save_memo(self) -> None:
+        """Schreibt neue Memo-Einträge (atomar per Temp-Datei + Rename)."""
+        if not self.memo_path or not self._memo_dirty:
+            return
+        with self._lock:
+            data = {"format": _MEMO_FORMAT, "fingerprint": self.fingerprint, "memo": dict(self._memo)}
+            self._memo_dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.memo_path), exist_ok=True)
+            tmp_path = f"{self.memo_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.memo_path)
+        except OSError as e:
+            logger.warning(f"Vokabular-Memo konnte nicht gespeichert werden: {e}")
+
+
+def load_vocabulary_file(path: str) -> List[str]:
+    """Ein Begriff pro Zeile; Leerzeilen und Zeilen mit # am Anfang werden ignoriert."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def correct_fields(articles: Sequence, matchers: Dict[str, VocabularyMatcher]) -> List[Tuple[str, str]]:
+    """
+    Korrigiert die Felder (categories/tags/orte) aller Artikel in-place, gibt [(alt, neu), ...] zurück.
+    Ein Durchlauf sammelt die verschiedenen Werte, jeder Wert wird einmal abgeglichen,
+    ein zweiter Durchlauf schreibt alle Korrekturen auf einmal um (statt einmal pro ungültigem Wert).
+    Vergleich wie bisher auf gestrippten Werten; bei Policy "raise" wird vor jeder Änderung geworfen.
+    """
+    distinct: Dict[str, Dict[str, None]] = {field: {} for field in matchers}
+    for a in articles:
+        for field, values in distinct.items():
+            for v in a[field]:
+                values[v] = None
+
+    corrections: List[Tuple[str, str]] = []
+    rewrites: Dict[str, Dict[str, str]] = {}
+    for field, matcher in matchers.items():
+        skip = FIELD_SKIP.get(field, ())
+        mapping: Dict[str, str] = {}  # gestrippter Wert -> Korrektur
+        for raw in distinct[field]:
+            value = raw.strip()
+            if raw in skip or value in matcher or value in mapping:
+                continue
+            corr = matcher.match(value)
+            if corr is not None:
+                mapping[value] = corr
+                corrections.append((value, corr))
+            elif FIELD_POLICIES.get(field, "keep") == "raise":
+                raise ValueError(f"{_UNKNOWN_MESSAGES.get(field, 'Unbekannter Wert')}: {value}")
+        if mapping:
+            rewrites[field] = {raw: mapping[raw.strip()] for raw in distinct[field] if raw.strip() in mapping}
+
+    for a in articles:
+        for field, raw_map in rewrites.items():
+            values = a[field]
+            if any(v in raw_map for v in values):
+                a[field] = [raw_map.get(v, v) for v in values]
+    for matcher in matchers.values():
+        matcher.save_memo()
+    return corrections
+
+
+_matchers: Dict[str, VocabularyMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_matcher(field: str, default_terms: Optional[Sequence[str]] = None) -> Optional[VocabularyMatcher]:
+    """
+    Prozessweiter Matcher pro Feld. Vokabular aus default_terms (z.B. ALLOWED_CATEGORIES) oder, falls nicht
+    angegeben, aus {NEWS_PARSER_VOCAB_DIR}/{field}.txt; ohne Datei None (Feld wird nicht geprüft).
+    Memo liegt unter {NEWS_PARSER_VOCAB_DIR}/{field}.memo.json.
+    """
+    with _matchers_lock:
+        if field not in _matchers:
+            vocab_dir = get_vocab_dir()
+            if default_terms is None:
+                path = os.path.join(vocab_dir, f"{field}.txt")
+                if not os.path.exists(path):
+                    return None
+                default_terms = load_vocabulary_file(path)
+            _matchers[field] = VocabularyMatcher(default_terms, memo_path=os.path.join(vocab_dir, f"{field}.memo.json"))
+        return _matchers[field]
@@ -0,0 +1,258 @@
+# core/watch.py
+"""
+Watch-Ordner (ohne Streamlit): python -m core.watch ORDNER... -o out/ [--rules regeln.json] [--once]
+
+Pollt die Ordner alle --interval Sekunden (mtime + Größe) und verarbeitet neue oder geänderte *.md-Dateien
+wie der Batch-Modus (parsen, validate_and_correct_categories, Regeln, Output-Pipeline).
+
+- Zustand in watch_state.json (atomar geschrieben): unveränderte Dateien werden nach einem Neustart nicht erneut verarbeitet.
+- Eine Datei wird erst übernommen, wenn sie --settle Sekunden nicht mehr geändert wurde (Feeds schreiben noch).
+- Begrenzte Parallelität: höchstens --workers Prozesse und 2 × workers Dateien in Arbeit; der Rest wartet in der Queue.
+- Fehlerhafte Dateien werden erst nach der nächsten Änderung erneut versucht; geänderte Regeln/Schritte verarbeiten alles neu.
+- SIGINT/SIGTERM: keine neuen Dateien mehr, laufende fertigstellen, Zustand speichern.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .cli import load_rules, process_file
+from .metrics import get_registry, merge_stages, write_reports
+from .output_processor import DEFAULT_STEP_ORDER, compile_pipeline
+from .processor import write_atomic
+from .utils import get_base_dir
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "watch_state.json"
+STATE_FORMAT = 1
+DEFAULT_INTERVAL = 5.0
+DEFAULT_SETTLE = 2.0
+
+
+class WatchState:
+    """Pfad -> {mtime_ns, size, status, processed_at, outputs, error}; dazu ein Fingerabdruck der Einstellungen."""
+
+    def __init__(self, path: str, settings: str = ""):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        self.dirty = False
+        data: Dict = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Watch-Zustand {path} nicht lesbar, starte leer: {e}")
+        if data.get("format") == STATE_FORMAT and data.get("settings") == settings:
+            self.files = data.get("files", {})
+        elif data:
+            logger.info("Regeln/Einstellungen geändert – alle Dateien werden neu verarbeitet")
+            self.dirty = True
+        self.settings = settings
+
+    def is_current(self, path: str, mtime_ns: int, size: int) -> bool:
+        entry = self.files.get(path)
+        return entry is not None and entry["mtime_ns"] == mtime_ns and entry["size"] == size
+
+    def record(self, path: str, mtime_ns: int, size: int, entry: Dict) -> None:
+        self.files[path] = {
+            "mtime_ns": mtime_ns, "size": size, "status": "failed" if entry["error"] else "done",
+            "processed_at": time.time(), "articles": entry["articles"],
+            "outputs": [o["path"] for o in entry["outputs"]], "error": entry["error"],
+        }
+        self.dirty = True
+
+    def forget(self, paths: Sequence[str]) -> None:
+        for path in paths:
+            if self.files.pop(path, None) is not None:
+                self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {"format": STATE_FORMAT, "settings": self.settings, "files": self.files}
+        write_atomic(self.path, lambda f: json.dump(data, f, ensure_ascii=False, indent=1))
+        self.dirty = False
+
+
+def settings_fingerprint(rules: Optional[List[Dict]], date: Optional[str], step_order: Sequence[str]) -> str:
+    raw = json.dumps({"rules": rules, "date": date, "steps": list(step_order)}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def scan(dirs: Sequence[str], exclude: Sequence[str] = ()) -> Dict[str, Tuple[int, int]]:
+    """Alle *.md direkt in den Ordnern -> (mtime_ns, size); Ordner in exclude (z.B. der Ausgabe-Ordner) werden übersprungen."""
+    excluded = {os.path.abspath(d) for d in exclude}
+    found: Dict[str, Tuple[int, int]] = {}
+    for d in dirs:
+        if os.path.abspath(d) in excluded:
+            continue
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.name.endswith(".md") and e.is_file():
+                        st = e.stat()
+                        found[os.path.abspath(e.path)] = (st.st_mtime_ns, st.st_size)
+        except OSError as err:  # Share kurz weg: nächster Durchlauf versucht es wieder
+            logger.warning(f"Ordner {d} nicht lesbar: {err}")
+    return found
+
+
+class Watcher:
+    """Poll-Schleife mit Queue und begrenzter Zahl laufender Dateien (Backpressure über max_in_flight)."""
+
+    def __init__(self, dirs: Sequence[str], out_dir: str, rules: Optional[List[Dict]] = None, date: Optional[str] = None,
+                 step_order: Sequence[str] = DEFAULT_STEP_ORDER, workers: int = 2, interval: float = DEFAULT_INTERVAL,
+                 settle: float = DEFAULT_SETTLE, state_path: Optional[str] = None):
+        self.dirs = [os.path.abspath(d) for d in dirs]
+        self.out_dir = os.path.abspath(out_dir)
+        self.rules, self.date, self.step_order = rules, date, list(step_order)
+        self.workers = max(1, workers)
+        self.max_in_flight = 2 * self.workers
+        self.interval = interval
+        self.settle_ns = int(settle * 1e9)
+        self.state = WatchState(state_path or os.path.join(self.out_dir, STATE_NAME),
+                                settings_fingerprint(rules, date, self.step_order))
+        self.queue: Deque[Tuple[str, int, int]] = deque()
+        self._queued: Dict[str, Tuple[int, int]] = {}  # Pfad -> Stand beim Einreihen (Queue oder in Arbeit)
+        self._in_flight: Dict[Future, Tuple[str, int, int]] = {}
+        self.stop_event = threading.Event()
+        self.processed = 0
+
+    def poll(self) -> int:
+        """Ein Scan: geänderte, zur Ruhe gekommene Dateien einreihen, gelöschte vergessen; gibt neu Eingereihte zurück."""
+        found = scan(self.dirs, exclude=[self.out_dir])
+        self.state.forget([p for p in self.state.files if p not in found and os.path.dirname(p) in self.dirs])
+        now = time.time_ns()
+        added = 0
+        for path, (mtime_ns, size) in sorted(found.items(), key=lambda item: item[1][0]):  # Älteste zuerst
+            if path in self._queued or self.state.is_current(path, mtime_ns, size):
+                continue  # Erneut geändert, während sie wartet/läuft: der Zustand hält den alten Stand -> nächster Scan
+            if now - mtime_ns < self.settle_ns:
+                continue  # Wird evtl. noch geschrieben
+            self._queued[path] = (mtime_ns, size)
+            self.queue.append((path, mtime_ns, size))
+            added += 1
+        if added:
+            logger.info(f"{added} Datei(en) eingereiht, {len(self.queue)} in der Queue, {len(self._in_flight)} in Arbeit")
+        return added
+
+    def _submit(self, pool: ProcessPoolExecutor) -> None:
+        while self.queue and len(self._in_flight) < self.max_in_flight and not self.stop_event.is_set():
+            path, mtime_ns, size = self.queue.popleft()
+            future = pool.submit(process_file, path, self.out_dir, self.rules, self.date, self.step_order)
+            self._in_flight[future] = (path, mtime_ns, size)
+
+    def _collect(self, timeout: Optional[float]) -> Dict[str, Dict]:
+        """Wartet bis timeout auf fertige Dateien und übernimmt sie in den Zustand; gibt die Stufen-Summen zurück."""
+        stages: Dict[str, Dict] = {}
+        if not self._in_flight:
+            return stages
+        done, _ = wait(list(self._in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            path, mtime_ns, size = self._in_flight.pop(future)
+            del self._queued[path]
+            try:
+                entry = future.result()
+            except Exception as e:  # Worker-Prozess abgestürzt (BrokenProcessPool o.ä.): nicht merken, nächster Scan versucht es wieder
+                logger.error(f"{os.path.basename(path)}: Worker fehlgeschlagen: {type(e).__name__}: {e}")
+                continue
+            self.state.record(path, mtime_ns, size, entry)
+            get_registry().merge(entry["stages"])
+            merge_stages(stages, entry["stages"])
+            self.processed += 1
+            if entry["error"]:
+                logger.error(f"{os.path.basename(path)}: {entry['error']}")
+            else:
+                logger.info(f"{os.path.basename(path)}: {entry['articles']} Artikel -> {len(entry['outputs'])} Ausgaben")
+        return stages
+
+    def run(self, once: bool = False) -> int:
+        """Hauptschleife; once: einmal scannen, alles Eingereihte abarbeiten, beenden. Gibt die Zahl verarbeiteter Dateien zurück."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.state.save()
+        next_poll = 0.0
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_signals) as pool:
+            while True:
+                if not self.stop_event.is_set() and time.monotonic() >= next_poll:
+                    self.poll()
+                    next_poll = time.monotonic() + self.interval
+                self._submit(pool)
+                if not self._in_flight:
+                    if once or self.stop_event.is_set():
+                        break
+                    self.stop_event.wait(max(0.0, next_poll - time.monotonic()))
+                    continue
+                started = time.time()
+                stages = self._collect(timeout=max(0.05, next_poll - time.monotonic()))
+                if stages:
+                    self.state.save()  # Nach jedem Schwung: ein Absturz verliert höchstens die laufenden Dateien
+                    write_reports({"run": "watch", "started": started, "seconds": round(time.time() - started, 4),
+                                   "error": None, "stages": stages, "spans": []}, self.out_dir)
+                if once and not self.queue and not self._in_flight:
+                    break
+        self.state.save()
+        return self.processed
+
+    def stop(self, *_args) -> None:
+        if not self.stop_event.is_set():
+            logger.info("Beende: laufende Dateien werden noch fertig verarbeitet")
+        self.stop_event.set()
+
+
+def _ignore_signals() -> None:
+    """Worker: Strg+C/SIGTERM gehen oft an die ganze Prozessgruppe – nur der Hauptprozess soll reagieren (geordnet beenden)."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m core.watch", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("dirs", nargs="+", help="Zu überwachende Ordner (*.md direkt darin)")
+    base_dir = get_base_dir()  # Beim Aufruf, nicht beim Import (set_config)
+    ap.add_argument("-o", "--out", default=base_dir, help=f"Ausgabe-Ordner (Default: {base_dir})")
+    ap.add_argument("-r", "--rules", help="JSON-Regel-Datei wie bei python -m core (Default: eine Ausgabe pro Kategorie)")
+    ap.add_argument("-d", "--date", help="Artikeldatum YYYY-MM-DD (Default: letzter Tag des Media-Monats)")
+    ap.add_argument("-w", "--workers", type=int, default=2, help="Anzahl Worker-Prozesse (Default: 2)")
+    ap.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help=f"Sekunden zwischen zwei Scans (Default: {DEFAULT_INTERVAL:g})")
+    ap.add_argument("--settle", type=float, default=DEFAULT_SETTLE, help=f"Sekunden ohne Änderung, bevor eine Datei übernommen wird (Default: {DEFAULT_SETTLE:g})")
+    ap.add_argument("--state", help=f"Zustands-Datei (Default: {{out}}/{STATE_NAME})")
+    ap.add_argument("--steps", default=",".join(DEFAULT_STEP_ORDER), help="Post-Processing-Reihenfolge, kommagetrennt")
+    ap.add_argument("--once", action="store_true", help="Einmal scannen, abarbeiten und beenden (z.B. für cron)")
+    return ap
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = build_arg_parser().parse_args(argv)
+    try:
+        for d in args.dirs:
+            if not os.path.isdir(d):
+                raise FileNotFoundError(f"Ordner nicht gefunden: {d}")
+        rules = load_rules(args.rules) if args.rules else None
+        step_order = [s.strip() for s in args.steps.split(",") if s.strip()]
+        compile_pipeline(step_order)  # Früh validieren
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    watcher = Watcher(args.dirs, args.out, rules, args.date, step_order, args.workers, args.interval, args.settle, args.state)
+    signal.signal(signal.SIGINT, watcher.stop)
+    signal.signal(signal.SIGTERM, watcher.stop)
+    processed = watcher.run(once=args.once)
+    failed = sum(1 for e in watcher.state.files.values() if e["status"] == "failed")
+    print(f"{processed} Datei(en) verarbeitet, {failed} mit Fehler – Zustand: {watcher.state.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
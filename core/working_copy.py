@@ -0,0 +1,489 @@
+# core/working_copy.py
+import os
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .article import Article, ArticleRef
+from .config import get_config
+from .facets import FACET_FIELDS, FacetIndex, iter_bits, mask_of, query_mask
+from .parser import load_articles
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".journal"   # Append-only: Entfernen/Undo/Redo pro Zeile
+INDEX_SUFFIX = ".index.json"   # Artikel-Index (Offsets + korrigierte Felder), siehe cache.reopen_working_copy
+
+
+STORE_BACKENDS = ("file", "sqlite")
+
+
+def store_backend() -> str:
+    """Backend für neue Working Copies: NEWS_PARSER_STORE=file (Default, Markdown + Journal) | sqlite."""
+    backend = get_config().store_backend
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unbekanntes Working-Copy-Backend: {backend} (erlaubt: {', '.join(STORE_BACKENDS)})")
+    return backend
+
+
+def open_store(path: str):
+    """Bestehende Working Copy öffnen – das Backend ergibt sich aus der Endung (.sqlite oder Markdown)."""
+    from .sqlite_store import SQLITE_SUFFIX, SqliteWorkingCopyStore  # Erst bei Bedarf (Import-Zyklus über facets)
+    if path.endswith(SQLITE_SUFFIX):
+        return SqliteWorkingCopyStore(path)
+    return WorkingCopyStore(path)
+
+
+def new_op_id() -> int:
+    """Aufsteigende Operations-ID (auch über mehrere Stores einer Auswahl hinweg vergleichbar)."""
+    return time.time_ns()
+
+
+class WorkingCopyStore:
+    """
+    Working Copy als unveränderliche Quelle + Journal: Artikel werden einmal geparst, die Datei wird nie umgeschrieben.
+    Entfernen hängt eine Zeile an {path}.journal an (Artikel-IDs pro Operation, z.B. pro erzeugtem Output);
+    Undo/Redo sind ebenfalls nur Journal-Zeilen. Der aktuelle Stand (Tombstone-Bits) wird beim Öffnen
+    aus dem Journal in O(Artikel + Journal) wiederhergestellt – auch nach einem Neustart.
+    Journal-Zeilen: remove\t{op}\t{ids, kommagetrennt}\t{label} | undo\t{op} | redo\t{op}
+    """
+
+    def __init__(self, path: str, articles: Optional[List[Article]] = None):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        # Block-Index: id = Position (articles: bereits geparster Inhalt von path, z.B. aus dem ParseCache)
+        self.articles: List[Article] = load_articles(path) if articles is None else articles
+        self._tombstones = bytearray((len(self.articles) + 7) // 8)
+        self._removed = 0
+        self._by_title: Dict[str, List[int]] = {}
+        for i, a in enumerate(self.articles):
+            a.article_id = i
+            self._by_title.setdefault(a.title, []).append(i)
+        self._lock = threading.Lock()
+        self._ops: Dict[int, Tuple[List[int], str]] = {}  # op -> (IDs, Label)
+        self._applied: List[int] = []  # Undo-Stapel
+        self._undone: List[int] = []   # Redo-Stapel
+        self._facets: Optional[FacetIndex] = None
+        self._replay()
+
+    # --- Index ---
+    @property
+    def total(self) -> int:
+        """Anzahl Artikel inkl. entfernter (Umfang des ID-Raums)."""
+        return len(self.articles)
+
+    def __len__(self) -> int:
+        return len(self.articles) - self._removed
+
+    def is_removed(self, article_id: int) -> bool:
+        return bool(self._tombstones[article_id >> 3] & (1 << (article_id & 7)))
+
+    def live_ids(self) -> List[int]:
+        return [i for i in range(len(self.articles)) if not self.is_removed(i)]
+
+    def live_articles(self) -> List[Article]:
+        return [a for i, a in enumerate(self.articles) if not self.is_removed(i)]
+
+    def ids_for_titles(self, titles: Iterable[str]) -> List[int]:
+        """Noch vorhandene Artikel-IDs zu den Titeln, in Datei-Reihenfolge."""
+        ids = [i for t in set(titles) for i in self._by_title.get(t, ()) if not self.is_removed(i)]
+        ids.sort()
+        return ids
+
+    def select_ids(self, ids: Iterable[int]) -> List[Article]:
+        """Noch vorhandene Artikel zu den IDs, in Datei-Reihenfolge."""
+        return [self.articles[i] for i in sorted(set(ids)) if 0 <= i < len(self.articles) and not self.is_removed(i)]
+
+    def select_refs(self, refs: Iterable[ArticleRef]) -> List[Article]:
+        """Wie WorkingCopySet.select_refs; alle refs gehören zu dieser Working Copy (nur die ID zählt)."""
+        return self.select_ids(i for _, i in refs)
+
+    @property
+    def facets(self) -> FacetIndex:
+        """Facetten-Index (Kategorien/Tags/Orte -> Bitsets), beim ersten Zugriff gebaut und danach mitgeführt."""
+        with self._lock:
+            if self._facets is None:
+                facets = FacetIndex(self.articles)
+                facets.remove(i for i in range(len(self.articles)) if self.is_removed(i))
+                self._facets = facets
+            return self._facets
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Wert -> Anzahl noch vorhandener Artikel (wie SqliteWorkingCopyStore.counts), aus dem Facetten-Index."""
+        return self.facets.counts(field)
+
+    def ids_with(self, field: str, value: str) -> List[int]:
+        """Noch vorhandene Artikel mit dem Wert (wie SqliteWorkingCopyStore.ids_with)."""
+        return self.facets.ids(self.facets.mask(field, value))
+
+    def set_source_file(self, name: str) -> None:
+        """Quelldatei aller Artikel (Mehrfach-Upload)."""
+        for a in self.articles:
+            a.source_file = name
+
+    def grouped(self) -> Dict[str, List[Article]]:
+        """Kategorie -> Artikel (wie bisher in app.py), aus dem Index statt aus erneutem Parsen."""
+        grouped: Dict[str, List[Article]] = {}
+        for a in self.live_articles():
+            for c in (a.categories or ["Unkategorisiert"]):
+                grouped.setdefault(c, []).append(a)
+        return grouped
+
+    # --- Änderungen (nur Journal + Tombstones) ---
+    def remove_ids(self, ids: Iterable[int], label: str = "", op: Optional[int] = None) -> List[int]:
+        """
+        Markiert Artikel als entfernt (O(len(ids))) und schreibt eine Journal-Zeile; gibt die neu entfernten IDs zurück.
+        op: gemeinsame ID mehrerer Stores (WorkingCopySet) – dann wird die Operation auch ohne Treffer vermerkt,
+        damit Undo/Redo in allen Stores denselben Stapel sehen. Eine neue Operation leert den Redo-Stapel.
+        """
+        with self._lock:
+            removed = [i for i in dict.fromkeys(ids) if not self.is_removed(i)]
+            if not removed and op is None:
+                return []
+            op = new_op_id() if op is None else op
+            self._append(f"remove\t{op}\t{','.join(map(str, removed))}\t{' '.join(label.split())}\n")
+            self._apply_remove(op, removed, label)
+            if self._facets is not None:
+                self._facets.remove(removed)
+        return removed
+
+    def remove_titles(self, titles: Iterable[str], label: str = "", op: Optional[int] = None) -> List[int]:
+        """Wie update_working_copy: entfernt alle Artikel mit einem der Titel."""
+        return self.remove_ids(self.ids_for_titles(titles), label, op)
+
+    def remove_refs(self, refs: Iterable[ArticleRef], label: str = "", op: Optional[int] = None) -> List[int]:
+        """Entfernt genau die referenzierten Artikel (gleichnamige andere bleiben)."""
+        return self.remove_ids((i for _, i in refs), label, op)
+
+    def undo(self, op: Optional[int] = None) -> Optional[List[int]]:
+        """Nimmt die letzte Operation zurück (nur wenn sie op ist, falls angegeben); gibt die wiederhergestellten IDs zurück."""
+        with self._lock:
+            if not self._applied or (op is not None and self._applied[-1] != op):
+                return None
+            op = self._applied[-1]
+            self._append(f"undo\t{op}\n")
+            restored = self._apply_undo(op)
+            if self._facets is not None:
+                self._facets.restore(restored)
+        return restored
+
+    def redo(self, op: Optional[int] = None) -> Optional[List[int]]:
+        """Wendet die zuletzt zurückgenommene Operation erneut an; gibt die wieder entfernten IDs zurück."""
+        with self._lock:
+            if not self._undone or (op is not None and self._undone[-1] != op):
+                return None
+            op = self._undone[-1]
+            self._append(f"redo\t{op}\n")
+            removed = self._apply_redo(op)
+            if self._facets is not None:
+                self._facets.remove(removed)
+        return removed
+
+    @property
+    def last_applied(self) -> Optional[int]:
+        return self._applied[-1] if self._applied else None
+
+    @property
+    def last_undone(self) -> Optional[int]:
+        return self._undone[-1] if self._undone else None
+
+    def history(self) -> List[Dict]:
+        """Operationen, neueste zuerst: {op, label, articles, applied}."""
+        with self._lock:
+            rows = [(op, True) for op in self._applied] + [(op, False) for op in reversed(self._undone)]
+            return [{"op": op, "label": self._ops[op][1], "articles": len(self._ops[op][0]), "applied": applied}
+                    for op, applied in sorted(rows, reverse=True)]
+
+    def delete(self) -> None:
+        """Löscht Working Copy, Journal und Index-Datei (Ende der Sitzung)."""
+        for path in (self.path, self.journal_path, self.path + INDEX_SUFFIX):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # --- Journal ---
+    def _append(self, line: str) -> None:
+        with open(self.journal_path, "a", encoding="utf-8", newline="\n") as f:
+            f.write(line)
+
+    def _set(self, ids: List[int], removed: bool) -> None:
+        for i in ids:
+            if removed:
+                self._tombstones[i >> 3] |= 1 << (i & 7)
+            else:
+                self._tombstones[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        self._removed += len(ids) if removed else -len(ids)
+
+    def _apply_remove(self, op: int, ids: List[int], label: str) -> None:
+        self._ops[op] = (ids, label)
+        self._applied.append(op)
+        self._undone.clear()
+        self._set(ids, True)
+
+    def _apply_undo(self, op: int) -> List[int]:
+        self._applied.remove(op)
+        self._undone.append(op)
+        ids = self._ops[op][0]
+        self._set(ids, False)
+        return ids
+
+    def _apply_redo(self, op: int) -> List[int]:
+        self._undone.remove(op)
+        self._applied.append(op)
+        ids = self._ops[op][0]
+        self._set(ids, True)
+        return ids
+
+    def _replay(self) -> None:
+        """Stand aus dem Journal: erst die Stapel nachspielen, dann die Tombstones einmal setzen."""
+        try:
+            with open(self.journal_path, "r", encoding="utf-8", newline="\n") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        n = len(self.articles)
+        for line in data[:data.rfind("\n") + 1].splitlines():  # Unvollständige letzte Zeile ignorieren
+            parts = line.split("\t")
+            try:
+                op = int(parts[1])
+                if parts[0] == "remove":
+                    ids = [int(i) for i in parts[2].split(",") if i] if len(parts) > 2 else []
+                    if any(i >= n for i in ids):
+                        raise ValueError(f"ID außerhalb der Working Copy ({n} Artikel)")
+                    self._ops[op] = (ids, parts[3] if len(parts) > 3 else "")
+                    self._applied.append(op)
+                    self._undone.clear()
+                elif parts[0] == "undo" and op in self._applied:
+                    self._applied.remove(op)
+                    self._undone.append(op)
+                elif parts[0] == "redo" and op in self._undone:
+                    self._undone.remove(op)
+                    self._applied.append(op)
+            except (IndexError, ValueError) as e:
+                logger.warning(f"Journal-Zeile übersprungen ({os.path.basename(self.journal_path)}): {e}")
+        for op in self._applied:
+            self._set([i for i in self._ops[op][0] if not self.is_removed(i)], True)
+        if self._applied:
+            logger.info(f"Journal nachgespielt: {self._removed} von {n} Artikeln entfernt ({os.path.basename(self.path)})")
+
+
+class WorkingCopySet:
+    """
+    Mehrere Working Copies (Mehrfach-Upload, beliebiges Backend) als eine Auswahl: Artikel, Gruppierung und Facetten über alle Dateien.
+    Hat dieselbe Schnittstelle wie WorkingCopyStore (select_refs/remove_refs/undo/redo/grouped/facets),
+    damit run_generation und die UI beides verwenden können. Artikel werden über Article.ref = (Dateiname, ID) angesprochen,
+    weil verschiedene Feeds dieselben Titel für verschiedene Meldungen verwenden. Jede Datei behält ihren eigenen Store;
+    Facetten-IDs sind Positionen in der Verkettung aller Stores (in Upload-Reihenfolge); Zählungen und Filter fragen die Stores.
+    Eine Operation trägt in allen Stores dieselbe ID, Undo/Redo wirken daher über alle Dateien.
+    manifest_path: Dateien der Sitzung (Name -> Working Copy) als JSON, zum Wiederherstellen nach einem Neustart.
+    """
+
+    def __init__(self, manifest_path: Optional[str] = None):
+        self.manifest_path = manifest_path
+        self._stores: "OrderedDict[str, WorkingCopyStore]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(store) for store in self._stores.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._stores
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._stores)
+
+    @property
+    def paths(self) -> List[str]:
+        return [store.path for store in self._stores.values()]
+
+    def stores(self) -> List[Tuple[str, WorkingCopyStore]]:
+        return list(self._stores.items())
+
+    def add(self, name: str, store) -> None:
+        """Nimmt die Working Copy einer Datei auf (ersetzt eine gleichnamige); Artikel bekommen ihre Quelldatei."""
+        store.set_source_file(name)  # SQLite: steht schon in der Tabelle, Artikel werden nicht geladen
+        with self._lock:
+            self._stores.pop(name, None)
+            self._stores[name] = store
+        self._save_manifest()
+
+    def remove_file(self, name: str) -> Optional[WorkingCopyStore]:
+        """Nimmt eine Datei heraus (der Store kann danach mit delete() gelöscht werden)."""
+        with self._lock:
+            store = self._stores.pop(name, None)
+        self._save_manifest()
+        return store
+
+    def delete(self) -> None:
+        """Löscht alle Working Copies samt Journal und das Manifest (Ende der Sitzung)."""
+        with self._lock:
+            stores = list(self._stores.values())
+            self._stores.clear()
+        for store in stores:
+            store.delete()
+        if self.manifest_path:
+            try:
+                os.remove(self.manifest_path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def articles(self) -> List[Article]:
+        return [a for store in self._stores.values() for a in store.articles]
+
+    def live_articles(self) -> List[Article]:
+        return [a for store in self._stores.values() for a in store.live_articles()]
+
+    def select_refs(self, refs: Iterable[ArticleRef]) -> List[Article]:
+        """Noch vorhandene Artikel zu (Dateiname, ID) – Datei für Datei in Upload-Reihenfolge."""
+        by_file = _ids_by_file(refs)
+        return [a for name, store in self._stores.items() if name in by_file for a in store.select_ids(by_file[name])]
+
+    def remove_refs(self, refs: Iterable[ArticleRef], label: str = "") -> List[int]:
+        """Entfernt genau die referenzierten Artikel aus ihren Dateien (eine Operation), gibt die IDs in der Verkettung zurück."""
+        by_file = _ids_by_file(refs)
+        op = new_op_id()
+        return self._each(lambda name, store: store.remove_ids(by_file.get(name, ()), label, op))
+
+    def undo(self) -> Optional[List[int]]:
+        """Nimmt die jüngste Operation in allen Dateien zurück; None, wenn es nichts rückgängig zu machen gibt."""
+        ops = [store.last_applied for store in self._stores.values() if store.last_applied is not None]
+        if not ops:
+            return None
+        op = max(ops)
+        return self._each(lambda name, store: store.undo(op) or [])
+
+    def redo(self) -> Optional[List[int]]:
+        """Wendet die zuletzt zurückgenommene Operation in allen Dateien wieder an."""
+        ops = [store.last_undone for store in self._stores.values() if store.last_undone is not None]
+        if not ops:
+            return None
+        op = min(ops)  # Zuletzt zurückgenommen = älteste noch offene
+        return self._each(lambda name, store: store.redo(op) or [])
+
+    def history(self) -> List[Dict]:
+        """Operationen über alle Dateien, neueste zuerst (Artikelzahlen summiert)."""
+        merged: "OrderedDict[int, Dict]" = OrderedDict()
+        for store in self._stores.values():
+            for row in store.history():
+                entry = merged.setdefault(row["op"], dict(row, articles=0))
+                entry["articles"] += row["articles"]
+        return sorted(merged.values(), key=lambda row: row["op"], reverse=True)
+
+    def offsets(self) -> List[Tuple[str, WorkingCopyStore, int]]:
+        """(Name, Store, Offset) in Upload-Reihenfolge: ID in der Verkettung = Offset + lokale ID."""
+        result = []
+        offset = 0
+        for name, store in self._stores.items():
+            result.append((name, store, offset))
+            offset += store.total
+        return result
+
+    def _each(self, fn) -> List[int]:
+        """fn(name, store) -> lokale IDs in jedem Store; gibt die IDs in der Verkettung zurück."""
+        with self._lock:
+            return [offset + i for name, store, offset in self.offsets() for i in fn(name, store)]
+
+    def grouped(self) -> Dict[str, List[Article]]:
+        """Kategorie -> Artikel über alle Dateien (Upload-Reihenfolge, dann Datei-Reihenfolge) aus store.grouped()."""
+        grouped: Dict[str, List[Article]] = {}
+        for store in self._stores.values():
+            for cat, articles in store.grouped().items():
+                grouped.setdefault(cat, []).extend(articles)
+        return grouped
+
+    @property
+    def facets(self) -> "SetFacets":
+        """Zählungen und Filter über alle Dateien (siehe SetFacets) – fragt die Stores, lädt keine SQLite-Artikel."""
+        with self._lock:
+            return SetFacets(self.offsets())
+
+    def _save_manifest(self) -> None:
+        if not self.manifest_path:
+            return
+        with self._lock:
+            files = [{"name": name, "path": store.path} for name, store in self._stores.items()]
+        tmp_path = f"{self.manifest_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": files}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Sitzungs-Manifest konnte nicht gespeichert werden: {e}")
+
+
+class SetFacets:
+    """
+    Facetten eines WorkingCopySet mit der Schnittstelle von FacetIndex (counts/query/ids/select).
+    Zählungen und Treffer kommen aus store.counts()/store.ids_with() (bei SQLite indizierte Abfragen), IDs sind
+    Positionen in der Verkettung (WorkingCopySet.offsets); Artikel werden erst für die Treffer von select() gelesen.
+    """
+
+    def __init__(self, offsets: List[Tuple[str, WorkingCopyStore, int]]):
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return sum(len(store) for _, store, _ in self._offsets)
+
+    @property
+    def live(self) -> int:
+        return mask_of(offset + i for _, store, offset in self._offsets for i in store.live_ids())
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Wert -> Anzahl noch vorhandener Artikel über alle Dateien, absteigend."""
+        merged: Dict[str, int] = {}
+        for _, store, _ in self._offsets:
+            for value, n in store.counts(field).items():
+                merged[value] = merged.get(value, 0) + n
+        return dict(sorted(merged.items(), key=lambda item: (-item[1], item[0])))
+
+    def mask(self, field: Optional[str], value: str) -> int:
+        """Wie FacetIndex.mask (Groß/Klein egal, field None = beliebiges Feld); Werte aus counts, Treffer aus ids_with."""
+        key = value.strip().casefold()
+        ids: List[int] = []
+        for _, store, offset in self._offsets:
+            for f in (FACET_FIELDS if field is None else (field,)):
+                for v in store.counts(f):
+                    if v.casefold() == key:
+                        ids.extend(offset + i for i in store.ids_with(f, v))
+        return mask_of(ids)
+
+    def query(self, expr: str) -> int:
+        return query_mask(expr, self.mask, self.live)
+
+    def ids(self, mask: int) -> List[int]:
+        return iter_bits(mask & self.live)
+
+    def select(self, expr: str) -> List[Article]:
+        """Noch vorhandene Artikel, die den Filter erfüllen (Upload-, dann Datei-Reihenfolge)."""
+        ids = iter_bits(self.query(expr))  # query() ist schon auf die vorhandenen Artikel beschränkt
+        selected: List[Article] = []
+        for _, store, offset in self._offsets:
+            local = [i - offset for i in ids if offset <= i < offset + store.total]
+            if local:
+                selected.extend(store.select_ids(local))
+        return selected
+
+
+def _ids_by_file(refs: Iterable[ArticleRef]) -> Dict[Optional[str], List[int]]:
+    by_file: Dict[Optional[str], List[int]] = {}
+    for name, article_id in refs:
+        by_file.setdefault(name, []).append(article_id)
+    return by_file
+
+
+def read_manifest(manifest_path: str) -> List[Tuple[str, str]]:
+    """[(Dateiname, Pfad der Working Copy)] aus einem Sitzungs-Manifest; leer, wenn keins vorhanden ist."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return [(entry["name"], entry["path"]) for entry in json.load(f)["files"]]
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Sitzungs-Manifest nicht lesbar: {e}")
+        return []
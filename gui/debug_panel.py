@@ -0,0 +1,30 @@
+# gui/debug_panel.py
+import streamlit as st
+from core.metrics import get_registry
+
+
+def render_metrics_panel():
+    """Optionales Debug-Panel: letzter Run (Spans) und prozessweite Summen pro Stufe."""
+    registry = get_registry()
+    runs = list(registry.runs)
+    with st.expander("Debug: Metriken", expanded=False):
+        if runs:
+            last = runs[-1]
+            st.caption(f"Letzter Vorgang: {last['run']} – {last['seconds']:.3f}s" + (f" – Fehler: {last['error']}" if last["error"] else ""))
+            st.dataframe([
+                {"Stufe": "  " * s["depth"] + s["name"], "Sekunden": s["seconds"], "Bytes rein": s["bytes_in"],
+                 "Bytes raus": s["bytes_out"], "Zeichen rein": s["chars_in"], "Zeichen raus": s["chars_out"],
+                 "Artikel": s["articles"]}
+                for s in last["spans"]
+            ], use_container_width=True)
+        else:
+            st.caption("Noch keine Vorgänge gemessen.")
+        stages = registry.snapshot()
+        if stages:
+            st.caption("Summen seit Prozessstart")
+            st.dataframe([
+                {"Stufe": name, "Aufrufe": s["calls"], "Fehler": s["errors"], "Sekunden": round(s["seconds"], 4),
+                 "Max": round(s["seconds_max"], 4), "Bytes rein": s["bytes_in"], "Bytes raus": s["bytes_out"],
+                 "Zeichen rein": s["chars_in"], "Zeichen raus": s["chars_out"], "Artikel": s["articles"]}
+                for name, s in sorted(stages.items(), key=lambda item: -item[1]["seconds"])
+            ], use_container_width=True)
@@ -0,0 +1,32 @@
+# gui/jobs.py
+import time
+import streamlit as st
+from typing import Callable
+from core.jobs import Job, get_job_runner
+
+POLL_SECONDS = 0.5
+
+
+def _job_status(job_id: str, on_finished: Callable[[Job], None]):
+    job = get_job_runner().get(job_id)
+    if job is None or job.done:
+        on_finished(job)
+        st.rerun()  # Ganze Seite neu (auch aus einem Fragment heraus)
+    st.progress(job.progress, text=f"{job.stage} …" if not job.cancel_requested else "Wird abgebrochen …")
+    st.button("Abbrechen", key=f"cancel_{job.id}", on_click=job.cancel,
+              disabled=not job.cancellable or job.cancel_requested)
+
+
+def render_job_status(job_id: str, on_finished: Callable[[Job], None]):
+    """
+    Fortschritt eines Hintergrund-Jobs mit Abbrechen-Button; fragt alle POLL_SECONDS nach.
+    on_finished(job) läuft einmal, sobald der Job fertig ist (job None: unbekannt, z.B. nach Neustart).
+    Mit st.fragment wird nur dieser Bereich neu gezeichnet, sonst die ganze Seite.
+    """
+    fragment = getattr(st, "fragment", None)
+    if fragment is not None:
+        fragment(run_every=POLL_SECONDS)(_job_status)(job_id, on_finished)
+        return
+    _job_status(job_id, on_finished)
+    time.sleep(POLL_SECONDS)
+    st.rerun()
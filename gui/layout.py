@@ -1,29 +1,168 @@
 # gui/layout.py
 import streamlit as st
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from core.article import ArticleRef
+from core.facets import FacetIndex
 from core.utils import make_key
 
-def render_article_list(grouped: dict):
+PAGE_SIZES = (25, 50, 100, 200)
+
+# Auswahl als ein Set von Article.ref (Quelldatei, Artikel-ID) pro Session (statt eines Widget-Keys pro Artikel und Kategorie);
+# gleichnamige Artikel sind so getrennt wählbar. Checkboxen gibt es nur für die gerade sichtbare Seite, ihr Zustand wird aus dem Set gesetzt.
+def get_selection() -> Set[ArticleRef]:
+    if "selected_refs" not in st.session_state:
+        st.session_state.selected_refs = set()
+    return st.session_state.selected_refs
+
+def _set_refs(refs: Iterable[ArticleRef], value: bool):
+    """Callback: Artikel gesammelt an- oder abwählen."""
+    if value:
+        get_selection().update(refs)
+    else:
+        get_selection().difference_update(refs)
+
+def _toggle_ref(ref: ArticleRef, key: str):
+    _set_refs((ref,), st.session_state[key])
+
+def _row_key(cat: str, ref: ArticleRef) -> str:
+    """Widget-Key pro Zeile aus der Identität des Artikels – gleiche Titel (auch in einer Datei) ergeben keine doppelten Keys."""
+    return make_key(cat, f"{ref[0] or ''}\x00{ref[1]}")
+
+def _toggle_category(cat: str):
+    open_cats = st.session_state.setdefault("open_categories", set())
+    open_cats.symmetric_difference_update({cat})
+
+def _set_page(cat: str, page: int):
+    st.session_state.setdefault("category_pages", {})[cat] = page
+
+def _select_articles(articles):
+    """Callback: Treffer des Filters auswählen (in allen Kategorien, da die Auswahl pro Artikel gilt)."""
+    _set_refs((a.ref for a in articles), True)
+
+def render_facet_filter(facets: FacetIndex) -> Optional[Set[ArticleRef]]:
+    """Filter-Ausdruck über Kategorien/Tags/Orte; gibt die refs der Treffer zurück, falls nur diese angezeigt werden sollen."""
+    with st.expander("Filter", expanded=False):
+        c1, c2, c3 = st.columns(3)
+        for col, field, label in ((c1, "categories", "Kategorien"), (c2, "tags", "Tags"), (c3, "orte", "Orte")):
+            with col:
+                counts = facets.counts(field)
+                top = ", ".join(f"{v} ({n})" for v, n in list(counts.items())[:15])
+                st.caption(f"**{label}:** {top or '—'}")
+        query = st.text_input("Filter", key="facet_query", placeholder='tags:Klima AND orte:Berlin, categories:"Umwelt & Klima" OR NOT tags:Wahl')
+        if not query.strip():
+            return None
+        try:
+            matches = facets.select(query)
+        except ValueError as e:
+            st.warning(f"Filter ungültig: {e}")
+            return None
+        c1, c2 = st.columns([2, 3])
+        with c1:
+            st.button(f"{len(matches)} Treffer auswählen", on_click=_select_articles, args=(matches,), disabled=not matches)
+        with c2:
+            only_matches = st.checkbox("Nur Treffer anzeigen", key="facet_only")
+        return {a.ref for a in matches} if only_matches else None
+
+def render_duplicate_groups(grouped: dict, duplicates: Dict[str, List[str]]):
+    """Gruppen fast gleicher Artikel (duplicates: Titel -> ähnliche Titel), nur noch vorhandene Titel."""
     title_to_cats = {}
     for cat, arts in grouped.items():
         for a in arts:
             title_to_cats.setdefault(a["title"], set()).add(cat)
+    groups = []
+    for title, others in duplicates.items():
+        group = sorted(t for t in {title, *others} if t in title_to_cats)
+        if len(group) > 1 and group not in groups:
+            groups.append(group)
+    if not groups:
+        return
+    with st.expander(f"Mögliche Duplikate ({len(groups)} Gruppen)", expanded=False):
+        for group in groups:
+            st.markdown("\n".join(f"- {t} ({', '.join(sorted(title_to_cats[t]))})" for t in group))
+            st.divider()
+
+def render_article_list(grouped: dict, published: Optional[Dict[str, str]] = None, hide_published: bool = False,
+                        duplicates: Optional[Dict[str, List[str]]] = None, visible_refs: Optional[Set[ArticleRef]] = None,
+                        page_size: int = PAGE_SIZES[1], show_source: bool = False,
+                        suggestions: Optional[Dict[str, List[Tuple[str, float]]]] = None):
+    """
+    Kategorien eingeklappt; nur aufgeklappte Kategorien zeichnen Zeilen, und davon nur eine Seite (page_size).
+    published: Titel -> Output-Datei (bereits veröffentlicht); markiert oder – mit hide_published – blendet aus.
+    duplicates: Titel -> Titel fast gleicher Artikel (MinHash), als Hinweis unter dem Titel.
+    visible_refs: nur diese Artikel anzeigen (Filter, Article.ref), None = alle.
+    show_source: Quelldatei je Artikel anzeigen (bei mehreren hochgeladenen Dateien).
+    suggestions: Titel -> [(Kategorie, Score)] aus dem Kategorie-Modell, als Hinweis neben dem Titel.
+    Rückgabe: (refs der ausgewählten noch vorhandenen Artikel, Anzahl Artikel).
+    """
+    published = published or {}
+    duplicates = duplicates or {}
+    suggestions = suggestions or {}
+    selected = get_selection()
+    open_cats = st.session_state.setdefault("open_categories", set())
+    pages = st.session_state.setdefault("category_pages", {})
+    title_to_cats = {}
+    live_refs = set()
+    for cat, arts in grouped.items():
+        for a in arts:
+            title_to_cats.setdefault(a["title"], set()).add(cat)
+            live_refs.add(a.ref)
 
-    selected = set()
     for cat in sorted(grouped.keys()):
-        with st.expander(f"**{cat}** ({len(grouped[cat])} Artikel)", expanded=True):
-            for art in grouped[cat]:
-                title = art["title"]
-                key = make_key(cat, title)
+        arts = [
+            a for a in grouped[cat]
+            if not (hide_published and a["title"] in published) and (visible_refs is None or a.ref in visible_refs)
+        ]
+        if not arts:
+            continue
+        refs = [a.ref for a in arts]
+        n_selected = sum(1 for r in refs if r in selected)
+        is_open = cat in open_cats
+        cat_key = make_key(cat, "")
+        h1, h2, h3 = st.columns([6, 1, 1])
+        with h1:
+            st.button(f"{'▾' if is_open else '▸'} **{cat}** ({len(arts)} Artikel, {n_selected} ausgewählt)",
+                      key=f"open_{cat_key}", on_click=_toggle_category, args=(cat,))
+        with h2:
+            st.button("Alle", key=f"all_{cat_key}", on_click=_set_refs, args=(refs, True))
+        with h3:
+            st.button("Keine", key=f"none_{cat_key}", on_click=_set_refs, args=(refs, False))
+        if not is_open:
+            continue
+
+        n_pages = (len(arts) + page_size - 1) // page_size
+        page = min(pages.get(cat, 0), n_pages - 1)
+        page_slice = slice(page * page_size, (page + 1) * page_size)
+        with st.container():
+            for art in arts[page_slice]:
+                title, ref = art["title"], art.ref
+                key = _row_key(cat, ref)
+                st.session_state[key] = ref in selected  # Widget-Zustand aus dem Auswahl-Set
                 col1, col2, col3 = st.columns([5, 2, 2])
                 with col1:
-                    if st.checkbox(title, key=key):
-                        selected.add(title)
+                    st.checkbox(title, key=key, on_change=_toggle_ref, args=(ref, key))
+                    if title in published:
+                        st.caption(f":orange[bereits veröffentlicht in {published[title]}]")
+                    similar = [t for t in duplicates.get(title, ()) if t in title_to_cats]
+                    if similar:
+                        st.caption(f"ähnlich: {' | '.join(similar)}")
                 with col2:
                     others = sorted(title_to_cats[title] - {cat})
                     if others:
                         st.caption(f"auch in: {', '.join(others)}")
+                    if title in suggestions:
+                        st.caption("Vorschlag: " + ", ".join(f"{c} ({score:.2f})" for c, score in suggestions[title]))
                 with col3:
+                    if show_source and art["source_file"]:
+                        st.caption(f"Quelle: {art['source_file']}")
                     info = " | ".join(filter(None, [", ".join(art["tags"]), ", ".join(art["orte"])]))
                     if info:
                         st.caption(info)
-    return selected, len(title_to_cats)
\ No newline at end of file
+            if n_pages > 1:
+                p1, p2, p3 = st.columns([1, 3, 1])
+                with p1:
+                    st.button("‹", key=f"prev_{cat_key}", on_click=_set_page, args=(cat, page - 1), disabled=page == 0)
+                with p2:
+                    st.caption(f"Seite {page + 1} / {n_pages}")
+                with p3:
+                    st.button("›", key=f"next_{cat_key}", on_click=_set_page, args=(cat, page + 1), disabled=page >= n_pages - 1)
+    return selected & live_refs, len(live_refs)
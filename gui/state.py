@@ -1,10 +1,56 @@
 # gui/state.py
+import re
+import uuid
+import threading
 import streamlit as st
+from typing import Dict, Optional
+
+try:
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # Andere Streamlit-Version: ohne Laufzeit-Abfrage gilt eine Kennung als nicht belegt
+    Runtime = get_script_run_ctx = None
+
+SESSION_PARAM = "sid"  # Kennung der Arbeits-Sitzung in der URL (?sid=...)
+_SID_RE = re.compile(r"[0-9a-f]{16}")
+
+# Kennung -> Streamlit-Session, die sie gerade benutzt (prozessweit; nach einem Neustart leer)
+_owners: Dict[str, Optional[str]] = {}
+_owners_lock = threading.Lock()
+
 def init_state():
     defaults = {
-        "src_text": None, "file_name": None, "working_path": None,
+        "file_name": None, "working_path": None,
         "grouped": {}, "corrections_str": "", "year": 2025, "month": 10
     }
     for k, v in defaults.items():
         if k not in st.session_state:
-            st.session_state[k] = v
\ No newline at end of file
+            st.session_state[k] = v
+
+def _browser_session() -> Optional[str]:
+    ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+    return ctx.session_id if ctx is not None else None
+
+def _is_live(browser_session: Optional[str]) -> bool:
+    if browser_session is None or Runtime is None or not Runtime.exists():
+        return False
+    return Runtime.instance().is_active_session(browser_session)
+
+def session_id() -> str:
+    """
+    Kennung der Arbeits-Sitzung (Working Copies + Manifest), steht in der URL und überlebt so Reload und Neustart.
+    Gehört genau einer Browser-Sitzung: öffnet eine zweite dieselbe URL, solange die erste verbunden ist,
+    bekommt sie eine neue Kennung (und damit eine leere Sitzung).
+    """
+    if "sid" in st.session_state:
+        return st.session_state.sid
+    sid = st.query_params.get(SESSION_PARAM)
+    me = _browser_session()
+    with _owners_lock:
+        owner = _owners.get(sid)
+        if not sid or not _SID_RE.fullmatch(sid) or (owner is not None and owner != me and _is_live(owner)):
+            sid = uuid.uuid4().hex[:16]
+        _owners[sid] = me
+    st.query_params[SESSION_PARAM] = sid
+    st.session_state.sid = sid
+    return sid
@@ -0,0 +1,32 @@
+# tests/test_cache.py
+"""
+ParseCache: eine Datei (gestreamt im eigenen Prozess) und mehrere Dateien (Worker-Prozesse) liefern dieselben Artikel.
+Start: python -m pytest -q tests/test_cache.py
+"""
+import io
+
+import pytest
+
+from benchmarks.corpus import generate_digest
+from core.cache import ParseCache
+
+
+def _fields(store):
+    return [(a.title, a.raw, a.categories, a.tags, a.orte) for a in store.articles]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"])
+def test_single_and_pool_path_parse_alike(tmp_path, newline):
+    data = generate_digest(30, seed=3).replace("\n", newline).encode("utf-8")
+    other = generate_digest(30, seed=4).replace("\n", newline).encode("utf-8")
+
+    single, parsed_single, _ = ParseCache().open_working_copy(io.BytesIO(data), "a.md", str(tmp_path), backend="file")
+    results, errors = ParseCache().open_working_copies(
+        [("a.md", io.BytesIO(data)), ("b.md", io.BytesIO(other))], str(tmp_path), backend="file", max_workers=2)
+    assert errors == {}
+    pooled, parsed_pooled, hit = results["a.md"]
+
+    assert not hit
+    assert (parsed_pooled.year, parsed_pooled.month) == (parsed_single.year, parsed_single.month)
+    assert _fields(pooled) == _fields(single)
+    assert all("\r" not in a.raw for a in pooled.articles)
@@ -0,0 +1,97 @@
+# tests/test_output_pipeline.py
+"""
+Äquivalenz der fusionierten Pipeline (OutputPipeline.run) zur Einzelschritt-Kette (run_stepwise), Byte für Byte.
+Korpus: tests/fixtures/pipeline/*.md (rohe Outputs wie aus generate_output) + synthetische Digests aus benchmarks.corpus.
+Start: python -m pytest -q tests/test_output_pipeline.py
+"""
+import glob
+import io
+import os
+import random
+
+import pytest
+
+from benchmarks.corpus import generate_digest
+from core.article import MetaAggregate, write_raw_blocks
+from core.output_processor import DEFAULT_STEP_ORDER, OutputPipeline, _NeedsStepwise
+from core.parser import parse_articles_from_text
+from core.processor import clean_source_text
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "pipeline")
+FM_ARGS = ("Digest Oktober", 2025, 10, 31, 2025, 9)
+
+
+def _fixtures():
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.md"))):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            corpus[os.path.basename(path)] = f.read()
+    for seed in (1, 2):
+        corpus[f"generated_{seed}"] = clean_source_text(generate_digest(40, seed=seed, typo_rate=0.1))
+    return corpus
+
+
+CORPUS = _fixtures()
+
+# Standard-Reihenfolge, Umkehrung, Frontmatter zuletzt, ohne step4, Teilmengen und zufällige Permutationen
+_rng = random.Random(7)
+ORDERS = [
+    DEFAULT_STEP_ORDER,
+    tuple(reversed(DEFAULT_STEP_ORDER)),
+    DEFAULT_STEP_ORDER[1:] + ("step4",),
+    DEFAULT_STEP_ORDER[1:],
+    ("step7", "step5"),
+    ("step6", "step2", "step4"),
+] + [tuple(_rng.sample(DEFAULT_STEP_ORDER, len(DEFAULT_STEP_ORDER))) for _ in range(4)]
+
+# Eingaben, die nur die Einzelschritte exakt abbilden -> run() muss auf run_stepwise zurückfallen
+FALLBACK_CASES = {
+    "crlf": CORPUS["digest.md"].replace("\n", "\r\n"),
+    "multiline_my_link": CORPUS["digest.md"].replace(
+        '{{< my_link url="Link" >}}', '{{< my_link\nurl="Link" >}}'),
+    "bare_heading": "###### \nText unter einer leeren Überschrift\n\n" + CORPUS["digest.md"],
+    "date_own_line": CORPUS["digest.md"].replace(" (*Date*)\n", "\n(*Date*)\n", 1),
+}
+
+
+@pytest.mark.parametrize("order", ORDERS, ids=lambda order: "-".join(s[4:] for s in order))
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_fused_matches_stepwise(name, order):
+    pipeline = OutputPipeline(order)
+    text = CORPUS[name]
+    expected = pipeline.run_stepwise(text, *FM_ARGS)
+    assert pipeline._run_fused(text, FM_ARGS) == expected  # Korpus muss den fusionierten Pfad wirklich nehmen
+    assert pipeline.run(text, *FM_ARGS) == expected
+
+
+@pytest.mark.parametrize("order", ORDERS, ids=lambda order: "-".join(s[4:] for s in order))
+@pytest.mark.parametrize("case", sorted(FALLBACK_CASES))
+def test_fallback_inputs_match_stepwise(case, order):
+    pipeline = OutputPipeline(order)
+    text = FALLBACK_CASES[case]
+    expected = pipeline.run_stepwise(text, *FM_ARGS)
+    try:
+        fused = pipeline._run_fused(text, FM_ARGS)
+    except _NeedsStepwise:
+        fused = None
+    if fused is not None:  # Je nach Reihenfolge entschärfen frühere Schritte den Sonderfall
+        assert fused == expected
+    assert pipeline.run(text, *FM_ARGS) == expected
+
+
+@pytest.mark.parametrize("case", sorted(FALLBACK_CASES))
+def test_fallback_inputs_are_detected(case):
+    with pytest.raises(_NeedsStepwise):
+        OutputPipeline(DEFAULT_STEP_ORDER)._run_fused(FALLBACK_CASES[case], FM_ARGS)
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_frontmatter_from_meta(name):
+    """Wie generate_output: raw-Blöcke mit MetaAggregate geschrieben, step4 aus meta statt aus den Kommentaren."""
+    articles = parse_articles_from_text(CORPUS[name])
+    buf = io.StringIO()
+    meta = MetaAggregate()
+    write_raw_blocks(buf, articles, meta)
+    pipeline = OutputPipeline(DEFAULT_STEP_ORDER)
+    expected = pipeline.run_stepwise(buf.getvalue(), *FM_ARGS, meta=meta)
+    assert pipeline.run(buf.getvalue(), *FM_ARGS, meta=meta) == expected
@@ -0,0 +1,68 @@
+# tests/test_working_copy.py
+"""
+WorkingCopySet: Auswahl und Entfernen über Article.ref (Quelldatei, ID) – gleichnamige Artikel bleiben getrennt;
+Zählungen, Filter und Gruppierung über alle Dateien wie ein FacetIndex über die noch vorhandenen Artikel.
+Start: python -m pytest -q tests/test_working_copy.py
+"""
+import io
+
+import pytest
+
+from benchmarks.corpus import generate_digest
+from core.cache import ParseCache
+from core.facets import FACET_FIELDS, UNCATEGORIZED, FacetIndex
+from core.working_copy import WorkingCopySet
+
+
+def _open_set(tmp_path, backend):
+    data = generate_digest(30, seed=5).encode("utf-8")
+    results, errors = ParseCache().open_working_copies(
+        [("a.md", io.BytesIO(data)), ("b.md", io.BytesIO(data + b"\n"))], str(tmp_path), backend=backend)
+    assert errors == {}
+    wc_set = WorkingCopySet()
+    for name, (store, _, _) in results.items():
+        wc_set.add(name, store)
+    return wc_set
+
+
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+def test_refs_keep_same_titles_apart(tmp_path, backend):
+    wc_set = _open_set(tmp_path, backend)
+    live = wc_set.live_articles()
+    first = live[0]
+    twin = next(a for a in live if a.title == first.title and a.source_file != first.source_file)
+
+    assert [a.ref for a in wc_set.select_refs([first.ref])] == [first.ref]
+    wc_set.remove_refs([first.ref], "Output")
+    after = wc_set.live_articles()
+    assert len(after) == len(live) - 1
+    assert [a.ref for a in after if a.title == first.title] == [twin.ref]
+
+    wc_set.undo()
+    assert [a.ref for a in wc_set.live_articles()] == [a.ref for a in live]
+
+
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+def test_set_facets_match_facet_index(tmp_path, backend):
+    wc_set = _open_set(tmp_path, backend)
+    wc_set.remove_refs([a.ref for a in wc_set.live_articles()[::5]], "Output")
+    if backend == "sqlite":
+        for _, store in wc_set.stores():
+            store._articles = None  # live_articles() hat alle geladen
+    facets = wc_set.facets
+    counts = {field: facets.counts(field) for field in FACET_FIELDS}
+    queries = ["tags:Klima", "orte:berlin AND NOT tags:Klima", "(tags:KI OR ort:Köln) OR kat:Politik", ""]
+    selected = {q: [a.ref for a in facets.select(q)] for q in queries}
+    grouped = {cat: [a.ref for a in arts] for cat, arts in wc_set.grouped().items()}
+    if backend == "sqlite":  # Zählen, Filtern und Gruppieren lesen nur die Treffer
+        assert all(store._articles is None for _, store in wc_set.stores())
+
+    live = wc_set.live_articles()
+    expected = FacetIndex(live)
+    assert counts == {field: expected.counts(field) for field in FACET_FIELDS}
+    assert selected == {q: [a.ref for a in expected.select(q)] for q in queries}
+    by_cat = {}
+    for a in live:
+        for cat in a.categories or [UNCATEGORIZED]:
+            by_cat.setdefault(cat, []).append(a.ref)
+    assert grouped == by_cat